@@ -0,0 +1,86 @@
+"""
+Скорость загрузки путешествий: строк в секунду через POST /travel/create по одному
+и через POST /travels/bulk пакетами.
+
+Запуск из каталога app:
+
+    python -m benchmarks.bulk_bench --rows 5000 --batch 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_travels(rows, cities, guides, prefix):
+    return [
+        {
+            "name": f"{prefix} {i}", "description": f"Supplier travel {i}", "price": 100.0 + i % 500,
+            "duration": f"{i % 14 + 1} дней", "start_date": "2025-06-01", "end_date": "2025-06-14",
+            "city_id": i % cities + 1, "guide_id": i % guides + 1,
+        }
+        for i in range(rows)
+    ]
+
+
+async def per_item(client, travels, clients=10):
+    queue = asyncio.Queue()
+    for travel in travels:
+        queue.put_nowait(travel)
+
+    async def worker():
+        while not queue.empty():
+            response = await client.post("/travel/create", json=queue.get_nowait())
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return time.perf_counter() - started
+
+
+async def bulk(client, travels, batch):
+    started = time.perf_counter()
+    for start in range(0, len(travels), batch):
+        response = await client.post("/travels/bulk", json=travels[start:start + batch])
+        assert response.status_code == 200 and response.json()["failed"] == 0, response.text
+    return time.perf_counter() - started
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", cities=args.cities, guides=args.guides, travels=0, users=1, reviews=0)
+    from main import app
+
+    result = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        runs = [
+            ("per_item", lambda: per_item(client, make_travels(args.rows, args.cities, args.guides, "Single"))),
+            ("bulk_insert", lambda: bulk(client, make_travels(args.rows, args.cities, args.guides, "Bulk"), args.batch)),
+            # Повторная загрузка тех же названий: все строки идут в ветку ON CONFLICT DO UPDATE.
+            ("bulk_update", lambda: bulk(client, make_travels(args.rows, args.cities, args.guides, "Bulk"), args.batch)),
+        ]
+        for name, run in runs:
+            elapsed = await run()
+            result[name] = {"rows": args.rows, "seconds": round(elapsed, 2), "rows_per_s": round(args.rows / elapsed, 1)}
+    result["speedup"] = round(result["bulk_insert"]["rows_per_s"] / result["per_item"]["rows_per_s"], 1)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--guides", type=int, default=200)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,77 @@
+"""
+Нагрузочный тест кэша справочников: запросов к БД в секунду с кэшем и без него.
+
+Запуск из каталога app:
+
+    python -m benchmarks.cache_bench --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import event
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ["/cities", "/city?id={city}", "/tour_guides/", "/tour_guide/{guide}"]
+
+
+async def run(client, total, cities, guides, clients=50):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(PATHS[i % len(PATHS)].format(city=i % cities + 1, guide=i % guides + 1))
+
+    async def worker():
+        while not queue.empty():
+            await client.get(queue.get_nowait())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return time.perf_counter() - started
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", cities=args.cities, guides=args.guides, travels=0, users=1, reviews=0)
+    from database.connect import async_engine
+    from main import app
+    from utils.cache import NullCache, catalog_cache
+
+    statements = 0
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    result = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, backend in (("no_cache", NullCache()), ("cache", catalog_cache.backend)):
+            catalog_cache.backend = backend
+            statements = 0
+            elapsed = await run(client, args.requests, args.cities, args.guides)
+            result[name] = {
+                "rps": round(args.requests / elapsed, 1),
+                "db_queries": statements,
+                "db_queries_per_s": round(statements / elapsed, 1),
+                "queries_per_request": round(statements / args.requests, 3),
+                "cache": catalog_cache.stats(),
+            }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--guides", type=int, default=200)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
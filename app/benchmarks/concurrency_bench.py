@@ -0,0 +1,97 @@
+"""
+Нагрузочный тест: N параллельных клиентов против приложения, p50/p95/p99 задержки.
+
+Запуск из каталога app:
+
+    python -m benchmarks.concurrency_bench --clients 200 --requests 2000
+
+Скрипт создает временную базу ./database.db во временном каталоге и работает
+одинаково для синхронного и асинхронного слоя БД, поэтому его можно запускать
+на разных коммитах и сравнивать цифры.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Смесь: быстрые точечные чтения и тяжелые списки, которые раньше блокировали цикл событий.
+MIX = [
+    ("GET", "/city?id={city}", 6),
+    ("GET", "/travel/{travel}", 6),
+    ("GET", "/cities", 2),
+    ("GET", "/city/{city}/travels", 1),
+]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run(client, clients, total, cities, travels):
+    paths = [(method, path) for method, path, weight in MIX for _ in range(weight)]
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        method, path = paths[i % len(paths)]
+        queue.put_nowait((method, path.format(city=i % cities + 1, travel=i % travels + 1)))
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            method, path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.request(method, path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {**summarize(latencies), "errors": errors, "rps": round(total / elapsed, 1)}
+
+
+async def main(args):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            return await run(client, args.clients, args.requests, args.cities, args.travels)
+
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", cities=args.cities, travels=args.travels, reviews=0)
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        return await run(client, args.clients, args.requests, args.cities, args.travels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--travels", type=int, default=2000)
+    parser.add_argument("--url", help="URL запущенного сервера вместо встроенного ASGI-клиента")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
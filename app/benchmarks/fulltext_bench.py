@@ -0,0 +1,79 @@
+"""
+Сравнение полнотекстового поиска (FTS5) с прежним путем через ILIKE '%x%'.
+
+Запуск из каталога app:
+
+    python -m benchmarks.fulltext_bench --travels 500000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.seed import WORDS, seed_database
+from database.models import Travel
+from services.search_services import full_text_search
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3),
+    }
+
+
+async def ilike_search(db, term, limit):
+    query = select(Travel.id, Travel.name).where(
+        or_(Travel.name.ilike(f"%{term}%"), Travel.description.ilike(f"%{term}%"))
+    ).limit(limit)
+    return (await db.execute(query)).all()
+
+
+async def fts_search(db, term, limit):
+    return await full_text_search(db, term, "travel", limit)
+
+
+async def measure(session_maker, search, terms, repeat, limit):
+    latencies = {}
+    async with session_maker() as db:
+        for term in terms:
+            latencies[term] = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await search(db, term, limit)
+                latencies[term].append(time.perf_counter() - started)
+    return {term: summarize(values) for term, values in latencies.items()}
+
+
+async def main(args):
+    path = os.path.join(tempfile.mkdtemp(), "fulltext.db")
+    started = time.perf_counter()
+    seed_database(f"sqlite:///{path}", travels=args.travels, users=1, reviews=0)
+    seeded = time.perf_counter() - started
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(engine)
+    # Частое, среднее и редкое слово, плюс слово, которого нет в данных.
+    terms = [WORDS[0], WORDS[len(WORDS) // 2], WORDS[-1], "zeppelin"]
+    result = {
+        "travels": args.travels,
+        "seed_s": round(seeded, 1),
+        "ilike": await measure(session_maker, ilike_search, terms, args.repeat, args.limit),
+        "fts": await measure(session_maker, fts_search, terms, args.repeat, args.limit),
+    }
+    await engine.dispose()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--travels", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,139 @@
+"""
+Накладные расходы метрик: пропускная способность с MetricsMiddleware и событиями
+движка и без них. Варианты чередуются внутри раунда (порядок меняется каждый раунд,
+чтобы дрейф не попадал в разницу); итог — медиана относительной разницы по раундам.
+Разница в несколько процентов сравнима с шумом, поэтому отдельно замеряется стоимость
+самого middleware и событий движка и по ней оценивается доля накладных расходов.
+
+Запуск из каталога app:
+
+    python -m benchmarks.metrics_bench --requests 500 --rounds 21
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ["/travel/{id}", "/treves?limit=20", "/users?limit=20", "/travels/search?sort_by=price&limit=20"]
+
+
+async def run(client, total, travels, clients=20):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(PATHS[i % len(PATHS)].format(id=i % travels + 1))
+
+    async def worker():
+        while not queue.empty():
+            response = await client.get(queue.get_nowait())
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return total / (time.perf_counter() - started)
+
+
+def set_metrics(app, entry, enabled):
+    """Включает или убирает MetricsMiddleware (`entry` из app.user_middleware) и события движка."""
+    from utils import metrics
+
+    hooks = (("before_cursor_execute", metrics._start_query_timer), ("after_cursor_execute", metrics._stop_query_timer))
+    for name, hook in hooks:
+        if enabled and not event.contains(Engine, name, hook):
+            event.listen(Engine, name, hook)
+        if not enabled and event.contains(Engine, name, hook):
+            event.remove(Engine, name, hook)
+    app.user_middleware = [m for m in app.user_middleware if m is not entry]
+    if enabled:
+        app.user_middleware.insert(0, entry)
+    app.middleware_stack = None
+
+
+async def measure_hooks(app, entry, iterations=20000):
+    """Время (мкс) MetricsMiddleware на запрос и событий движка на один SQL-запрос."""
+    from sqlalchemy import create_engine
+
+    from utils.metrics import Metrics
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def discard(message):
+        pass
+
+    middleware = entry.cls(endpoint, Metrics())
+    timings = {}
+    for name, target in (("bare", endpoint), ("middleware", middleware)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await target({"type": "http", "method": "GET", "path": "/"}, None, discard)
+        timings[name] = (time.perf_counter() - started) / iterations * 1e6
+
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        for enabled in (True, False, True, False):
+            set_metrics(app, entry, enabled)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                conn.exec_driver_sql("SELECT 1").all()
+            timings[enabled] = (time.perf_counter() - started) / iterations * 1e6
+    engine.dispose()
+    return timings["middleware"] - timings["bare"], max(timings[True] - timings[False], 0.0)
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", travels=args.travels, users=200, reviews=2000)
+    from database.connect import async_engine, engine
+    from main import app
+    from utils.metrics import MetricsMiddleware, metrics
+
+    entry = next(m for m in app.user_middleware if m.cls is MetricsMiddleware)
+    results = {"off": [], "on": []}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await run(client, args.requests // 4, args.travels)
+            for round_ in range(args.rounds):
+                for name in (("off", "on") if round_ % 2 == 0 else ("on", "off")):
+                    set_metrics(app, entry, name == "on")
+                    results[name].append(await run(client, args.requests, args.travels))
+        middleware_us, query_us = await measure_hooks(app, entry)
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+    queries_per_request = sum(metrics.queries.values()) / sum(metrics.statuses.values())
+    off, on = statistics.median(results["off"]), statistics.median(results["on"])
+    overhead = statistics.median((a - b) / a for a, b in zip(results["off"], results["on"]))
+    return {
+        "rps_without_metrics": round(off, 1),
+        "rps_with_metrics": round(on, 1),
+        "overhead_pct": round(overhead * 100, 2),
+        "middleware_us_per_request": round(middleware_us, 2),
+        "hooks_us_per_query": round(query_us, 2),
+        "queries_per_request": round(queries_per_request, 2),
+        # Доля накладных расходов по прямым замерам: (middleware + события) / время запроса.
+        "estimated_overhead_pct": round((middleware_us + query_us * queries_per_request) * off / 1e4, 3),
+        "rounds": {name: [round(value, 1) for value in values] for name, values in results.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=21)
+    parser.add_argument("--travels", type=int, default=1000)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
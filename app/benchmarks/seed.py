@@ -0,0 +1,76 @@
+import datetime
+import random
+
+from sqlalchemy import create_engine, insert
+
+import database.models  # noqa: F401  регистрирует таблицы в Base.metadata
+from database.connect import Base
+from database.models import City, Review, TourGuide, Travel, User
+
+CHUNK = 10_000
+
+# Словарь для описаний: частота слов в тексте убывает от начала списка к концу.
+WORDS = (
+    "tour city walk museum castle lake river mountain old town food wine beach forest "
+    "park cathedral palace bridge market festival sunset island harbour village canyon "
+    "glacier volcano desert safari monastery vineyard lighthouse waterfall cave"
+).split()
+
+
+def _text(rnd, words=12):
+    return " ".join(rnd.choices(WORDS, weights=range(len(WORDS), 0, -1), k=words))
+
+
+def _chunks(rows, size=CHUNK):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed_database(url: str, cities=50, guides=200, travels=5_000, users=1_000, reviews=10_000, seed=42) -> dict:
+    """
+    Создает схему и заполняет базу синтетическими данными заданного объема.
+    Повторный запуск с тем же seed дает те же данные.
+    """
+    rnd = random.Random(seed)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime.date(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(City), [
+            {"id": i, "name": f"City {i}", "description": f"Description of city {i}"}
+            for i in range(1, cities + 1)
+        ])
+        conn.execute(insert(TourGuide), [
+            {"id": i, "name": f"Guide {i}", "experience_years": rnd.randint(0, 30),
+             "bio": f"Guide {i} bio", "contact_info": f"+375-{i}", "city_id": rnd.randint(1, cities)}
+            for i in range(1, guides + 1)
+        ])
+        for chunk in _chunks(
+            {"id": i, "name": f"Travel {i}", "description": _text(rnd),
+             "price": round(rnd.uniform(50, 5000), 2), "duration": f"{rnd.randint(1, 14)} days",
+             "start_date": start + datetime.timedelta(days=i % 365),
+             "end_date": start + datetime.timedelta(days=i % 365 + rnd.randint(1, 14)),
+             "city_id": rnd.randint(1, cities), "guide_id": rnd.randint(1, guides) if guides else None}
+            for i in range(1, travels + 1)
+        ):
+            conn.execute(insert(Travel), chunk)
+        for chunk in _chunks(
+            {"id": i, "name": f"user{i}", "age": rnd.randint(18, 80)} for i in range(1, users + 1)
+        ):
+            conn.execute(insert(User), chunk)
+        for chunk in _chunks(
+            {"id": i, "user_id": rnd.randint(1, users), "travel_id": rnd.randint(1, travels),
+             "rating": rnd.randint(1, 5), "comment": f"Review {i}",
+             # ReviewBase.created_at — дата, поэтому время отзыва нулевое.
+             "created_at": datetime.datetime(2025, 1, 1) + datetime.timedelta(days=i % 365)}
+            for i in range(1, reviews + 1)
+        ):
+            conn.execute(insert(Review), chunk)
+    engine.dispose()
+    return {"cities": cities, "guides": guides, "travels": travels, "users": users, "reviews": reviews}
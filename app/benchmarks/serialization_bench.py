@@ -0,0 +1,92 @@
+"""
+Микробенчмарк сериализации списка путешествий: стоимость одной строки на прежнем пути
+(ORM-объекты → Page[TravelResponse] → JSONResponse) и на пути строк (колонки → orjson).
+
+Запуск из каталога app:
+
+    python -m benchmarks.serialization_bench --rows 500 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def measure(session_maker, repeat, query, encode):
+    """Среднее время (мкс) запроса и кодирования одной страницы."""
+    fetch = encode_time = 0.0
+    for _ in range(repeat):
+        async with session_maker() as db:
+            started = time.perf_counter()
+            rows = (await db.execute(query)).all()
+            fetched = time.perf_counter()
+            body = encode(rows)
+            fetch += fetched - started
+            encode_time += time.perf_counter() - fetched
+    return len(rows), fetch / repeat * 1e6, encode_time / repeat * 1e6, len(body)
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", travels=args.rows, users=1, reviews=0)
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from pydantic_core import to_json
+
+    from database.connect import async_engine, async_session_local, engine
+    from models.travel_model import TravelResponse
+    from services.travel_services import TRAVEL_SHAPE, select_travel_rows, select_travels
+    from utils.classes import Page
+    from utils.serialization import dumps
+
+    # Так FastAPI обрабатывает ответ с response_model: проверка, dump в Python и json.dumps.
+    page_adapter = TypeAdapter(Page[TravelResponse])
+
+    def pydantic_path(rows):
+        page = page_adapter.validate_python({"items": [row[0] for row in rows], "next_cursor": None}, from_attributes=True)
+        return JSONResponse(page_adapter.dump_python(page, mode="json")).body
+
+    def rows_path(encoder):
+        def encode(rows):
+            return encoder({"items": [TRAVEL_SHAPE.build(row) for row in rows], "next_cursor": None})
+        return encode
+
+    paths = {
+        "orm_pydantic": (select_travels().order_by("id").limit(args.rows), pydantic_path),
+        "rows_orjson": (select_travel_rows().order_by("id").limit(args.rows), rows_path(dumps)),
+        "rows_pydantic_core": (select_travel_rows().order_by("id").limit(args.rows), rows_path(to_json)),
+    }
+    result = {}
+    try:
+        for name, (query, encode) in paths.items():
+            await measure(async_session_local, 2, query, encode)
+            rows, fetch_us, encode_us, size = await measure(async_session_local, args.repeat, query, encode)
+            result[name] = {
+                "rows": rows,
+                "bytes": size,
+                "fetch_us_per_row": round(fetch_us / rows, 2),
+                "encode_us_per_row": round(encode_us / rows, 2),
+                "total_us_per_row": round((fetch_us + encode_us) / rows, 2),
+            }
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+    baseline = result["orm_pydantic"]["total_us_per_row"]
+    for entry in result.values():
+        entry["speedup"] = round(baseline / entry["total_us_per_row"], 2)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
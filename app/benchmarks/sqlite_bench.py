@@ -0,0 +1,129 @@
+"""
+Смешанная нагрузка чтение/запись на файловый SQLite с разными профилями подключения.
+
+Запуск из каталога app:
+
+    python -m benchmarks.sqlite_bench --clients 50 --requests 4000
+
+Каждый профиль запускается в отдельном процессе со своими переменными DB_*,
+потому что настройки движка читаются при импорте database.connect.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Профиль "rollback_journal" повторяет поведение до настройки: журнал DELETE,
+# synchronous=FULL, без mmap и с кэшем страниц SQLite по умолчанию.
+PROFILES = {
+    "rollback_journal": {
+        "DB_SQLITE_JOURNAL_MODE": "DELETE", "DB_SQLITE_SYNCHRONOUS": "FULL",
+        "DB_SQLITE_MMAP_SIZE": "0", "DB_SQLITE_CACHE_SIZE": "-2000",
+    },
+    "wal": {},
+    "wal_read_engine": {"DB_READ_ONLY_ENGINE": "true"},
+}
+
+# Четыре чтения на одну запись.
+READS = ["/travel/{travel}", "/city/{city}/travels?limit=20", "/travel/{travel}", "/treves?limit=20"]
+
+
+def travel_body(i, cities):
+    return {
+        "name": f"Bench travel {i}", "price": 100.0 + i % 100, "duration": "3 дня",
+        "start_date": "2025-06-01", "end_date": "2025-06-03", "city_id": i % cities + 1,
+    }
+
+
+async def run(client, clients, total, cities, travels):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    latencies = {"read": [], "write": []}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                if i % 5 == 4:
+                    kind = "write"
+                    response = await client.post("/travel/create", json=travel_body(i, cities))
+                else:
+                    kind = "read"
+                    path = READS[i % len(READS)].format(city=i % cities + 1, travel=i % travels + 1)
+                    response = await client.get(path)
+                failed = response.status_code >= 500
+            except Exception:
+                # ASGI-транспорт пробрасывает исключения приложения, например `database is locked`.
+                failed = True
+            latencies[kind].append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(total / elapsed, 1),
+        "errors": errors,
+        **{
+            f"{kind}_p99_ms": round(sorted(values)[int(len(values) * 0.99) - 1] * 1000, 2)
+            for kind, values in latencies.items() if values
+        },
+    }
+
+
+async def run_profile(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    seed_database("sqlite:///./database.db", cities=args.cities, travels=args.travels, users=1, reviews=0)
+    from database.connect import async_engine, async_read_engine
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            return await run(client, args.clients, args.requests, args.cities, args.travels)
+    finally:
+        # Потоки aiosqlite не фоновые: без закрытия соединений процесс не завершится.
+        for engine in (async_engine, async_read_engine):
+            if engine is not None:
+                await engine.dispose()
+
+
+def main(args):
+    result = {}
+    for name, env in PROFILES.items():
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_bench", "--profile", name,
+             "--clients", str(args.clients), "--requests", str(args.requests),
+             "--cities", str(args.cities), "--travels", str(args.travels)],
+            cwd=APP_DIR, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        result[name] = json.loads(output)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--travels", type=int, default=5000)
+    parser.add_argument("--profile", choices=PROFILES, help="Запустить один профиль в текущем процессе")
+    args = parser.parse_args()
+    if args.profile:
+        print(json.dumps(asyncio.run(run_profile(args))))
+    else:
+        print(json.dumps(main(args), indent=2))
@@ -0,0 +1,100 @@
+"""
+Профиль холодного старта: время импорта main по пакетам и модулям (python -X importtime)
+и время этапов старта в свежем процессе.
+
+Запуск из каталога app:
+
+    python -m benchmarks.startup_profile --runs 5
+
+Этапы: импорт main, настройка моделей (configure_models), построение схемы OpenAPI
+и чтение ее из дискового кэша. Каждый замер — в новом процессе интерпретатора,
+в отчет идет минимум по --runs прогонам: он меньше всего зависит от фоновой нагрузки.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> list:
+    """Строки `import time: self | cumulative | module` -> [(module, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_profile(top: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    packages = defaultdict(int)
+    for module, self_us, _ in rows:
+        packages[module.split(".", 1)[0]] += self_us
+    return {
+        "modules_imported": len(rows),
+        "by_package_ms": {
+            name: round(us / 1000, 1) for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules_ms": {
+            module: round(self_us / 1000, 1) for module, self_us, _ in sorted(rows, key=lambda row: -row[1])[:top]
+        },
+    }
+
+
+def measure_phases(cache_path: str) -> dict:
+    """Выполняется в отдельном процессе: этапы старта по порядку, в миллисекундах."""
+    timings = {}
+    started = time.perf_counter()
+    from main import app
+    timings["import_main"] = time.perf_counter() - started
+
+    from utils.openapi_cache import build_schema, load_or_build
+    from utils.warmup import configure_models
+
+    for name, step in (
+        ("configure_models", configure_models),
+        ("openapi_build", lambda: build_schema(app)),
+        ("openapi_store", lambda: load_or_build(app, cache_path)),
+        ("openapi_cached_load", lambda: load_or_build(app, cache_path)),
+    ):
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return {name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+
+
+def phases(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup_profile", "--child", os.path.join(workdir, "openapi.json")],
+                cwd=APP_DIR, capture_output=True, text=True, check=True,
+            )
+        samples.append(json.loads(result.stdout))
+    return {name: min(sample[name] for sample in samples) for name in samples[0]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--child", metavar="CACHE_PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        sys.path.insert(0, APP_DIR)
+        print(json.dumps(measure_phases(args.child)))
+    else:
+        print(json.dumps({"phases_ms": phases(args.runs), **import_profile(args.top)}, indent=2))
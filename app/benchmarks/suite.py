@@ -0,0 +1,271 @@
+"""
+Воспроизводимый нагрузочный прогон API по сценариям с результатами в JSON для сравнения коммитов.
+
+Запуск из каталога app:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --compare bench.json --tolerance 0.15
+
+Каждый сценарий — взвешенная смесь операций (просмотр каталога, поиск, отзывы,
+бронирование). Последовательность запросов задается --seed, база перед каждым
+сценарием восстанавливается из одного и того же засеянного шаблона, поэтому
+прогоны на разных коммитах выполняют одинаковую работу над одинаковыми данными.
+С --compare сценарий считается регрессией, если rps упал или p95 вырос больше
+чем на --tolerance; тогда скрипт завершается с кодом 1.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.concurrency_bench import summarize
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SORTS = ("id", "price", "start_date", "end_date", "rating")
+
+
+def browse_cities(rnd, volumes):
+    return "GET", "/cities", None
+
+
+def browse_city(rnd, volumes):
+    return "GET", f"/city?id={rnd.randint(1, min(volumes['cities'], 50))}", None
+
+
+def browse_guides(rnd, volumes):
+    return "GET", "/tour_guides/", None
+
+
+def browse_city_travels(rnd, volumes):
+    return "GET", f"/city/{rnd.randint(1, volumes['cities'])}/travels?limit=20", None
+
+
+def browse_travels(rnd, volumes):
+    return "GET", "/treves?limit=50", None
+
+
+def view_travel(rnd, volumes):
+    return "GET", f"/travel/{rnd.randint(1, volumes['travels'])}", None
+
+
+def search_travels(rnd, volumes):
+    params = {"sort_by": rnd.choice(SORTS), "order": rnd.choice(("asc", "desc")), "limit": 20}
+    if rnd.random() < 0.5:
+        params["name_city"] = f"City {rnd.randint(1, volumes['cities'])}"
+    if rnd.random() < 0.5:
+        low = rnd.randint(50, 4000)
+        params.update(min_price=low, max_price=low + 1000)
+    if rnd.random() < 0.3:
+        params["start_date"] = str(datetime.date(2025, 1, 1) + datetime.timedelta(days=rnd.randint(0, 300)))
+    return "GET", "/travels/search?" + "&".join(f"{key}={value}" for key, value in params.items()), None
+
+
+def fulltext_search(rnd, volumes):
+    from benchmarks.seed import WORDS
+    return "GET", f"/search?q={rnd.choice(WORDS)}", None
+
+
+def read_reviews(rnd, volumes):
+    return "GET", f"/reviews/{rnd.randint(1, volumes['travels'])}", None
+
+
+def write_review(rnd, volumes):
+    return "POST", "/review/create", {
+        "user_id": rnd.randint(1, volumes["users"]), "travel_id": rnd.randint(1, volumes["travels"]),
+        "rating": rnd.randint(1, 5), "comment": "bench", "created_at": "2025-06-01",
+    }
+
+
+def book_travel(rnd, volumes):
+    return "POST", "/order/create", {
+        "user_id": rnd.randint(1, volumes["users"]), "travel_id": rnd.randint(1, volumes["travels"]),
+    }
+
+
+def user_orders(rnd, volumes):
+    return "GET", f"/user/{rnd.randint(1, volumes['users'])}/orders", None
+
+
+# Сценарии: операция и ее вес в смеси.
+SCENARIOS = {
+    "catalog_browse": [
+        (browse_cities, 2), (browse_city, 3), (browse_guides, 1), (browse_city_travels, 2),
+        (browse_travels, 1), (view_travel, 6),
+    ],
+    "search": [(search_travels, 4), (fulltext_search, 2), (view_travel, 2)],
+    "review_write": [(write_review, 1), (read_reviews, 3), (view_travel, 1)],
+    "booking": [(book_travel, 2), (user_orders, 1), (view_travel, 2)],
+    "mixed": [
+        (browse_city, 2), (browse_city_travels, 1), (view_travel, 4), (search_travels, 2),
+        (fulltext_search, 1), (read_reviews, 1), (write_review, 1), (book_travel, 1),
+    ],
+}
+
+
+def plan_requests(scenario, total, volumes, seed):
+    """Детерминированная последовательность запросов сценария."""
+    rnd = random.Random(f"{seed}:{scenario}")
+    operations = [operation for operation, _ in SCENARIOS[scenario]]
+    weights = [weight for _, weight in SCENARIOS[scenario]]
+    return [
+        (operation.__name__, *operation(rnd, volumes))
+        for operation in rnd.choices(operations, weights=weights, k=total)
+    ]
+
+
+async def run_scenario(client, requests, clients):
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    latencies, by_operation, statuses = [], defaultdict(list), Counter()
+
+    async def worker():
+        while not queue.empty():
+            name, method, path, body = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            by_operation[name].append(elapsed)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(latencies),
+        "rps": round(len(requests) / elapsed, 1),
+        "errors": sum(count for status, count in statuses.items() if status >= 500),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "operations": {name: summarize(values) for name, values in sorted(by_operation.items())},
+    }
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], cwd=APP_DIR, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ("-dirty" if dirty.strip() else "")
+
+
+def restore_database(template):
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists("database.db" + suffix):
+            os.remove("database.db" + suffix)
+    shutil.copyfile(template, "database.db")
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp()
+    sys.path.insert(0, APP_DIR)
+    os.chdir(workdir)
+    from benchmarks.seed import seed_database
+    volumes = seed_database(
+        "sqlite:///./template.db", cities=args.cities, guides=args.guides, travels=args.travels,
+        users=args.users, reviews=args.reviews, seed=args.seed,
+    )
+    restore_database("template.db")
+    from database.connect import async_engine, async_read_engine, engine
+    from main import app
+    from utils.cache import catalog_cache
+
+    scenarios = args.scenarios or list(SCENARIOS)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for scenario in scenarios:
+                for bound in (async_engine, async_read_engine):
+                    if bound is not None:
+                        await bound.dispose()
+                restore_database("template.db")
+                catalog_cache.clear()
+                await run_scenario(client, plan_requests(scenario, args.warmup, volumes, args.seed + 1), args.clients)
+                requests = plan_requests(scenario, args.requests, volumes, args.seed)
+                results[scenario] = await run_scenario(client, requests, args.clients)
+    finally:
+        for bound in (async_engine, async_read_engine):
+            if bound is not None:
+                await bound.dispose()
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "volumes": volumes, "clients": args.clients, "requests": args.requests,
+                "warmup": args.warmup, "seed": args.seed,
+            },
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Сравнивает сценарии с базовым прогоном; возвращает список регрессий."""
+    if current["meta"]["config"] != baseline["meta"]["config"]:
+        print("warning: benchmark config differs from baseline", file=sys.stderr)
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(scenario)
+        if base is None:
+            continue
+        rps_change = result["rps"] / base["rps"] - 1
+        p95_change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        result["vs_baseline"] = {"rps_change": round(rps_change, 3), "p95_change": round(p95_change, 3)}
+        if rps_change < -tolerance or p95_change > tolerance or result["errors"] > base["errors"]:
+            regressions.append(scenario)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS), help="По умолчанию — все сценарии.")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="Запросов на сценарий.")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--guides", type=int, default=200)
+    parser.add_argument("--travels", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--output", help="Сохранить результат в файл.")
+    parser.add_argument("--compare", help="Файл с результатом базового прогона.")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    # main() переходит во временный каталог, поэтому пути к файлам нужны абсолютные.
+    output, baseline = (os.path.abspath(path) if path else None for path in (args.output, args.compare))
+
+    report = asyncio.run(main(args))
+    regressions = []
+    if baseline:
+        with open(baseline) as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        report["regressions"] = regressions
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as file:
+            file.write(text + "\n")
+    print(text)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,235 @@
+"""
+Страницы городов: готовый JSON (город, гиды, ближайшие путешествия, сводка рейтинга)
+в таблице city_pages, по одной строке на город.
+
+Страница пересобирается в той же транзакции, что и изменения, которые ее затрагивают:
+изменения городов, путешествий, гидов и отзывов собираются при flush и массовых
+INSERT/UPDATE/DELETE, а перед commit пересобираются страницы только затронутых городов.
+Если по запросу нельзя понять, какие города он меняет, пересобираются все страницы.
+
+Список «ближайших» путешествий зависит от текущей даты, поэтому раз в сутки
+страницы нужно пересобирать целиком: python -m jobs.rebuild_city_pages.
+"""
+import datetime
+import itertools
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from database.models import City, CityPage, Review, TourGuide, Travel
+from models.city_model import CityResponse
+from models.city_page_model import CityPageGuide, CityPageTravel
+from utils.serialization import RowShape, dumps
+
+# Сколько ближайших путешествий попадает на страницу города.
+CITY_PAGE_TRAVELS = 50
+
+# Execution option для массовых UPDATE, которые не меняют содержимое страниц
+# (например, счетчика занятых мест): .execution_options(city_pages=False).
+CITY_PAGES_OPTION = "city_pages"
+
+PAGE_CHANGES = "city_page_changes"
+
+PAGE_TABLES = ("cities", "travels", "tour_guides", "reviews")
+
+# Колонка, по которой строка таблицы относится к странице города.
+PAGE_CITY_COLUMNS = {"cities": "id", "travels": "city_id", "tour_guides": "city_id"}
+
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+CITY_SHAPE = RowShape(CityResponse, City)
+GUIDE_SHAPE = RowShape(CityPageGuide, TourGuide)
+TRAVEL_SHAPE = RowShape(CityPageTravel, Travel)
+
+
+def page_changes(session: Session) -> dict:
+    """Затронутые в транзакции города и путешествия; `all` — пересобрать все страницы."""
+    return session.info.setdefault(PAGE_CHANGES, {"cities": set(), "travels": set(), "all": False})
+
+
+def mark_cities(session: Session, city_ids: Iterable[int]) -> None:
+    """
+    Отмечает страницы для пересборки при commit. Для массовой записи, которая сама знает
+    затронутые города и выполняется с execution option `city_pages=False`.
+    """
+    page_changes(session)["cities"].update(id for id in city_ids if id is not None)
+
+
+def city_column(model):
+    """Колонка модели с ID города страницы или None, если модель на страницы не влияет по строкам."""
+    name = PAGE_CITY_COLUMNS.get(getattr(model, "__tablename__", None))
+    return None if name is None else getattr(model, name)
+
+
+def _values(instance, attribute: str) -> list:
+    # Текущее значение и прежнее: путешествие, перенесенное в другой город, меняет обе страницы.
+    history = inspect(instance).attrs[attribute].history
+    return [value for value in itertools.chain(history.added, history.unchanged, history.deleted) if value is not None]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_pages(session, flush_context):
+    changes = page_changes(session)
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, City):
+            changes["cities"].add(instance.id)
+        elif isinstance(instance, (Travel, TourGuide)):
+            changes["cities"].update(_values(instance, "city_id"))
+        elif isinstance(instance, Review):
+            changes["travels"].update(_values(instance, "travel_id"))
+
+
+def _ids_from_where(statement, id_column) -> Optional[List[int]]:
+    """ID из условия `id = :x` или `id IN (...)` на верхнем уровне WHERE, иначе None."""
+    where = statement.whereclause
+    if where is None:
+        return None
+    clauses = where.clauses if isinstance(where, BooleanClauseList) and where.operator is operators.and_ else [where]
+    for clause in clauses:
+        if not (isinstance(clause, BinaryExpression) and isinstance(clause.right, BindParameter)):
+            continue
+        if not clause.left.compare(id_column):
+            continue
+        value = clause.right.effective_value
+        if clause.operator is operators.eq:
+            return [value]
+        if clause.operator is operators.in_op:
+            return list(value)
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml_pages(orm_execute_state):
+    # Массовые INSERT/UPDATE/DELETE через session.execute() не проходят через flush.
+    # Запрос без города в условии пересобирает все страницы; массовая запись, которая знает
+    # свои города (services/bulk_services.py), передает их через mark_cities.
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if not orm_execute_state.execution_options.get(CITY_PAGES_OPTION, True):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is None or table.name not in PAGE_TABLES:
+        return
+    changes = page_changes(orm_execute_state.session)
+    ids = None
+    if table.name == "travels" and not orm_execute_state.is_insert:
+        ids = _ids_from_where(orm_execute_state.statement, table.c.id)
+    if ids is None:
+        changes["all"] = True
+    else:
+        changes["travels"].update(ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _rebuild_changed_pages(session):
+    session.flush()
+    changes = session.info.pop(PAGE_CHANGES, None)
+    if not changes or not (changes["all"] or changes["cities"] or changes["travels"]):
+        return
+    connection = session.connection()
+    if changes["all"]:
+        rebuild_pages(connection)
+        return
+    cities = set(changes["cities"])
+    if changes["travels"]:
+        cities.update(connection.scalars(select(Travel.city_id).where(Travel.id.in_(changes["travels"]))))
+    rebuild_pages(connection, cities)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_page_changes(session):
+    session.info.pop(PAGE_CHANGES, None)
+
+
+def build_pages(connection: Connection, city_ids: Optional[Iterable[int]], built_at: datetime.datetime) -> dict:
+    """
+    Тела страниц городов (все или из `city_ids`) в словаре по ID города.
+    Четыре запроса на любое число городов: города, гиды, ближайшие путешествия, сводка рейтинга.
+    """
+    ids = None if city_ids is None else sorted(set(city_ids))
+
+    def scope(query, column):
+        return query if ids is None else query.where(column.in_(ids))
+
+    today = datetime.date.today()
+    pages = {}
+    for row in connection.execute(scope(select(*CITY_SHAPE.columns()), City.id)):
+        city = CITY_SHAPE.build(row)
+        pages[city["id"]] = {
+            "city": city, "guides": [], "upcoming_travels": [],
+            "rating": {"average": 0.0, "count": 0}, "built_at": built_at,
+        }
+
+    guides = scope(select(TourGuide.city_id, *GUIDE_SHAPE.columns()), TourGuide.city_id).order_by(TourGuide.id)
+    for row in connection.execute(guides):
+        if row[0] in pages:
+            pages[row[0]]["guides"].append(GUIDE_SHAPE.build(row, 1))
+
+    # Первые CITY_PAGE_TRAVELS путешествий каждого города по дате начала, одним запросом.
+    position = func.row_number().over(partition_by=Travel.city_id, order_by=(Travel.start_date, Travel.id))
+    ranked = scope(
+        select(Travel.city_id, position.label("position"), *TRAVEL_SHAPE.columns()).where(Travel.end_date >= today),
+        Travel.city_id,
+    ).subquery()
+    travels = select(ranked).where(ranked.c.position <= CITY_PAGE_TRAVELS).order_by(ranked.c.city_id, ranked.c.position)
+    for row in connection.execute(travels):
+        if row[0] in pages:
+            pages[row[0]]["upcoming_travels"].append(TRAVEL_SHAPE.build(row, 2))
+
+    ratings = scope(
+        select(Travel.city_id, func.sum(Travel.rating_sum), func.sum(Travel.rating_count)).group_by(Travel.city_id),
+        Travel.city_id,
+    )
+    for city_id, rating_sum, rating_count in connection.execute(ratings):
+        if city_id in pages and rating_count:
+            pages[city_id]["rating"] = {"average": round(rating_sum / rating_count, 2), "count": rating_count}
+    return {city_id: dumps(page) for city_id, page in pages.items()}
+
+
+def lock_cities(ids: Optional[List[int]]):
+    """
+    Блокирует строки городов до конца транзакции: две транзакции, задевшие один город,
+    пересобирают его страницу по очереди, и вторая читает данные уже после commit первой.
+    FOR NO KEY UPDATE не конфликтует с FOR KEY SHARE, которую берут вставки путешествий
+    и гидов этого города (внешний ключ), поэтому не приводит к взаимной блокировке с ними.
+    SQLite не знает FOR UPDATE: там писатель и так один.
+    """
+    query = select(City.id).order_by(City.id).with_for_update(key_share=True)
+    return query if ids is None else query.where(City.id.in_(ids))
+
+
+def upsert_pages(dialect: str):
+    """INSERT ... ON CONFLICT (city_id) DO UPDATE для страниц; строки передаются executemany."""
+    statement = UPSERT_INSERTS[dialect](CityPage.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["city_id"], set_={"body": statement.excluded.body, "built_at": statement.excluded.built_at}
+    )
+
+
+def rebuild_pages(connection: Connection, city_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Пересобирает страницы городов из `city_ids` (без аргумента — все) и удаляет
+    страницы удаленных городов. Возвращает число записанных страниц.
+    """
+    ids = None if city_ids is None else sorted(set(city_ids))
+    connection.execute(lock_cities(ids))
+    built_at = datetime.datetime.utcnow()
+    pages = build_pages(connection, ids, built_at)
+    table = CityPage.__table__
+    if ids is None:
+        connection.execute(delete(table).where(table.c.city_id.not_in(select(City.id))))
+    elif set(ids) - set(pages):
+        connection.execute(delete(table).where(table.c.city_id.in_(sorted(set(ids) - set(pages)))))
+    if pages:
+        connection.execute(upsert_pages(connection.dialect.name), [
+            {"city_id": city_id, "body": body, "built_at": built_at} for city_id, body in pages.items()
+        ])
+    return len(pages)
@@ -1,11 +1,95 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQL_DB_URL = 'sqlite:///./database.db'
+from database.pool import engine_options
+from database.slowlog import SlowQueryLog
+from database.sqlite import install_sqlite_pragmas, is_sqlite, use_immediate_transactions
+from utils.metrics import metrics
+from utils.settings import load_database_settings
 
-engine = create_engine(SQL_DB_URL, connect_args={"check_same_thread": False})
+# URL и параметры пула берутся из переменных окружения DB_* / DATABASE_URL
+# или из INI-файла, указанного в MYAPI_CONFIG (см. utils/settings.py).
+settings = load_database_settings()
+
+SQL_DB_URL = settings.url
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def make_async_url(url: str) -> str:
+    """
+    Переводит синхронный URL базы данных на асинхронный драйвер:
+    aiosqlite для SQLite и asyncpg для Postgres.
+    """
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+ASYNC_SQL_DB_URL = make_async_url(SQL_DB_URL)
+
+# Синхронный движок остается для alembic и служебных скриптов.
+engine = create_engine(SQL_DB_URL, **engine_options(settings, SQL_DB_URL, is_async=False))
 
 session_local = sessionmaker(autoflush=False, autocommit=False, bind=engine)
 
+# При отдельном движке для чтения движок записи SQLite держит одно соединение.
+async_engine = create_async_engine(
+    ASYNC_SQL_DB_URL,
+    **engine_options(settings, ASYNC_SQL_DB_URL, is_async=True, single_writer=settings.read_only_engine),
+)
+
+if is_sqlite(SQL_DB_URL):
+    install_sqlite_pragmas(engine, settings)
+    install_sqlite_pragmas(async_engine, settings)
+
+# expire_on_commit=False: после commit объекты не должны лениво догружаться
+# из базы, в async-сессии это невозможно вне await.
+async_session_local = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def make_read_engine():
+    """
+    Отдельный движок для GET-запросов со своим пулом: чтения не ждут соединений,
+    занятых записью. Соединения запрещают запись (query_only в SQLite,
+    default_transaction_read_only в Postgres).
+    """
+    options = engine_options(settings, ASYNC_SQL_DB_URL, is_async=True)
+    if is_sqlite(SQL_DB_URL):
+        read_engine = create_async_engine(ASYNC_SQL_DB_URL, **options)
+        install_sqlite_pragmas(read_engine, settings, read_only=True)
+        return read_engine
+    options["connect_args"] = {"server_settings": {"default_transaction_read_only": "on"}}
+    return create_async_engine(ASYNC_SQL_DB_URL, **options)
+
+
+async_read_engine = make_read_engine() if settings.read_only_engine else None
+
+if async_read_engine is not None and is_sqlite(SQL_DB_URL):
+    use_immediate_transactions(async_engine)
+
+# Журнал медленных запросов включается настройкой DB_SLOW_QUERY_MS; отчет — /debug/slow_queries.
+slow_query_log = SlowQueryLog(settings.slow_query_ms, settings.slow_query_explain, settings.slow_query_analyze)
+
+if slow_query_log.enabled:
+    for slow_engine in (async_engine, async_read_engine):
+        if slow_engine is not None:
+            slow_query_log.install(slow_engine)
+
+# Пулы видны в /metrics (db_pool_*), подробнее — /debug/pool.
+metrics.register_pool("write", async_engine)
+if async_read_engine is not None:
+    metrics.register_pool("read", async_read_engine)
+
+async_read_session_local = async_sessionmaker(
+    bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+) if async_read_engine is not None else async_session_local
+
 Base = declarative_base()
@@ -0,0 +1,123 @@
+from sqlalchemy import event
+
+from database.connect import Base
+
+# Индексируемые таблицы: вид документа, код вида, поле заголовка и поле текста.
+SEARCH_SOURCES = {
+    "travel": (0, "travels", "name", "description"),
+    "city": (1, "cities", "name", "description"),
+    "guide": (2, "tour_guides", "name", "bio"),
+}
+
+KINDS_BY_CODE = {code: kind for kind, (code, *_) in SEARCH_SOURCES.items()}
+
+# В SQLite документ живет в FTS5-таблице search_index с rowid = id * 3 + код вида,
+# поэтому триггеры удаляют и обновляют его по rowid без сканирования индекса.
+SQLITE_TABLE = "search_index"
+
+POSTGRES_TABLE = "search_documents"
+
+POSTGRES_CONFIG = "simple"
+
+
+def _sqlite_ddl() -> list:
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+        "USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')",
+    ]
+    for code, table, title, body in SEARCH_SOURCES.values():
+        rowid = f"{{row}}.id * 3 + {code}"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {SQLITE_TABLE}(rowid, title, body) "
+            f"VALUES ({rowid.format(row='new')}, new.{title}, new.{body}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {title}, {body} ON {table} BEGIN "
+            f"UPDATE {SQLITE_TABLE} SET title = new.{title}, body = new.{body} "
+            f"WHERE rowid = {rowid.format(row='new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {SQLITE_TABLE} WHERE rowid = {rowid.format(row='old')}; END",
+        ]
+    return statements
+
+
+def _postgres_ddl() -> list:
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+        "kind VARCHAR(16) NOT NULL, ref_id INTEGER NOT NULL, title TEXT, body TEXT, "
+        "document TSVECTOR NOT NULL, PRIMARY KEY (kind, ref_id))",
+        f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_TABLE}_document ON {POSTGRES_TABLE} USING GIN (document)",
+    ]
+    for kind, (_, table, title, body) in SEARCH_SOURCES.items():
+        statements += [
+            f"CREATE OR REPLACE FUNCTION {table}_search_sync() RETURNS trigger AS $$ BEGIN "
+            f"IF TG_OP = 'DELETE' THEN "
+            f"DELETE FROM {POSTGRES_TABLE} WHERE kind = '{kind}' AND ref_id = OLD.id; RETURN OLD; END IF; "
+            f"INSERT INTO {POSTGRES_TABLE} (kind, ref_id, title, body, document) "
+            f"VALUES ('{kind}', NEW.id, NEW.{title}, NEW.{body}, "
+            f"setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(NEW.{title}, '')), 'A') || "
+            f"setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(NEW.{body}, '')), 'B')) "
+            f"ON CONFLICT (kind, ref_id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body, "
+            f"document = EXCLUDED.document; RETURN NEW; END $$ LANGUAGE plpgsql",
+            f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}",
+            f"CREATE TRIGGER {table}_search_sync AFTER INSERT OR DELETE OR UPDATE OF {title}, {body} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION {table}_search_sync()",
+        ]
+    return statements
+
+
+def _sqlite_backfill() -> list:
+    return [
+        f"INSERT INTO {SQLITE_TABLE}(rowid, title, body) SELECT id * 3 + {code}, {title}, {body} FROM {table}"
+        for code, table, title, body in SEARCH_SOURCES.values()
+    ]
+
+
+def _postgres_backfill() -> list:
+    # UPDATE без изменения значений запускает триггер и заполняет search_documents.
+    return [
+        f"UPDATE {table} SET {title} = {title}"
+        for _, table, title, _ in SEARCH_SOURCES.values()
+    ]
+
+
+def search_index_ddl(dialect: str, backfill: bool = False) -> list:
+    if dialect == "sqlite":
+        return _sqlite_ddl() + (_sqlite_backfill() if backfill else [])
+    if dialect == "postgresql":
+        return _postgres_ddl() + (_postgres_backfill() if backfill else [])
+    return []
+
+
+def drop_search_index_ddl(dialect: str) -> list:
+    if dialect == "sqlite":
+        return [
+            f"DROP TRIGGER IF EXISTS {table}_search_{action}"
+            for _, table, _, _ in SEARCH_SOURCES.values()
+            for action in ("insert", "update", "delete")
+        ] + [f"DROP TABLE IF EXISTS {SQLITE_TABLE}"]
+    if dialect == "postgresql":
+        return [
+            statement
+            for _, table, _, _ in SEARCH_SOURCES.values()
+            for statement in (
+                f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}",
+                f"DROP FUNCTION IF EXISTS {table}_search_sync()",
+            )
+        ] + [f"DROP TABLE IF EXISTS {POSTGRES_TABLE}"]
+    return []
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """
+    Создает полнотекстовый индекс вместе со схемой (create_all в тестах и бенчмарках);
+    в рабочей базе его создает миграция.
+    """
+    for statement in search_index_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw):
+    for statement in drop_search_index_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
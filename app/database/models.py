@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Date, DateTime, Float, Integer, String, ForeignKey, Text  
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, LargeBinary, String, ForeignKey, Text  
 from sqlalchemy.orm import relationship
 from database.connect import Base 
 
@@ -9,9 +9,23 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     age = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     orders = relationship("Order", back_populates="user")
     reviews = relationship("Review", back_populates="user")
+
+    __table_args__ = (
+        # Поиск пользователя при логине идет по имени и возрасту.
+        Index("ix_users_name_age", "name", "age"),
+    )
+    
+
+class UserSession(Base):
+    __tablename__ = 'user_sessions'
+
+    token = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     
 
 class Travel(Base):
@@ -25,6 +39,14 @@ class Travel(Base):
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     image_url = Column(String, nullable=True)
+    # Число мест (NULL — без ограничения) и число забронированных; см. routes/order.py.
+    capacity = Column(Integer, nullable=True)
+    seats_booked = Column(Integer, default=0, server_default="0", nullable=False)
+    # Агрегаты отзывов, обновляются вместе с отзывами (services/rating_services.py).
+    rating_sum = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_count = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_avg = Column(Float, default=0.0, server_default="0", nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
     city_id = Column(Integer, ForeignKey('cities.id'), nullable=False)
     city = relationship("City", back_populates="travels")
@@ -35,6 +57,17 @@ class Travel(Base):
     orders = relationship("Order", back_populates="travel")
     reviews = relationship("Review", back_populates="travel")
 
+    __table_args__ = (
+        Index("ux_travels_name", "name", unique=True),
+        Index("ix_travels_city_id_id", "city_id", "id"),
+        Index("ix_travels_city_id_start_date", "city_id", "start_date"),
+        Index("ix_travels_price", "price"),
+        Index("ix_travels_start_date", "start_date"),
+        Index("ix_travels_end_date", "end_date"),
+        Index("ix_travels_duration_price", "duration", "price"),
+        Index("ix_travels_rating_avg", "rating_avg"),
+    )
+
 class TourGuide(Base):
     __tablename__ = 'tour_guides'
     
@@ -43,12 +76,17 @@ class TourGuide(Base):
     experience_years = Column(Integer, nullable=True)
     bio = Column(Text, nullable=True)
     contact_info = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
     city_id = Column(Integer, ForeignKey('cities.id'), nullable=False)
     city = relationship("City", back_populates="tour_guides")
     
     travels = relationship("Travel", back_populates="guide")
 
+    __table_args__ = (
+        Index("ux_tour_guides_name", "name", unique=True),
+    )
+
 class City(Base):
     __tablename__ = 'cities'
     
@@ -56,6 +94,7 @@ class City(Base):
     name = Column(String, unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
     image_url = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     travels = relationship("Travel", back_populates="city")
     tour_guides = relationship("TourGuide", back_populates="city")  
@@ -70,10 +109,17 @@ class Order(Base):
     travel_id = Column(Integer, ForeignKey('travels.id'), nullable=False)
     order_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     status = Column(String, default="в ожидании", nullable=False)
+    idempotency_key = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
     user = relationship("User", back_populates="orders")
     travel = relationship("Travel", back_populates="orders")
 
+    __table_args__ = (
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        Index("ux_orders_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+
 class Review(Base):
     __tablename__ = 'reviews'
     
@@ -83,6 +129,31 @@ class Review(Base):
     rating = Column(Integer, nullable=False)
     comment = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
     user = relationship("User", back_populates="reviews")
-    travel = relationship("Travel", back_populates="reviews")
\ No newline at end of file
+    travel = relationship("Travel", back_populates="reviews")
+
+
+class TableVersion(Base):
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class CityPage(Base):
+    """Готовый JSON страницы города; пересобирается при изменении связанных данных (database/city_pages.py)."""
+    __tablename__ = 'city_pages'
+
+    city_id = Column(Integer, primary_key=True)
+    body = Column(LargeBinary, nullable=False)
+    built_at = Column(DateTime, nullable=False)
+
+
+import database.fulltext  # noqa: E402,F401  триггеры полнотекстового индекса для create_all
+# Страницы городов раньше версий: before_commit вызывается в порядке регистрации,
+# и строка table_versions блокируется последней, перед самым commit.
+import database.city_pages  # noqa: E402,F401  пересборка страниц городов при изменениях
+import database.versioning  # noqa: E402,F401  счетчики версий таблиц для ETag
@@ -0,0 +1,116 @@
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+from utils.metrics import Histogram
+from utils.settings import DatabaseSettings
+
+
+class PoolMetrics:
+    """
+    Счетчики пула соединений: сколько раз и как долго запросы ждали соединение.
+    Время ожидания включает открытие нового соединения, если пул его создавал.
+    `wait` — гистограмма ожидания для /metrics, окно последних ожиданий — для p95 в /debug/pool.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait = Histogram()
+        self._recent = deque(maxlen=window)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.wait.observe(seconds)
+        self._recent.append(seconds)
+
+    def snapshot(self, pool) -> dict:
+        recent = sorted(self._recent)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        return {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_total / max(self.checkouts + self.timeouts, 1) * 1000, 3),
+            "wait_ms_p95": round(p95 * 1000, 3),
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+        }
+
+
+class TimedPoolMixin:
+    """Замеряет время получения соединения из пула с очередью."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(settings: DatabaseSettings, url: str, is_async: bool, single_writer: bool = False) -> dict:
+    """
+    Аргументы create_engine/create_async_engine для URL:
+
+    - SQLite в памяти — StaticPool: все сессии должны видеть одну и ту же базу;
+    - файловый SQLite — пул с очередью без pre-ping и recycle: соединения локальные и не рвутся;
+      с `single_writer` в пуле одно соединение: SQLite все равно пишет по одному, а ждать
+      в очереди пула дешевле, чем в busy_timeout с удерживаемой блокировкой;
+    - Postgres и прочие серверные базы — пул с очередью со всеми параметрами из настроек.
+    """
+    url = make_url(url)
+    options = {"echo": settings.echo}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool
+            return options
+    else:
+        options.update(pool_recycle=settings.pool_recycle, pool_pre_ping=settings.pool_pre_ping)
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+    )
+    if single_writer and url.get_backend_name() == "sqlite":
+        options.update(pool_size=1, max_overflow=0)
+    return options
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return {"pool": type(pool).__name__}
+    return metrics.snapshot(pool)
@@ -0,0 +1,151 @@
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+from utils.metrics import current_request, route_label
+
+logger = logging.getLogger("myapi.slow_query")
+
+# Списки параметров IN (?, ?, ?) разной длины считаются одной формой запроса.
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%s|\$\d+|:\w+)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+PLAN_SAVEPOINT = "slow_query_plan"
+
+
+def statement_shape(statement: str) -> str:
+    return _SPACES.sub(" ", _IN_LIST.sub("(?, ...)", statement)).strip()
+
+
+def parameter_types(parameters: Any) -> Any:
+    """
+    Типы параметров вместо значений: в параметрах бывают токены сессий, пароли и адреса,
+    а журнал и отчет /debug/slow_queries не должны их хранить.
+    """
+    if isinstance(parameters, dict):
+        return {key: parameter_types(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [parameter_types(value) for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов: каждый запрос дольше `threshold_ms` пишется в лог
+    с типами параметров и маршрутом, а запросы одной формы собираются в одну запись
+    для отчета /debug/slow_queries. Значения параметров не сохраняются.
+
+    При первом попадании формы в журнал выполняется EXPLAIN с теми же параметрами:
+    EXPLAIN QUERY PLAN в SQLite и EXPLAIN в Postgres. EXPLAIN выполняется в той же
+    транзакции внутри SAVEPOINT: ошибка EXPLAIN в Postgres иначе прервала бы транзакцию
+    запроса. С `analyze` SELECT в Postgres разбираются через EXPLAIN (ANALYZE, BUFFERS),
+    который выполняет запрос повторно.
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool = True, analyze: bool = False, max_shapes: int = 500):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.analyze = analyze
+        self.max_shapes = max_shapes
+        self.entries: Dict[str, dict] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def install(self, engine) -> None:
+        engine = getattr(engine, "sync_engine", engine)
+        event.listen(engine, "before_cursor_execute", self._start)
+        event.listen(engine, "after_cursor_execute", self._finish)
+
+    def uninstall(self, engine) -> None:
+        engine = getattr(engine, "sync_engine", engine)
+        event.remove(engine, "before_cursor_execute", self._start)
+        event.remove(engine, "after_cursor_execute", self._finish)
+
+    def _start(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slowlog_started = time.perf_counter()
+
+    def _finish(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        seconds = time.perf_counter() - context._slowlog_started
+        if seconds >= self.threshold:
+            self.record(conn, statement, parameters, executemany, seconds)
+
+    def record(self, conn, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+        stats = current_request.get()
+        route = f"{stats.scope['method']} {route_label(stats.scope)}" if stats is not None else None
+        if executemany and parameters:
+            parameters = parameters[0]
+        shape = statement_shape(statement)
+        entry = self.entries.get(shape)
+        if entry is None:
+            if len(self.entries) >= self.max_shapes:
+                del self.entries[min(self.entries, key=lambda key: self.entries[key]["total_ms"])]
+            entry = self.entries[shape] = {
+                "statement": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": [],
+                "plan": self.capture_plan(conn, statement, parameters) if self.explain else None,
+            }
+        milliseconds = seconds * 1000
+        entry["count"] += 1
+        entry["total_ms"] += milliseconds
+        entry["max_ms"] = max(entry["max_ms"], milliseconds)
+        entry["parameter_types"] = parameter_types(parameters)
+        if route is not None and route not in entry["routes"]:
+            entry["routes"].append(route)
+        logger.warning(
+            "slow query %.1f ms [%s]: %s; parameter types=%s; plan=%s",
+            milliseconds, route or "-", shape, entry["parameter_types"], entry["plan"],
+        )
+
+    def capture_plan(self, conn, statement: str, parameters: Any) -> Optional[list]:
+        keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        dialect = conn.dialect.name
+        if dialect == "sqlite" and keyword in EXPLAINABLE:
+            prefix = "EXPLAIN QUERY PLAN "
+        elif dialect == "postgresql" and self.analyze and keyword in ("SELECT", "WITH"):
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        elif dialect == "postgresql" and keyword in EXPLAINABLE:
+            prefix = "EXPLAIN "
+        else:
+            return None
+        # Курсор DBAPI, а не conn.execute: EXPLAIN не должен снова пройти через события движка.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {PLAN_SAVEPOINT}")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except Exception as error:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {PLAN_SAVEPOINT}")
+                return [f"EXPLAIN failed: {error}"]
+            finally:
+                cursor.execute(f"RELEASE SAVEPOINT {PLAN_SAVEPOINT}")
+        except Exception as error:
+            return [f"EXPLAIN failed: {error}"]
+        finally:
+            cursor.close()
+        return [row[-1] for row in rows]
+
+    def top(self, limit: int = 10) -> list:
+        ranked = sorted(self.entries.values(), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                **entry,
+                "total_ms": round(entry["total_ms"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                "full_scan": any(str(step).startswith("SCAN ") for step in entry["plan"] or []),
+            }
+            for entry in ranked
+        ]
+
+    def clear(self) -> None:
+        self.entries.clear()
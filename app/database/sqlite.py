@@ -0,0 +1,68 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from utils.settings import DatabaseSettings
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas(settings: DatabaseSettings, read_only: bool = False) -> list:
+    """
+    Профиль SQLite для конкурентной нагрузки:
+
+    - WAL: читатели не блокируются писателем, а писатель — читателями;
+    - synchronous=NORMAL: в режиме WAL безопасно при падении процесса, fsync только на чекпоинте;
+    - mmap_size и cache_size (отрицательное значение — в КиБ): чтение страниц без системных вызовов;
+    - busy_timeout: при занятой блокировке ждать, а не сразу отвечать `database is locked`.
+
+    Соединения движка для чтения дополнительно получают query_only; режим журнала
+    они не меняют, он хранится в файле базы и задается писателем.
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size = {settings.sqlite_cache_size}",
+    ]
+    if read_only:
+        return pragmas + ["PRAGMA query_only = ON"]
+    return [f"PRAGMA journal_mode = {settings.sqlite_journal_mode}"] + pragmas
+
+
+def install_sqlite_pragmas(engine, settings: DatabaseSettings, read_only: bool = False) -> None:
+    """Выполняет sqlite_pragmas на каждом новом соединении движка (синхронного или async)."""
+    engine = getattr(engine, "sync_engine", engine)
+    pragmas = sqlite_pragmas(settings, read_only)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def use_immediate_transactions(engine) -> None:
+    """
+    Каждая транзакция движка начинается с BEGIN IMMEDIATE: блокировка записи берется
+    сразу и ожидается по busy_timeout. При обычном BEGIN транзакция, которая сначала
+    читает, а потом пишет, получает `database is locked` без ожидания, если другой
+    писатель успел зафиксировать изменения после ее чтения.
+
+    Включается только для движка записи при отдельном движке для чтения: иначе
+    GET-запросы тоже выстраивались бы в очередь за блокировкой записи.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        # Драйвер сам открывает транзакцию отложенным BEGIN; отключаем, BEGIN выдает событие ниже.
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
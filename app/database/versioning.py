@@ -0,0 +1,73 @@
+import datetime
+import itertools
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from database.models import TableVersion
+
+# Таблицы, версии которых читают ETag (utils/conditional.py). Заказы и отзывы меняют
+# путешествия (места, рейтинг) отдельным UPDATE, поэтому свои счетчики им не нужны.
+TRACKED_TABLES = ("cities", "travels", "tour_guides")
+
+CHANGED_TABLES = "changed_tables"
+
+
+def changed_tables(session: Session) -> set:
+    return session.info.setdefault(CHANGED_TABLES, set())
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_flushed_tables(session, flush_context, instances):
+    tables = changed_tables(session)
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table in TRACKED_TABLES:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml_tables(orm_execute_state):
+    # Массовые INSERT/UPDATE/DELETE через session.execute() не проходят через flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and table.name in TRACKED_TABLES:
+            changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_table_versions(session):
+    """
+    Увеличивает версии измененных таблиц в той же транзакции, что и сами изменения,
+    поэтому версия видна всем воркерам ровно тогда, когда видны данные, а ошибка
+    при увеличении откатывает и запись.
+
+    Цена точности: в базах с блокировками строк (Postgres) строка table_versions
+    таблицы заблокирована от этого UPDATE до конца commit, и записи в одну таблицу
+    фиксируются по очереди. Поэтому UPDATE выполняется последним, перед самым commit,
+    и только для таблиц, которые читают ETag; бронирования и отзывы задевают только
+    счетчик travels (места и рейтинг есть в ответе путешествия).
+    """
+    session.flush()
+    tables = session.info.pop(CHANGED_TABLES, None)
+    if not tables:
+        return
+    session.connection().execute(
+        update(TableVersion.__table__)
+        .where(TableVersion.table_name.in_(sorted(tables)))
+        .values(version=TableVersion.version + 1, updated_at=datetime.datetime.utcnow())
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_tables(session):
+    session.info.pop(CHANGED_TABLES, None)
+
+
+@event.listens_for(TableVersion.__table__, "after_create")
+def _seed_table_versions(target, connection, **kw):
+    now = datetime.datetime.utcnow()
+    connection.execute(insert(target), [
+        {"table_name": table, "version": 0, "updated_at": now} for table in TRACKED_TABLES
+    ])
+
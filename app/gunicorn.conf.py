@@ -0,0 +1,92 @@
+"""
+Конфигурация gunicorn для запуска в production: несколько процессов с воркерами uvicorn.
+
+Запуск из каталога app (файл подхватывается автоматически):
+
+    gunicorn main:app
+
+Параметры берутся из ServerSettings (SERVER_* или секция [server] в MYAPI_CONFIG).
+Приложение импортируется один раз в мастере (preload_app) и наследуется воркерами
+при fork: воркеры стартуют быстрее и делят страницы памяти с импортированным кодом.
+Мапперы и схема OpenAPI готовятся в мастере (when_ready), каждый воркер до приема
+запросов проходит прогрев в lifespan (utils/warmup.py).
+
+Сессии в памяти (SESSION_BACKEND=memory) видны только своему процессу, поэтому при
+нескольких воркерах по умолчанию используется таблица user_sessions, а явно заданный
+memory останавливает запуск.
+"""
+import configparser
+import os
+import sys
+
+# Конфиг читается до того, как gunicorn добавит рабочий каталог в sys.path.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+
+from utils.settings import CONFIG_ENV, load_server_settings, load_session_settings  # noqa: E402
+
+settings = load_server_settings()
+
+
+def available_cores() -> int:
+    """Ядра, доступные процессу (учитывает taskset и cpuset контейнера), а не все ядра машины."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _backend_configured(environ) -> bool:
+    if "SESSION_BACKEND" in environ:
+        return True
+    parser = configparser.ConfigParser()
+    return bool(environ.get(CONFIG_ENV) and parser.read(environ[CONFIG_ENV]) and parser.has_option("sessions", "backend"))
+
+
+def configure_sessions(workers: int, environ=os.environ) -> str:
+    """
+    Хранилище сессий для `workers` процессов. Должно быть выбрано до импорта приложения:
+    utils/sessions.py создает его при импорте.
+    """
+    backend = load_session_settings(environ).backend
+    if workers > 1 and backend == "memory":
+        if _backend_configured(environ):
+            # Токен, выданный одним воркером, другой не узнает: /user/me ответит 401.
+            raise RuntimeError(
+                f"SESSION_BACKEND=memory does not work with {workers} workers; use database or signed."
+            )
+        environ["SESSION_BACKEND"] = backend = "database"
+    return backend
+
+
+bind = settings.bind
+pythonpath = APP_DIR
+# Воркер uvicorn асинхронный и держит много запросов сразу, поэтому процесс на ядро,
+# а не 2 * ядра + 1, как для синхронных воркеров.
+workers = settings.workers or available_cores()
+session_backend = configure_sessions(workers)
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = settings.timeout
+graceful_timeout = settings.graceful_timeout
+keepalive = settings.keepalive
+
+
+def when_ready(server):
+    # При preload_app приложение уже импортировано в мастере: мапперы и схема OpenAPI
+    # настраиваются здесь один раз, и воркеры получают их готовыми после fork.
+    from main import app
+    from utils.warmup import configure_models
+
+    configure_models()
+    app.openapi()
+
+
+def post_fork(server, worker):
+    # В мастере движки только созданы, но на случай открытых до fork соединений
+    # воркер начинает с пустыми пулами, не закрывая соединения родителя.
+    from database.connect import async_engine, async_read_engine, engine
+
+    engine.dispose(close=False)
+    for bound in (async_engine, async_read_engine):
+        if bound is not None:
+            bound.sync_engine.dispose(close=False)
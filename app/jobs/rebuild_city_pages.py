@@ -0,0 +1,29 @@
+"""
+Полная пересборка страниц городов (таблица city_pages).
+
+Изменения данных пересобирают страницы сами, но список ближайших путешествий
+зависит от даты, поэтому задачу нужно запускать раз в сутки, после полуночи.
+Запуск из каталога app:
+
+    python -m jobs.rebuild_city_pages
+"""
+import argparse
+import asyncio
+import json
+
+from database.city_pages import rebuild_pages
+from database.connect import async_engine
+
+
+async def main() -> int:
+    try:
+        async with async_engine.begin() as connection:
+            return await connection.run_sync(rebuild_pages)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+    print(json.dumps({"pages": asyncio.run(main())}, indent=2))
@@ -0,0 +1,34 @@
+"""
+Сверка агрегатов отзывов (rating_count, rating_sum, rating_avg) в travels с таблицей reviews.
+
+Запуск из каталога app:
+
+    python -m jobs.reconcile_ratings          # только отчет
+    python -m jobs.reconcile_ratings --fix    # исправить расхождения
+
+Код возврата 1, если найдены расхождения и они не исправлены, — для запуска по расписанию.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from database.connect import async_engine, async_session_local
+from services.rating_services import reconcile_ratings
+
+
+async def main(fix: bool) -> list:
+    try:
+        async with async_session_local() as db:
+            return await reconcile_ratings(db, fix=fix)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="Перезаписать расхождения фактическими значениями")
+    args = parser.parse_args()
+    mismatches = asyncio.run(main(args.fix))
+    print(json.dumps({"mismatches": len(mismatches), "fixed": args.fix, "travels": mismatches}, indent=2))
+    sys.exit(1 if mismatches and not args.fix else 0)
@@ -3,12 +3,30 @@ from routes.user import user_router
 from routes.city import city_router
 from routes.travel import travel_router
 from routes.review import review_router
+from routes.order import order_router
 from routes.tour_guide import tour_guide_router
+from routes.search import search_router
+from routes.debug import debug_router
+from utils.compression import CompressionMiddleware
+from utils.metrics import MetricsMiddleware
+from utils.openapi_cache import install_openapi_cache
+from utils.warmup import lifespan
 
-app = FastAPI()
+# lifespan прогревает воркер до приема запросов (utils/warmup.py).
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(CompressionMiddleware)
+# Добавлен последним, поэтому внешний: время включает сжатие ответа.
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(user_router)
 app.include_router(city_router)
 app.include_router(tour_guide_router)
 app.include_router(travel_router)
-app.include_router(review_router)
\ No newline at end of file
+app.include_router(review_router)
+app.include_router(order_router)
+app.include_router(search_router)
+app.include_router(debug_router)
+
+# Схема OpenAPI читается с диска, пока не изменился код (utils/openapi_cache.py).
+install_openapi_cache(app)
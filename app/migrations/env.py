@@ -2,8 +2,10 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
-from database.connect import Base
+import os
+from database.connect import Base, SQL_DB_URL
 from database.models import Review,Travel,Order,City,TourGuide,User
+from database.fulltext import POSTGRES_TABLE, SQLITE_TABLE
 
 target_metadata = Base.metadata
 config = context.config
@@ -13,6 +15,24 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# База из настроек приложения важнее адреса по умолчанию в alembic.ini.
+if "DATABASE_URL" in os.environ or "MYAPI_CONFIG" in os.environ:
+    config.set_main_option("sqlalchemy.url", SQL_DB_URL)
+
+
+
+def is_search_table(name) -> bool:
+    # search_index и служебные таблицы FTS5 (search_index_data, _idx, _content, _docsize, _config).
+    return name is not None and (name == POSTGRES_TABLE or name == SQLITE_TABLE or name.startswith(SQLITE_TABLE + "_"))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Полнотекстовый индекс создается своим DDL (database/fulltext.py) и не описан в Base.metadata,
+    поэтому autogenerate не должен предлагать удалить его таблицы и индексы.
+    """
+    table = name if type_ == "table" else getattr(getattr(object, "table", None), "name", None)
+    return not is_search_table(table)
 
 
 def run_migrations_offline() -> None:
@@ -22,6 +42,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -37,7 +58,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,37 @@
+"""user sessions
+
+Revision ID: 0c9d4e7a2b61
+Revises: 5e8b1f0c7d42
+Create Date: 2026-10-18 16:31:54.690213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9d4e7a2b61'
+down_revision: Union[str, None] = '5e8b1f0c7d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_sessions',
+        sa.Column('token', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('token'),
+    )
+    op.create_index(op.f('ix_user_sessions_expires_at'), 'user_sessions', ['expires_at'], unique=False)
+    op.create_index('ix_users_name_age', 'users', ['name', 'age'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_name_age', table_name='users')
+    op.drop_index(op.f('ix_user_sessions_expires_at'), table_name='user_sessions')
+    op.drop_table('user_sessions')
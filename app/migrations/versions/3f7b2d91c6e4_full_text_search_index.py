@@ -0,0 +1,32 @@
+"""full text search index
+
+Revision ID: 3f7b2d91c6e4
+Revises: 9a4c1e27b3d8
+Create Date: 2026-10-18 12:20:05.913452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.fulltext import drop_search_index_ddl, search_index_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7b2d91c6e4'
+down_revision: Union[str, None] = '9a4c1e27b3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 + триггеры в SQLite, tsvector с GIN-индексом + триггеры в Postgres;
+    # существующие строки сразу попадают в индекс.
+    for statement in search_index_ddl(op.get_bind().dialect.name, backfill=True):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in drop_search_index_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
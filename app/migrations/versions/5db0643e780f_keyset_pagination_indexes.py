@@ -0,0 +1,26 @@
+"""keyset pagination indexes
+
+Revision ID: 5db0643e780f
+Revises: ffc3b0d6afc4
+Create Date: 2026-10-18 10:12:41.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5db0643e780f'
+down_revision: Union[str, None] = 'ffc3b0d6afc4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_travels_city_id_id', 'travels', ['city_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_travels_city_id_id', table_name='travels')
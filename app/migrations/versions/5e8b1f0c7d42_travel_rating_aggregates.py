@@ -0,0 +1,38 @@
+"""travel rating aggregates
+
+Revision ID: 5e8b1f0c7d42
+Revises: e4a7c2d95b10
+Create Date: 2026-10-18 15:48:09.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b1f0c7d42'
+down_revision: Union[str, None] = 'e4a7c2d95b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('travels', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('travels', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('travels', sa.Column('rating_avg', sa.Float(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE travels SET "
+        "rating_sum = (SELECT coalesce(sum(rating), 0) FROM reviews WHERE reviews.travel_id = travels.id), "
+        "rating_count = (SELECT count(*) FROM reviews WHERE reviews.travel_id = travels.id)"
+    )
+    op.execute("UPDATE travels SET rating_avg = rating_sum * 1.0 / rating_count WHERE rating_count > 0")
+    op.create_index('ix_travels_rating_avg', 'travels', ['rating_avg'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_travels_rating_avg', table_name='travels')
+    op.drop_column('travels', 'rating_avg')
+    op.drop_column('travels', 'rating_count')
+    op.drop_column('travels', 'rating_sum')
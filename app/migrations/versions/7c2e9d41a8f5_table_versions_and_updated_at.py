@@ -0,0 +1,49 @@
+"""table versions and updated_at
+
+Revision ID: 7c2e9d41a8f5
+Revises: 3f7b2d91c6e4
+Create Date: 2026-10-18 13:05:41.220871
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9d41a8f5'
+down_revision: Union[str, None] = '3f7b2d91c6e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Список зафиксирован здесь, а не импортирован из приложения: миграция не должна меняться
+# вместе с database/versioning.py. Колонка updated_at есть во всех шести моделях.
+TABLES = ("cities", "travels", "tour_guides", "users", "reviews", "orders")
+
+
+def upgrade() -> None:
+    # Колонка добавляется без batch-режима: пересоздание таблицы в SQLite
+    # удалило бы триггеры полнотекстового индекса.
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    now = datetime.datetime.utcnow()
+    op.bulk_insert(table_versions, [
+        {'table_name': table, 'version': 0, 'updated_at': now} for table in TABLES
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
+    for table in TABLES:
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,34 @@
+"""travel search indexes
+
+Revision ID: 9a4c1e27b3d8
+Revises: 5db0643e780f
+Create Date: 2026-10-18 11:02:17.640915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c1e27b3d8'
+down_revision: Union[str, None] = '5db0643e780f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_travels_city_id_start_date', 'travels', ['city_id', 'start_date'], unique=False)
+    op.create_index('ix_travels_price', 'travels', ['price'], unique=False)
+    op.create_index('ix_travels_start_date', 'travels', ['start_date'], unique=False)
+    op.create_index('ix_travels_end_date', 'travels', ['end_date'], unique=False)
+    op.create_index('ix_travels_duration_price', 'travels', ['duration', 'price'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_travels_duration_price', table_name='travels')
+    op.drop_index('ix_travels_end_date', table_name='travels')
+    op.drop_index('ix_travels_start_date', table_name='travels')
+    op.drop_index('ix_travels_price', table_name='travels')
+    op.drop_index('ix_travels_city_id_start_date', table_name='travels')
@@ -0,0 +1,30 @@
+"""unique travel and guide names
+
+Revision ID: b61d0e8f3a27
+Revises: 7c2e9d41a8f5
+Create Date: 2026-10-18 14:10:12.584330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61d0e8f3a27'
+down_revision: Union[str, None] = '7c2e9d41a8f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Ключи для INSERT ... ON CONFLICT в пакетной загрузке. Создание упадет,
+    # если в таблице уже есть дубликаты имен: их нужно разобрать вручную.
+    op.create_index('ux_travels_name', 'travels', ['name'], unique=True)
+    op.create_index('ux_tour_guides_name', 'tour_guides', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_tour_guides_name', table_name='tour_guides')
+    op.drop_index('ux_travels_name', table_name='travels')
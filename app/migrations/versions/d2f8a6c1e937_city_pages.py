@@ -0,0 +1,36 @@
+"""city pages
+
+Revision ID: d2f8a6c1e937
+Revises: 0c9d4e7a2b61
+Create Date: 2026-10-18 19:12:40.381527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.city_pages import rebuild_pages
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a6c1e937'
+down_revision: Union[str, None] = '0c9d4e7a2b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'city_pages',
+        sa.Column('city_id', sa.Integer(), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('built_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('city_id'),
+    )
+    # Страницы для уже существующих городов.
+    rebuild_pages(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table('city_pages')
@@ -0,0 +1,39 @@
+"""orders capacity and idempotency
+
+Revision ID: e4a7c2d95b10
+Revises: b61d0e8f3a27
+Create Date: 2026-10-18 15:02:37.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d95b10'
+down_revision: Union[str, None] = 'b61d0e8f3a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('travels', sa.Column('capacity', sa.Integer(), nullable=True))
+    op.add_column('travels', sa.Column('seats_booked', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index('ix_orders_user_id_id', 'orders', ['user_id', 'id'], unique=False)
+    op.create_index('ux_orders_user_id_idempotency_key', 'orders', ['user_id', 'idempotency_key'], unique=True)
+    # Уже существующие заказы занимают места.
+    op.execute(
+        "UPDATE travels SET seats_booked = (SELECT count(*) FROM orders "
+        "WHERE orders.travel_id = travels.id AND orders.status <> 'отменен')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_orders_user_id_idempotency_key', table_name='orders')
+    op.drop_index('ix_orders_user_id_id', table_name='orders')
+    op.drop_column('orders', 'idempotency_key')
+    op.drop_column('travels', 'seats_booked')
+    op.drop_column('travels', 'capacity')
@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    items: List[BulkItemResult]
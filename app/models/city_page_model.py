@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from models.city_model import CityResponse
+
+
+class CityPageGuide(BaseModel):
+    id: int
+    name: str
+    experience_years: Optional[int] = None
+    bio: Optional[str] = None
+    contact_info: Optional[str] = None
+
+
+class CityPageTravel(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    price: float
+    duration: str
+    start_date: date
+    end_date: date
+    image_url: Optional[str] = None
+    capacity: Optional[int] = None
+    rating_avg: float = 0.0
+    rating_count: int = 0
+    guide_id: Optional[int] = None
+
+
+class RatingSummary(BaseModel):
+    average: float
+    count: int
+
+
+class CityPageResponse(BaseModel):
+    city: CityResponse
+    guides: List[CityPageGuide]
+    upcoming_travels: List[CityPageTravel]
+    rating: RatingSummary
+    built_at: datetime
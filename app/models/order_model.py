@@ -1,15 +1,19 @@
-from database.models import User
+from pydantic import BaseModel
 from models.travel_model import TravelResponse
+from models.user_model import UserResponse
 from utils.classes import OrderBase
 
 
-class OrderCreate(OrderBase):
+class OrderCreate(BaseModel):
     user_id: int
     travel_id: int
 
+class OrderStatusUpdate(BaseModel):
+    status: str
+
 class OrderResponse(OrderBase):
     id: int
-    user: User
+    user: UserResponse
     travel: TravelResponse
     class Config:
         orm_mode = True
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    rank: float
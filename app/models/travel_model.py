@@ -10,6 +10,9 @@ class TravelCreate(TravelBase):
 
 class TravelResponse(TravelBase):
     id: int
+    seats_booked: int = 0
+    rating_avg: float = 0.0
+    rating_count: int = 0
     city: Optional[CityResponse] = None
     guide: Optional[TourGuideResponse] = None
     class Config:
@@ -1,15 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database.models import City, Travel
+from database.models import City, CityPage, Travel
+from models.bulk_model import BulkResult
 from models.city_model import CityCreate, CityResponse
+from models.city_page_model import CityPageResponse
 from models.travel_model import TravelResponse
+from services.bulk_services import bulk_upsert, check_batch_size
+from services.travel_services import TRAVEL_SHAPE, select_travel_rows
+from utils.cache import catalog_cache
+from utils.classes import Page
+from utils.compression import EncodedBody, PrecompressedResponse
+from utils.conditional import conditional
 from utils.helpers import get_db
+from utils.pagination import PageParams, paginate
+from utils.serialization import RawJSONResponse, page_response
 
 city_router = APIRouter()
 
 @city_router.post("/city/create",  tags=["City"], summary="Создать новый город", response_model=CityResponse)
-async def create_city(city: CityCreate, db: Session = Depends(get_db)) -> CityResponse:
+async def create_city(city: CityCreate, db: AsyncSession = Depends(get_db)) -> CityResponse:
     """
     Создает новый город.
     
@@ -19,7 +30,7 @@ async def create_city(city: CityCreate, db: Session = Depends(get_db)) -> CityRe
 
     Возвращает созданный объект города.
     """
-    existing_city = db.query(City).filter(City.name == city.name).first()
+    existing_city = await db.scalar(select(City).where(City.name == city.name).limit(1))
     if existing_city:
         raise HTTPException(status_code=400, detail="City with this name already exists.")
     db_city = City(
@@ -28,26 +39,60 @@ async def create_city(city: CityCreate, db: Session = Depends(get_db)) -> CityRe
         image_url=city.image_url
     )
     db.add(db_city)
-    db.commit()
-    db.refresh(db_city)
+    await db.commit()
+    await db.refresh(db_city)
+    catalog_cache.invalidate("cities", "tour_guides")
     return db_city
 
 
-@city_router.get("/cities", tags=["City"], summary="Получает список всех городов",response_model=list[CityResponse])
-async def get_cities(db: Session = Depends(get_db)) -> list[City]:
+@city_router.post("/cities/bulk", tags=["City"], summary="Пакетное создание и обновление городов", response_model=BulkResult)
+async def bulk_upsert_cities(cities: List[CityCreate], db: AsyncSession = Depends(get_db)) -> dict:
     """
-    Получает список всех городов.
-    Возвращает список объектов городов.
+    Создает или обновляет города пакетом, сопоставляя их по названию.
+
+    - **cities**: Массив объектов городов в формате `/city/create`.
+
+    Весь пакет пишется одной транзакцией.
+    Возвращает счетчики и результат для каждого элемента: `created`, `updated` или `error`.
+    """
+    check_batch_size(cities)
+    result = await bulk_upsert(db, City, [city.dict() for city in cities])
+    catalog_cache.invalidate("cities", "tour_guides")
+    return result
+
+
+@city_router.get("/cities", tags=["City"], summary="Получает список всех городов",response_model=Page[CityResponse])
+async def get_cities(
+    response: Response,
+    page: PageParams = Depends(),
+    validators: dict = Depends(conditional("cities")),
+    db: AsyncSession = Depends(get_db),
+) -> PrecompressedResponse:
+    """
+    Получает список всех городов постранично.
+
+    - **limit**: Количество городов на странице.
+    - **after**: Курсор следующей страницы (`next_cursor` из предыдущего ответа).
+
+    Возвращает страницу объектов городов и `next_cursor`.
+    Результат берется из кэша справочников, если он там есть, вместе со сжатыми вариантами.
+    Поддерживает условные запросы: `If-None-Match` / `If-Modified-Since` → 304.
     """
-    cities = db.query(City).all()
-    return cities
+    async def load():
+        result = Page[CityResponse].model_validate(await paginate(db, select(City), City.id, page), from_attributes=True)
+        return EncodedBody.from_model(result)
+
+    # ETag в ключе: запись на другом воркере не сбрасывает здешний кэш, но меняет версию таблицы,
+    # и новый ETag никогда не уходит вместе со старой страницей.
+    body = await catalog_cache.get_or_load("cities", ("page", page.limit, page.after, validators["ETag"]), load)
+    return PrecompressedResponse(body, response.headers)
 
 
 @city_router.get("/city", tags=["City"], summary="Ищет город по ID или по фильтру",response_model=CityResponse)
 async def search_city(
         id: int = Query(None, ge=1, le=50, description="ID города для поиска. Должен быть в пределах от 1 до 50."),
         filter: str = Query(None, description="Часть названия города для фильтрации.")
-    , db: Session = Depends(get_db)) -> CityResponse:
+    , db: AsyncSession = Depends(get_db)) -> PrecompressedResponse:
     """
     Ищет город по ID или по фильтру.
     Вы можете передать либо `id`, либо `filter` для выполнения поиска.
@@ -57,19 +102,21 @@ async def search_city(
 
     Если город не найден, возвращает ошибку 404.
     """
-    query = db.query(City)
-    if id is not None:
-        city = query.filter(City.id == id).first()
-    else:
-        city = None
-    if filter:
-        city = query.filter(City.name.ilike(f"%{filter}%")).first()
-    if not city:
-        raise HTTPException(status_code=404, detail="City not found")
-    return city
+    async def load():
+        if id is not None:
+            city = await db.get(City, id)
+        else:
+            city = None
+        if filter:
+            city = await db.scalar(select(City).where(City.name.ilike(f"%{filter}%")).limit(1))
+        if not city:
+            raise HTTPException(status_code=404, detail="City not found")
+        return EncodedBody.from_model(CityResponse.model_validate(city, from_attributes=True))
+
+    return PrecompressedResponse(await catalog_cache.get_or_load("cities", ("search", id, filter), load))
 
 @city_router.delete("/city/{city_id}", tags=["City"], summary="Удаляет город по ID",response_model=dict)
-async def delete_city(city_id: int, db: Session = Depends(get_db)) -> dict:
+async def delete_city(city_id: int, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Удаляет город по ID.
 
@@ -77,16 +124,17 @@ async def delete_city(city_id: int, db: Session = Depends(get_db)) -> dict:
 
     Возвращает сообщение об успешном удалении.
     """
-    city = db.query(City).filter(City.id == city_id).first()
+    city = await db.get(City, city_id)
     if city is None:
         raise HTTPException(status_code=404, detail="City not found")
-    db.delete(city)
-    db.commit()
+    await db.delete(city)
+    await db.commit()
+    catalog_cache.invalidate("cities", "tour_guides")
     return {"message": "City deleted successfully"}
 
 
 @city_router.put("/city/{city_id}", tags=["City"], summary="Обновляет информацию о городе",response_model=CityResponse)
-async def update_city(city_id: int, city: CityCreate, db: Session = Depends(get_db)) -> CityResponse:
+async def update_city(city_id: int, city: CityCreate, db: AsyncSession = Depends(get_db)) -> CityResponse:
     """
     Обновляет информацию о городе.
 
@@ -95,25 +143,46 @@ async def update_city(city_id: int, city: CityCreate, db: Session = Depends(get_
 
     Возвращает обновленный объект города.
     """
-    db_city = db.query(City).filter(City.id == city_id).first()
+    db_city = await db.get(City, city_id)
     if not db_city:
         raise HTTPException(status_code=404, detail="City not found.")
     db_city.name = city.name  # type: ignore
     db_city.description = city.description  # type: ignore
     db_city.image_url = city.image_url  # type: ignore
-    db.commit()
-    db.refresh(db_city)
+    await db.commit()
+    await db.refresh(db_city)
+    catalog_cache.invalidate("cities", "tour_guides")
     return db_city
 
 
-@city_router.get('/city/{city_id}/travels', tags=["City"], summary="Поиск вес travels в укащанов гораде",response_model=list[TravelResponse])
-async def get_travels_by_city(city_id: int, db: Session = Depends(get_db)) -> List[Travel]:
+@city_router.get('/city/{city_id}/travels', tags=["City"], summary="Поиск вес travels в укащанов гораде",response_model=Page[TravelResponse])
+async def get_travels_by_city(city_id: int, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)) -> RawJSONResponse:
     """
     поиск вес travels в укащанов гораде.
 
     - **city_id**: ID города для обновления.
+    - **limit**: Количество путешествий на странице.
+    - **after**: Курсор следующей страницы.
 
-    Возвращает travels в указаном городе.
+    Возвращает страницу travels в указаном городе.
     """
-    travels = db.query(Travel).filter(Travel.city_id == city_id).all()
-    return travels
\ No newline at end of file
+    query = select_travel_rows().where(Travel.city_id == city_id)
+    return page_response(TRAVEL_SHAPE, await paginate(db, query, Travel.id, page, scalars=False))
+
+
+@city_router.get('/city/{city_id}/page', tags=["City"], summary="Страница города одним запросом", response_model=CityPageResponse)
+async def get_city_page(city_id: int, db: AsyncSession = Depends(get_db)) -> RawJSONResponse:
+    """
+    Страница города: сам город, его гиды, ближайшие путешествия (до 50, по дате начала)
+    и сводка рейтинга по всем путешествиям города.
+
+    - **city_id**: ID города.
+
+    Документ собирается заранее при изменении города, его путешествий, гидов и отзывов
+    и отдается готовыми байтами одним чтением по ключу. Поле `built_at` — время сборки.
+    Если город не найден, возвращает ошибку 404.
+    """
+    body = await db.scalar(select(CityPage.body).where(CityPage.city_id == city_id))
+    if body is None:
+        raise HTTPException(status_code=404, detail="City not found")
+    return RawJSONResponse(body)
@@ -0,0 +1,101 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from database.connect import async_engine, async_read_engine, slow_query_log
+from database.pool import pool_stats
+from utils.cache import catalog_cache
+from utils.metrics import metrics
+from utils.settings import DebugSettings, load_debug_settings
+
+debug_router = APIRouter()
+
+# Доступ к /debug/*; выбирается переменной DEBUG_TOKEN.
+debug_settings = load_debug_settings()
+
+
+def get_debug_settings() -> DebugSettings:
+    return debug_settings
+
+
+def require_debug_token(
+    x_debug_token: Optional[str] = Header(None),
+    settings: DebugSettings = Depends(get_debug_settings),
+) -> None:
+    """
+    Отладочные маршруты показывают SQL, планы запросов и внутреннее состояние процесса,
+    поэтому без DEBUG_TOKEN их нет (404), а без верного заголовка X-Debug-Token — 403.
+    """
+    if not settings.token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_debug_token is None or not hmac.compare_digest(x_debug_token.encode(), settings.token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+debug_only = [Depends(require_debug_token)]
+
+
+@debug_router.get('/debug/cache', tags=["Debug"], dependencies=debug_only, summary="Статистика кэша справочников")
+async def cache_stats() -> dict:
+    """
+    Возвращает счетчики кэша справочников: попадания, промахи, вытеснения,
+    истекшие записи, сбросы и текущий размер.
+    """
+    return catalog_cache.stats()
+
+
+@debug_router.get('/debug/pool', tags=["Debug"], dependencies=debug_only, summary="Состояние пула соединений с базой")
+async def pool_metrics() -> dict:
+    """
+    Возвращает размер пула, число занятых и простаивающих соединений, переполнение,
+    а также число выдач соединений, таймауты и время ожидания соединения (среднее, p95, max).
+    Если включен движок для чтения, его пул описан в поле `read`.
+    Те же счетчики и гистограмма ожидания для Prometheus — в /metrics (db_pool_*).
+    """
+    stats = pool_stats(async_engine)
+    if async_read_engine is not None:
+        stats["read"] = pool_stats(async_read_engine)
+    return stats
+
+
+@debug_router.get('/metrics', tags=["Debug"], summary="Метрики в формате Prometheus", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Возвращает метрики для Prometheus: число запросов по маршрутам и статусам,
+    гистограммы времени ответа и времени SQL-запросов, число SQL-запросов,
+    число запросов в обработке, а также состояние пулов соединений с базой
+    и гистограмму ожидания соединения (метка `pool`: `write` или `read`).
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@debug_router.get('/debug/slow_queries', tags=["Debug"], dependencies=debug_only, summary="Самые медленные запросы к базе")
+async def slow_queries(limit: int = Query(10, ge=1, le=100, description="Сколько форм запросов вернуть.")) -> dict:
+    """
+    Возвращает формы SQL-запросов дольше порога `DB_SLOW_QUERY_MS`, упорядоченные
+    по суммарному времени: число вызовов, суммарное, среднее и максимальное время,
+    маршруты, типы параметров последнего вызова и план запроса (`full_scan` — в плане есть полный проход таблицы).
+    """
+    return {
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": slow_query_log.top(limit),
+    }
+
+
+@debug_router.delete('/debug/slow_queries', tags=["Debug"], dependencies=debug_only, summary="Очищает журнал медленных запросов")
+async def clear_slow_queries() -> dict:
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
+@debug_router.get('/debug/warmup', tags=["Debug"], dependencies=debug_only, summary="Время прогрева воркера при старте")
+async def warmup_timings(request: Request) -> dict:
+    """
+    Возвращает время шагов прогрева этого воркера в миллисекундах: открытие соединений,
+    загрузка справочников в кэш, построение схемы OpenAPI и общее время.
+    `enabled: false`, если прогрев отключен (SERVER_WARMUP=0) или приложение запущено без lifespan.
+    """
+    timings = getattr(request.app.state, "warmup", None)
+    return {"enabled": timings is not None, **(timings or {})}
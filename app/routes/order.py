@@ -0,0 +1,77 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import Order, User
+from models.order_model import OrderCreate, OrderResponse, OrderStatusUpdate
+from services.order_services import change_status, create_order, select_orders
+from utils.classes import Page
+from utils.helpers import get_db
+from utils.pagination import PageParams, paginate
+
+order_router = APIRouter()
+
+
+@order_router.post('/order/create', tags=["Orders"], summary="Бронирует место в путешествии", response_model=OrderResponse)
+async def book_travel(
+    order: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    db: AsyncSession = Depends(get_db),
+) -> Order:
+    """
+    Создает заказ и занимает одно место в путешествии.
+
+    - **user_id**: ID пользователя.
+    - **travel_id**: ID путешествия.
+    - **Idempotency-Key** (заголовок): повторный запрос с тем же ключом от того же
+      пользователя вернет уже созданный заказ, а не забронирует еще одно место;
+      тот же ключ с другим travel_id вернет ошибку 422.
+
+    Если мест не осталось, возвращает ошибку 409; если нет пользователя или путешествия — 404.
+    """
+    return await create_order(db, order.user_id, order.travel_id, idempotency_key)
+
+
+@order_router.get('/order/{order_id}', tags=["Orders"], summary="Получает заказ по ID", response_model=OrderResponse)
+async def get_order(order_id: int, db: AsyncSession = Depends(get_db)) -> Order:
+    """
+    Получает заказ по его ID.
+
+    - **order_id**: ID заказа.
+
+    Если заказ не найден, возвращает ошибку 404.
+    """
+    order = await db.scalar(select_orders().where(Order.id == order_id))
+    if order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+
+@order_router.get('/user/{user_id}/orders', tags=["Orders"], summary="Получает заказы пользователя", response_model=Page[OrderResponse])
+async def get_user_orders(user_id: int, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Получает заказы пользователя постранично.
+
+    - **user_id**: ID пользователя.
+    - **limit**: Количество заказов на странице.
+    - **after**: Курсор следующей страницы.
+
+    Если пользователь не найден, возвращает ошибку 404.
+    """
+    if await db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await paginate(db, select_orders().where(Order.user_id == user_id), Order.id, page)
+
+
+@order_router.put('/order/{order_id}/status', tags=["Orders"], summary="Меняет статус заказа", response_model=OrderResponse)
+async def update_order_status(order_id: int, update: OrderStatusUpdate, db: AsyncSession = Depends(get_db)) -> Order:
+    """
+    Меняет статус заказа.
+
+    - **order_id**: ID заказа.
+    - **status**: Новый статус: `подтвержден`, `отменен` или `завершен`.
+
+    Допустимые переходы: `в ожидании` → `подтвержден` / `отменен`,
+    `подтвержден` → `отменен` / `завершен`. Отмена освобождает место.
+    Недопустимый переход возвращает ошибку 409.
+    """
+    return await change_status(db, order_id, update.status)
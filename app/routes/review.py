@@ -1,17 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from database.models import Review as ReviewModel
-from utils.helpers import get_db
+from utils.export import export_response
+from utils.helpers import get_db, get_session_maker
 from models.review_model import ReviewCreate, ReviewResponse
-from models.travel_model import TravelResponse
-from sqlalchemy.orm import Session, joinedload
+from utils.classes import Page
+from utils.pagination import PageParams, paginate
+from services.rating_services import apply_rating_change, change_review
+from services.travel_services import travel_relations
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 review_router = APIRouter()
 
+
+def select_reviews():
+    """Один отзыв: пользователь и путешествие со связями подгружаются JOIN-ом в том же запросе."""
+    return select(ReviewModel).options(
+        joinedload(ReviewModel.user),
+        joinedload(ReviewModel.travel).options(*travel_relations()),
+        raiseload("*"),
+    )
+
+
+def select_review_list():
+    """
+    Список отзывов: у многих отзывов одни и те же пользователи и путешествия, поэтому
+    они загружаются отдельными запросами `IN (...)` по уникальным ID, без повторения
+    строк путешествия в каждой строке отзыва. Всего три запроса на страницу.
+    """
+    return select(ReviewModel).options(
+        selectinload(ReviewModel.user),
+        selectinload(ReviewModel.travel).options(*travel_relations()),
+        raiseload("*"),
+    )
+
+
 @review_router.post('/review/create', tags=["Reviews"], summary="Создать новый отзыв", response_model=ReviewResponse)
 async def create_review(
-    review: ReviewCreate, db: Session = Depends(get_db)
+    review: ReviewCreate, db: AsyncSession = Depends(get_db)
 ) -> ReviewResponse:
     """
     Создает новый отзыв.
@@ -22,33 +50,46 @@ async def create_review(
     - **comment**: Комментарий.
     
     Возвращает созданный объект отзыва.
+    Средняя оценка и число отзывов путешествия обновляются в той же транзакции.
     """
     new_review = ReviewModel(**review.dict())
     db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
-    return ReviewResponse(
-        id=new_review.id,  # type: ignore
-        rating=new_review.rating,  # type: ignore
-        comment=new_review.comment,  # type: ignore
-        created_at=new_review.created_at,  # type: ignore
-        user_id=review.user_id,
-        travel=TravelResponse(id=review.travel_id)  # type: ignore
-    )
+    await apply_rating_change(db, review.travel_id, review.rating, 1)
+    await db.commit()
+    return await db.scalar(select_reviews().where(ReviewModel.id == new_review.id))
 
 
-@review_router.get('/reviews', tags=["Reviews"], summary="Получает список всех отзывов", response_model=List[ReviewResponse])
-async def get_reviews(db: Session = Depends(get_db)) -> List[ReviewModel]:
+@review_router.get('/reviews', tags=["Reviews"], summary="Получает список всех отзывов", response_model=Page[ReviewResponse])
+async def get_reviews(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)) -> dict:
     """
-    Получает список всех отзывов.
-    Возвращает список объектов отзывов.
+    Получает список всех отзывов постранично.
+
+    - **limit**: Количество отзывов на странице.
+    - **after**: Курсор следующей страницы.
+
+    Возвращает страницу объектов отзывов и `next_cursor`.
     """
-    reviews = db.query(ReviewModel).all()
-    return reviews
+    return await paginate(db, select_review_list(), ReviewModel.id, page)
+
+
+@review_router.get('/reviews/export', tags=["Reviews"], summary="Потоковая выгрузка всех отзывов")
+async def export_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Формат выгрузки: ndjson или csv."),
+    session_maker=Depends(get_session_maker),
+):
+    """
+    Потоковая выгрузка всех отзывов для массовых потребителей.
+
+    - **format**: `ndjson` (по умолчанию) или `csv`.
+
+    Строки читаются серверным курсором и отправляются по мере чтения.
+    """
+    query = select(*ReviewModel.__table__.columns).order_by(ReviewModel.id)
+    return export_response(session_maker, query, format, "reviews")
 
 
 @review_router.get('/review/{review_id}', tags=["Reviews"], summary="Получает отзыв по его ID", response_model=ReviewResponse)
-async def get_review(review_id: int, db: Session = Depends(get_db)) -> ReviewResponse:
+async def get_review(review_id: int, db: AsyncSession = Depends(get_db)) -> ReviewResponse:
     """
     Получает отзыв по его ID.
 
@@ -56,14 +97,14 @@ async def get_review(review_id: int, db: Session = Depends(get_db)) -> ReviewRes
 
     Если отзыв не найден, возвращает ошибку 404.
     """
-    review = db.query(ReviewModel).filter(ReviewModel.id == review_id).first()
+    review = await db.scalar(select_reviews().where(ReviewModel.id == review_id))
     if review is None:
         raise HTTPException(status_code=404, detail="Review not found")
     return review
 
 
 @review_router.delete('/review/{review_id}', tags=["Reviews"], summary="Удалить отзыв", response_model=dict)
-async def delete_review(review_id: int, db: Session = Depends(get_db)) -> dict:
+async def delete_review(review_id: int, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Удаляет отзыв по его ID.
 
@@ -71,16 +112,17 @@ async def delete_review(review_id: int, db: Session = Depends(get_db)) -> dict:
     
     Возвращает сообщение об успешном удалении.
     """
-    review = db.query(ReviewModel).filter(ReviewModel.id == review_id).first()
+    review = await db.get(ReviewModel, review_id)
     if review is None:
         raise HTTPException(status_code=404, detail="Review not found")
-    db.delete(review)
-    db.commit()
+    await db.delete(review)
+    await apply_rating_change(db, review.travel_id, -review.rating, -1)
+    await db.commit()
     return {"message": "Review deleted successfully"}
 
 
 @review_router.put('/review/{review_id}', tags=["Reviews"], summary="Изменить отзыв", response_model=ReviewResponse)
-async def update_review(review_id: int, review: ReviewCreate, db: Session = Depends(get_db)) -> ReviewResponse:
+async def update_review(review_id: int, review: ReviewCreate, db: AsyncSession = Depends(get_db)) -> ReviewResponse:
     """
     Обновляет отзыв по его ID.
 
@@ -91,20 +133,19 @@ async def update_review(review_id: int, review: ReviewCreate, db: Session = Depe
     
     Возвращает обновленный объект отзыва.
     Если отзыв с указанным ID не найден, возвращает ошибку 404.
+    Одновременные изменения одного отзыва не искажают рейтинг путешествия.
     """
-    db_review = db.query(ReviewModel).filter(ReviewModel.id == review_id).first()
-    if db_review is None:
-        raise HTTPException(status_code=404, detail="Review not found")
-    db_review.rating = review.rating
-    db_review.comment = review.comment
-    db.commit()
-    db.refresh(db_review)
-    return db_review
+    await change_review(db, review_id, review.rating, review.comment)
+    await db.commit()
+    # populate_existing: отзыв и агрегаты путешествия изменены UPDATE-ом в обход загруженных объектов.
+    return await db.scalar(
+        select_reviews().where(ReviewModel.id == review_id).execution_options(populate_existing=True)
+    )
 
 @review_router.get('/reviews/{travel_id}', tags=["Reviews"], summary="Получить отзывы для конкретного путешествия")
 async def get_reviews_for_travel(
     travel_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[ReviewResponse]:
     """
     Получает отзывы для указанного путешествия.
@@ -113,7 +154,7 @@ async def get_reviews_for_travel(
 
     Возвращает список отзывов для указанного путешествия.
     """
-    reviews = db.query(ReviewModel).filter(ReviewModel.travel_id == travel_id).all()
+    reviews = (await db.scalars(select_review_list().where(ReviewModel.travel_id == travel_id))).all()
     if not reviews:
         raise HTTPException(status_code=404, detail="Отзывы для данного путешествия не найдены")
     return reviews
@@ -0,0 +1,27 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.fulltext import SEARCH_SOURCES
+from models.search_model import SearchResult
+from services.search_services import full_text_search
+from utils.helpers import get_db
+
+search_router = APIRouter()
+
+@search_router.get('/search', tags=["Search"], summary="Полнотекстовый поиск по путешествиям, городам и гидам", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Текст запроса."),
+    kind: Optional[str] = Query(None, pattern=f"^({'|'.join(SEARCH_SOURCES)})$", description="Искать только среди travel, city или guide."),
+    limit: int = Query(20, ge=1, le=100, description="Максимальное количество результатов."),
+    db: AsyncSession = Depends(get_db)
+) -> list:
+    """
+    Полнотекстовый поиск по названиям и описаниям путешествий, городов и гидов.
+
+    - **q**: Текст запроса, слова ищутся по префиксу.
+    - **kind**: (необязательный) вид документа: `travel`, `city` или `guide`.
+    - **limit**: Максимальное количество результатов.
+
+    Возвращает результаты, отсортированные по релевантности.
+    """
+    return await full_text_search(db, q, kind, limit)
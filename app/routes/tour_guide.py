@@ -1,22 +1,35 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from database.models import TourGuide, City
+from models.bulk_model import BulkResult
+from models.city_model import CityResponse
 from models.tourguide_model import TourGuideCreate, TourGuideResponse
+from services.batch_services import batch_response, fetch_by_ids, parse_ids
+from services.bulk_services import bulk_upsert, check_batch_size, existing_ids
+from utils.cache import catalog_cache
+from utils.classes import Batch, Page
+from utils.compression import EncodedBody, PrecompressedResponse
 from utils.helpers import get_db
+from utils.pagination import PageParams, paginate
+from utils.serialization import RawJSONResponse, RowShape
 
 tour_guide_router = APIRouter()
 
+GUIDE_SHAPE = RowShape(TourGuideResponse, TourGuide, {"city": RowShape(CityResponse, City)})
+
 @tour_guide_router.post('/tour_guide/create', tags=["Tour Guide"], summary="Создает нового гида по турам",response_model=TourGuideResponse)
-async def create_tour_guide(tour_guide: TourGuideCreate, db: Session = Depends(get_db)) -> TourGuide:
+async def create_tour_guide(tour_guide: TourGuideCreate, db: AsyncSession = Depends(get_db)) -> TourGuide:
     """
     Создает нового гида по турам.
     Проверяет, существует ли гид с таким же именем и есть ли указанный город.
     """
-    existing_tour_guide = db.query(TourGuide).filter(TourGuide.name == tour_guide.name).first()
+    existing_tour_guide = await db.scalar(select(TourGuide).where(TourGuide.name == tour_guide.name).limit(1))
     if existing_tour_guide:
         raise HTTPException(status_code=400, detail="Tour guide with this name already exists.")
-    city = db.query(City).filter(City.id == tour_guide.city_id).first()
+    city = await db.get(City, tour_guide.city_id)
     if not city:
         raise HTTPException(status_code=400, detail="City not found.")
     db_tour_guide = TourGuide(
@@ -27,68 +40,118 @@ async def create_tour_guide(tour_guide: TourGuideCreate, db: Session = Depends(g
         city_id=tour_guide.city_id 
     )
     db.add(db_tour_guide)
-    db.commit()
-    db.refresh(db_tour_guide)
+    await db.commit()
+    await db.refresh(db_tour_guide, attribute_names=["city"])
+    catalog_cache.invalidate("tour_guides")
     return db_tour_guide
 
-@tour_guide_router.get('/tour_guides/', tags=["Tour Guide"], summary="Возвращает список всех гидов по турам, включая информацию о городе",response_model=List[TourGuideResponse])
-def read_tour_guides(db: Session = Depends(get_db)) -> List[TourGuide]:
+@tour_guide_router.post('/tour_guides/bulk', tags=["Tour Guide"], summary="Пакетное создание и обновление гидов", response_model=BulkResult)
+async def bulk_upsert_tour_guides(tour_guides: List[TourGuideCreate], db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Создает или обновляет гидов пакетом, сопоставляя их по имени.
+    Гиды с несуществующим городом не записываются и получают статус `error`.
+    """
+    check_batch_size(tour_guides)
+    cities = await existing_ids(db, City.id, (tour_guide.city_id for tour_guide in tour_guides))
+    errors = {
+        index: "City not found."
+        for index, tour_guide in enumerate(tour_guides)
+        if tour_guide.city_id not in cities
+    }
+    result = await bulk_upsert(db, TourGuide, [tour_guide.dict() for tour_guide in tour_guides], errors=errors)
+    catalog_cache.invalidate("tour_guides")
+    return result
+
+
+@tour_guide_router.get('/tour_guides/', tags=["Tour Guide"], summary="Возвращает список всех гидов по турам, включая информацию о городе",response_model=Page[TourGuideResponse])
+async def read_tour_guides(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)) -> PrecompressedResponse:
     """
-    Возвращает список всех гидов по турам, включая информацию о городе.
+    Возвращает список всех гидов по турам, включая информацию о городе, постранично.
     Использует joinedload для оптимизации запросов и предотвращения проблемы N + 1.
+
+    - **limit**: Количество гидов на странице.
+    - **after**: Курсор следующей страницы.
     """
-    return db.query(TourGuide).options(joinedload(TourGuide.city)).all()
+    async def load():
+        query = select(TourGuide).options(joinedload(TourGuide.city))
+        result = Page[TourGuideResponse].model_validate(await paginate(db, query, TourGuide.id, page), from_attributes=True)
+        return EncodedBody.from_model(result)
+
+    return PrecompressedResponse(await catalog_cache.get_or_load("tour_guides", ("page", page.limit, page.after), load))
 
 @tour_guide_router.get('/tour_guide/{id}',tags=["Tour Guide"], summary="Находит гида по ID", response_model=TourGuideResponse)
-async def search_tour_guide(id: int, db: Session = Depends(get_db)):
+async def search_tour_guide(id: int, db: AsyncSession = Depends(get_db)) -> PrecompressedResponse:
     """
     Находит гида по ID.
     Возвращает 404 ошибку, если гид с указанным ID не найден.
     Также загружает информацию о городе.
     """
-    tour_guide = db.query(TourGuide).options(joinedload(TourGuide.city)).filter(TourGuide.id == id).first()
-    if not tour_guide:
-        raise HTTPException(status_code=404, detail="Tour guide not found")
-    return tour_guide
+    async def load():
+        tour_guide = await db.get(TourGuide, id, options=[joinedload(TourGuide.city)])
+        if not tour_guide:
+            raise HTTPException(status_code=404, detail="Tour guide not found")
+        return EncodedBody.from_model(TourGuideResponse.model_validate(tour_guide, from_attributes=True))
+
+    return PrecompressedResponse(await catalog_cache.get_or_load("tour_guides", ("get", id), load))
+
+@tour_guide_router.get('/tour_guides/batch', tags=["Tour Guide"], summary="Получает нескольких гидов по списку ID", response_model=Batch[TourGuideResponse])
+async def read_tour_guides_batch(
+    ids: str = Query(..., description="ID гидов через запятую, например `1,2,3`."),
+    db: AsyncSession = Depends(get_db),
+) -> RawJSONResponse:
+    """
+    Получает нескольких гидов вместе с городами за один вызов.
+
+    - **ids**: ID гидов через запятую, не больше 1000.
+
+    Элементы ответа идут в порядке `ids`; у ID, которых нет в базе, статус `not_found`,
+    они же перечислены в `missing`.
+    """
+    ids = parse_ids(ids)
+    query = select(*GUIDE_SHAPE.columns()).select_from(TourGuide).join(TourGuide.city)
+    return batch_response(ids, await fetch_by_ids(db, GUIDE_SHAPE, query, TourGuide.id, ids))
 
 @tour_guide_router.delete('/tour_guide/{id}',tags=["Tour Guide"], summary="Удаляет гида по указанному ID")
-async def delete_tour_guide(id: int, db: Session = Depends(get_db)):
+async def delete_tour_guide(id: int, db: AsyncSession = Depends(get_db)):
     """
     Удаляет гида по указанному ID.
     Возвращает сообщение об успешном удалении или 404 ошибку, если гид не найден.
     """
-    tour_guide = db.query(TourGuide).filter(TourGuide.id == id).first()
+    tour_guide = await db.get(TourGuide, id)
     if not tour_guide:
         raise HTTPException(status_code=404, detail="Tour guide not found")
-    db.delete(tour_guide)
-    db.commit()
+    await db.delete(tour_guide)
+    await db.commit()
+    catalog_cache.invalidate("tour_guides")
     return {"message": "Tour guide deleted successfully"}
 
 @tour_guide_router.put('/tour_guide/{id}',tags=["Tour Guide"], summary="Обновляет информацию о гиде по указанному ID", response_model=TourGuideResponse)
-async def update_tour_guide(id: int, tour_guide: TourGuideCreate, db: Session = Depends(get_db)):
+async def update_tour_guide(id: int, tour_guide: TourGuideCreate, db: AsyncSession = Depends(get_db)):
     """
     Обновляет информацию о гиде по указанному ID.
     Возвращает 404 ошибку, если гид не найден.
     """
-    db_tour_guide = db.query(TourGuide).filter(TourGuide.id == id).first()
+    db_tour_guide = await db.get(TourGuide, id, options=[joinedload(TourGuide.city)])
     if not db_tour_guide:
         raise HTTPException(status_code=404, detail="Tour guide not found")
     db_tour_guide.name = tour_guide.name  # type: ignore
     db_tour_guide.experience_years = tour_guide.experience_years  # type: ignore
     db_tour_guide.bio = tour_guide.bio  # type: ignore
     db_tour_guide.contact_info = tour_guide.contact_info  # type: ignore
-    db.commit()
-    db.refresh(db_tour_guide)
+    await db.commit()
+    catalog_cache.invalidate("tour_guides")
     return db_tour_guide
 
 
 @tour_guide_router.get('/tour_guide/{city_id}', tags=["Tour Guide"], summary="Получает список туристических гидов для указанного города по его ID",response_model=list[TourGuideResponse])
-async def get_guides_by_city(city_id: int, db: Session = Depends(get_db)) -> List[TourGuide]:
+async def get_guides_by_city(city_id: int, db: AsyncSession = Depends(get_db)) -> List[TourGuide]:
     """
     Получает список туристических гидов для указанного города по его ID.
     Этот метод возвращает массив объектов гидов, которые доступны в указанном городе.
     """
-    tour_guides = db.query(TourGuide).filter(TourGuide.city_id == city_id).all()
+    tour_guides = (await db.scalars(
+        select(TourGuide).options(joinedload(TourGuide.city)).where(TourGuide.city_id == city_id)
+    )).all()
     if not tour_guides:
         raise HTTPException(status_code=404, detail="No tour guides found for this city")
     return tour_guides
\ No newline at end of file
@@ -1,16 +1,32 @@
-from datetime import date
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from database.models import Travel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database.models import City, TourGuide, Travel
+from models.bulk_model import BulkResult
 from models.travel_model import TravelCreate, TravelResponse
-from utils.helpers import get_db
-from pydantic import parse_obj_as
+from services.batch_services import batch_response, fetch_by_ids, parse_ids
+from services.bulk_services import bulk_upsert, check_batch_size, existing_ids
+from services.travel_services import TRAVEL_SHAPE, TravelSearchParams, build_search_query, select_travel_rows, select_travels
+from utils.classes import Batch, Page
+from utils.conditional import conditional
+from utils.export import export_response
+from utils.helpers import get_db, get_session_maker
+from utils.pagination import PageParams, keyset_page, paginate
+from utils.serialization import RawJSONResponse, dumps, page_response
+from utils.singleflight import SingleFlight
 
 travel_router = APIRouter()
 
+# Ответ с путешествием включает город и гида, поэтому ETag зависит от всех трех таблиц.
+TRAVEL_TABLES = ("travels", "cities", "tour_guides")
+
+# Одновременные запросы одного путешествия выполняют одну загрузку (utils/singleflight.py).
+travel_flight = SingleFlight("travel")
+
+
 @travel_router.post('/travel/create',  tags=["Travel"], summary="Создает новое путешествие",response_model=TravelResponse)
-async def create_travel(travel: TravelCreate, db: Session = Depends(get_db)) -> TravelResponse:
+async def create_travel(travel: TravelCreate, db: AsyncSession = Depends(get_db)) -> TravelResponse:
     """
     Создает новое путешествие.
 
@@ -22,12 +38,13 @@ async def create_travel(travel: TravelCreate, db: Session = Depends(get_db)) ->
         - **start_date**: Дата начала
         - **end_date**: Дата окончания
         - **image_url**: URL изображения путешествия
+        - **capacity**: (необязательный) Число мест; без него бронирования не ограничены
         - **city_id**: ID города
         - **guide_id**: (необязательный) ID гида
 
     Возвращает созданный объект путешествия.
     """
-    existing_travel = db.query(Travel).filter(Travel.name == travel.name).first()
+    existing_travel = await db.scalar(select(Travel).where(Travel.name == travel.name).limit(1))
     if existing_travel:
         raise HTTPException(status_code=400, detail="Travel with this name already exists.")
     
@@ -39,43 +56,126 @@ async def create_travel(travel: TravelCreate, db: Session = Depends(get_db)) ->
         start_date=travel.start_date,
         end_date=travel.end_date,
         image_url=travel.image_url,
+        capacity=travel.capacity,
         city_id=travel.city_id,
         guide_id=travel.guide_id if hasattr(travel, 'guide_id') else None
     )
     db.add(new_travel)
-    db.commit()
-    db.refresh(new_travel)
-    return new_travel
+    await db.commit()
+    return await db.scalar(select_travels().where(Travel.id == new_travel.id))
+
 
+@travel_router.post('/travels/bulk', tags=["Travel"], summary="Пакетное создание и обновление путешествий", response_model=BulkResult)
+async def bulk_upsert_travels(travels: List[TravelCreate], db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Создает или обновляет путешествия пакетом, сопоставляя их по названию.
+
+    - **travels**: Массив объектов путешествий в формате `/travel/create`.
 
-@travel_router.get('/treves',  tags=["Travel"], summary="Получает список всех путешествий",response_model=list[TravelResponse])
-async def get_treves(db: Session = Depends(get_db)) -> list[Travel]:
+    Весь пакет пишется одной транзакцией. Путешествия с несуществующим городом
+    или гидом не записываются и получают статус `error`.
+    Возвращает счетчики и результат для каждого элемента: `created`, `updated` или `error`.
     """
-    Получает список всех путешествий.
+    check_batch_size(travels)
+    cities = await existing_ids(db, City.id, (travel.city_id for travel in travels))
+    guides = await existing_ids(db, TourGuide.id, (travel.guide_id for travel in travels))
+    errors = {}
+    for index, travel in enumerate(travels):
+        if travel.city_id not in cities:
+            errors[index] = "City not found."
+        elif travel.guide_id is not None and travel.guide_id not in guides:
+            errors[index] = "Tour guide not found."
+    return await bulk_upsert(db, Travel, [travel.dict() for travel in travels], errors=errors)
 
-    Возвращает список объектов путешествий с загруженными связями с городами.
+
+@travel_router.get('/treves',  tags=["Travel"], summary="Получает список всех путешествий",response_model=Page[TravelResponse],
+                   dependencies=[Depends(conditional(*TRAVEL_TABLES))])
+async def get_treves(
+    response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)
+) -> RawJSONResponse:
     """
-    travels = db.query(Travel).options(joinedload(Travel.city)).all()
-    return travels
+    Получает список всех путешествий постранично.
+
+    - **limit**: Количество путешествий на странице.
+    - **after**: Курсор следующей страницы.
+
+    Возвращает страницу объектов путешествий с загруженными связями с городами.
+    Поддерживает условные запросы: `If-None-Match` / `If-Modified-Since` → 304.
+    """
+    return page_response(TRAVEL_SHAPE, await paginate(db, select_travel_rows(), Travel.id, page, scalars=False), response)
+
+
+@travel_router.get('/treves/export', tags=["Travel"], summary="Потоковая выгрузка всех путешествий")
+async def export_treves(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Формат выгрузки: ndjson или csv."),
+    session_maker=Depends(get_session_maker),
+):
+    """
+    Потоковая выгрузка всех путешествий для массовых потребителей.
+
+    - **format**: `ndjson` (по умолчанию) или `csv`.
+
+    Строки читаются серверным курсором и отправляются по мере чтения,
+    поэтому потребление памяти не зависит от размера таблицы.
+    """
+    query = select(*Travel.__table__.columns).order_by(Travel.id)
+    return export_response(session_maker, query, format, "travels")
 
 
 @travel_router.get('/travel/{id}',  tags=["Travel"], summary="Ищет путешествие по ID",response_model=TravelResponse)
-async def search_travel(id: int, db: Session = Depends(get_db)) -> Travel:
+async def search_travel(
+    id: int,
+    response: Response,
+    validators: dict = Depends(conditional(*TRAVEL_TABLES)),
+    db: AsyncSession = Depends(get_db),
+) -> RawJSONResponse:
     """
     Ищет путешествие по ID.
 
     - **id**: ID путешествия для поиска.
 
     Если путешествие не найдено, возвращает ошибку 404.
+    Поддерживает условные запросы: `If-None-Match` / `If-Modified-Since` → 304.
+    Одновременные запросы одного путешествия выполняют один запрос к базе и одну
+    сериализацию; 404 запоминается на секунду (до изменения данных).
     """
-    travel = db.query(Travel).options(joinedload(Travel.city), joinedload(Travel.guide)).filter(Travel.id == id).first()
-    if travel is None:
-        raise HTTPException(status_code=404, detail="Travel not found")
-    return travel
+    async def load():
+        row = (await db.execute(select_travel_rows().where(Travel.id == id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Travel not found")
+        return dumps(TRAVEL_SHAPE.build(row))
+
+    # ETag в ключе: после записи в таблицы путешествия ключ меняется.
+    # Пока запрос ждет чужую загрузку, транзакция conditional() завершена и соединение в пуле.
+    raw = RawJSONResponse(await travel_flight.do((id, validators["ETag"]), load, before_wait=db.commit))
+    raw.headers.update(response.headers)
+    return raw
+
+
+@travel_router.get('/travels/batch', tags=["Travel"], summary="Получает несколько путешествий по списку ID",
+                   response_model=Batch[TravelResponse], dependencies=[Depends(conditional(*TRAVEL_TABLES))])
+async def get_travels_batch(
+    response: Response,
+    ids: str = Query(..., description="ID путешествий через запятую, например `1,2,3`."),
+    db: AsyncSession = Depends(get_db),
+) -> RawJSONResponse:
+    """
+    Получает несколько путешествий за один вызов вместо `/travel/{id}` на каждое.
+
+    - **ids**: ID путешествий через запятую, не больше 1000.
+
+    Путешествия вместе с городом и гидом читаются одним запросом `IN`
+    (длинные списки — частями по `DB_BATCH_READ_SIZE`). Элементы ответа идут в порядке `ids`;
+    у ID, которых нет в базе, статус `not_found`, они же перечислены в `missing`.
+    Поддерживает условные запросы: `If-None-Match` / `If-Modified-Since` → 304.
+    """
+    ids = parse_ids(ids)
+    found = await fetch_by_ids(db, TRAVEL_SHAPE, select_travel_rows(), Travel.id, ids)
+    return batch_response(ids, found, response)
 
 
 @travel_router.delete('/travel/{id}', tags=["Travel"], summary="Удаляет путешествие по ID", response_model=dict)
-async def delete_travel(id: int, db: Session = Depends(get_db)) -> dict:
+async def delete_travel(id: int, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Удаляет путешествие по ID.
 
@@ -83,16 +183,16 @@ async def delete_travel(id: int, db: Session = Depends(get_db)) -> dict:
 
     Возвращает сообщение об успешном удалении.
     """
-    travel = db.query(Travel).options(joinedload(Travel.city), joinedload(Travel.guide)).filter(Travel.id == id).first()
+    travel = await db.get(Travel, id)
     if travel is None:
         raise HTTPException(status_code=404, detail="Travel not found")
-    db.delete(travel)
-    db.commit()
+    await db.delete(travel)
+    await db.commit()
     return {"message": "Travel deleted successfully"}
 
 
 @travel_router.put('/travel/{id}', tags=["Travel"], summary="Обновляет информацию о путешествии", response_model=TravelResponse)
-async def update_travel(id: int, travel: TravelCreate, db: Session = Depends(get_db)) -> TravelResponse:
+async def update_travel(id: int, travel: TravelCreate, db: AsyncSession = Depends(get_db)) -> TravelResponse:
     """
     Обновляет информацию о путешествии.
 
@@ -105,12 +205,13 @@ async def update_travel(id: int, travel: TravelCreate, db: Session = Depends(get
         - **start_date**: Дата начала
         - **end_date**: Дата окончания
         - **image_url**: URL изображения путешествия
+        - **capacity**: (необязательный) Число мест; без него бронирования не ограничены
         - **city_id**: ID города
         - **guide_id**: (необязательный) ID гида
 
     Возвращает обновленный объект путешествия.
     """
-    db_travel = db.query(Travel).options(joinedload(Travel.city), joinedload(Travel.guide)).filter(Travel.id == id).first()
+    db_travel = await db.get(Travel, id)
     if db_travel is None:
         raise HTTPException(status_code=404, detail="Travel not found")
 
@@ -121,26 +222,22 @@ async def update_travel(id: int, travel: TravelCreate, db: Session = Depends(get
     db_travel.start_date = travel.start_date # type: ignore
     db_travel.end_date = travel.end_date # type: ignore
     db_travel.image_url = travel.image_url # type: ignore
+    db_travel.capacity = travel.capacity # type: ignore
     if travel.city_id:
         db_travel.city_id = travel.city_id # type: ignore
     if travel.guide_id is not None:
         db_travel.guide_id = travel.guide_id # type: ignore
 
-    db.commit()
-    db.refresh(db_travel)
-    return db_travel
+    await db.commit()
+    return await db.scalar(select_travels().where(Travel.id == id).execution_options(populate_existing=True))
 
 
-@travel_router.get('/travels/search', tags=["Travel"], summary="Поиск путешествий по заданным фильтрам")
+@travel_router.get('/travels/search', tags=["Travel"], summary="Поиск путешествий по заданным фильтрам", response_model=Page[TravelResponse])
 async def search_travels(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    name_city: Optional[str] = None,
-    duration: Optional[str] = None,
-    db: Session = Depends(get_db)
-) -> List[TravelResponse]:
+    params: TravelSearchParams = Depends(),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+) -> RawJSONResponse:
     """
     Поиск путешествий по заданным фильтрам.
     У данного метода есть следующие параметры фильтрации:
@@ -151,38 +248,15 @@ async def search_travels(
     - **max_price**: Максимальная цена (необязательно).
     - **name_city**: Название города (необязательно).
     - **duration**: Продолжительность путешествия (необязательно).
+    - **sort_by**: Поле сортировки: id, price, start_date, end_date или rating (средняя оценка).
+    - **order**: Направление сортировки: asc или desc.
+    - **limit**, **after**: Размер страницы и курсор следующей страницы.
 
-    Возвращает список путешествий, соответствующих указанным фильтрам.
-    """
-    query = db.query(Travel)
-    filters = [
-        Travel.name_city == name_city if name_city else None,
-        Travel.start_date >= start_date if start_date else None,
-        Travel.end_date <= end_date if end_date else None,
-        Travel.price >= min_price if min_price is not None else None,
-        Travel.price <= max_price if max_price is not None else None,
-        Travel.duration == duration if duration is not None else None,
-    ]
-    for condition in filters:
-        if condition is not None:
-            query = query.filter(condition)
-    
-    travels = query.all()
-    if not travels:
+    Возвращает страницу путешествий, соответствующих указанным фильтрам.
+    """
+    result = await keyset_page(
+        db, build_search_query(params, rows=True), params.keys, page, params.descending, params.order_by, scalars=False
+    )
+    if not result["items"] and page.after is None:
         raise HTTPException(status_code=404, detail="Путешествия не найдены с заданными фильтрами")
-    
-    travel_responses = [
-        TravelResponse(
-            id=travel.id,
-            name=travel.name,
-            description=travel.description,
-            price=travel.price,
-            duration=travel.duration,
-            start_date=travel.start_date,
-            end_date=travel.end_date,
-            image_url=travel.image_url,
-            city_id=travel.city_id,
-            guide_id=travel.guide_id,
-        ) for travel in travels
-    ]
-    return travel_responses
+    return page_response(TRAVEL_SHAPE, result)
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user_model import User, UserCreate, UserResponse
+from services.batch_services import batch_response, fetch_by_ids, parse_ids
+from utils.classes import Batch, Page
 from utils.helpers import get_db
+from utils.pagination import PageParams, paginate
+from utils.serialization import RawJSONResponse, RowShape, page_response
+from utils.sessions import SessionBackend, get_session_backend
 from database.models import User as UserModel
-from typing import Annotated, List
+from typing import Annotated
 
 user_router = APIRouter()
 
-fake_session_store = {}
+USER_SHAPE = RowShape(UserResponse, UserModel)
 
 @user_router.post('/user/create', tags=["User"], summary="Создает нового пользователя", response_model=UserResponse)
 async def create_user(
         user: Annotated[UserCreate, Body(..., example={"name": "dasha", "age": 88})],
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
     ) -> UserResponse:
     """
     Создает нового пользователя.
@@ -24,12 +30,29 @@ async def create_user(
     """
     new_user = UserModel(name=user.name, age=user.age)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     return UserResponse(id=new_user.id, name=new_user.name, age=new_user.age) # type: ignore
 
+@user_router.get('/user/me', tags=["User"], summary="Пользователь текущей сессии", response_model=UserResponse)
+async def get_current_user(
+    session_token: str = Header(..., alias="X-Session-Token"),
+    db: AsyncSession = Depends(get_db),
+    sessions: SessionBackend = Depends(get_session_backend),
+) -> UserResponse:
+    """
+    Возвращает пользователя по токену сессии из заголовка `X-Session-Token`.
+
+    Если сессия не найдена или истекла, возвращает ошибку 401.
+    """
+    user_id = await sessions.resolve(db, session_token)
+    user = await db.get(UserModel, user_id) if user_id is not None else None
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+    return UserResponse(id=user.id, name=user.name, age=user.age) # type: ignore
+
+
 @user_router.get('/user/{id}',  tags=["User"], summary="Получает информацию о пользователе по его ID",response_model=UserResponse)
-async def get_user(id: int, db: Session = Depends(get_db)) -> UserResponse:
+async def get_user(id: int, db: AsyncSession = Depends(get_db)) -> UserResponse:
     """
     Получает информацию о пользователе по его ID.
     
@@ -37,23 +60,41 @@ async def get_user(id: int, db: Session = Depends(get_db)) -> UserResponse:
     
     Если пользователь не найден, возвращает ошибку 404.
     """
-    user = db.query(UserModel).filter(UserModel.id == id).first()
+    user = await db.get(UserModel, id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return UserResponse(id=user.id, name=user.name, age=user.age) # type: ignore
 
-@user_router.get('/users',  tags=["User"], summary="Получает список всех пользователей",response_model=List[UserResponse])
-async def get_users(db: Session = Depends(get_db)) -> List[UserResponse]:
+@user_router.get('/users',  tags=["User"], summary="Получает список всех пользователей",response_model=Page[UserResponse])
+async def get_users(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)) -> RawJSONResponse:
     """
-    Получает список всех пользователей.
+    Получает список всех пользователей постранично.
     
-    Возвращает список объектов пользователей.
+    - **limit**: Количество пользователей на странице.
+    - **after**: Курсор следующей страницы.
+
+    Возвращает страницу объектов пользователей и `next_cursor`.
+    """
+    return page_response(USER_SHAPE, await paginate(db, select(*USER_SHAPE.columns()), UserModel.id, page, scalars=False))
+
+@user_router.get('/users/batch', tags=["User"], summary="Получает нескольких пользователей по списку ID", response_model=Batch[UserResponse])
+async def get_users_batch(
+    ids: str = Query(..., description="ID пользователей через запятую, например `1,2,3`."),
+    db: AsyncSession = Depends(get_db),
+) -> RawJSONResponse:
+    """
+    Получает нескольких пользователей за один вызов.
+
+    - **ids**: ID пользователей через запятую, не больше 1000.
+
+    Элементы ответа идут в порядке `ids`; у ID, которых нет в базе, статус `not_found`,
+    они же перечислены в `missing`.
     """
-    users = db.query(UserModel).all()
-    return [UserResponse(id=user.id, name=user.name, age=user.age) for user in users] # type: ignore
+    ids = parse_ids(ids)
+    return batch_response(ids, await fetch_by_ids(db, USER_SHAPE, select(*USER_SHAPE.columns()), UserModel.id, ids))
 
 @user_router.delete('/user/{user_id}', tags=["User"], summary="Удаляет пользователя по его ID", response_model=dict)
-async def delete_user(user_id: int, db: Session = Depends(get_db)) -> dict:
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Удаляет пользователя по его ID.
     
@@ -61,34 +102,42 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)) -> dict:
     
     Возвращает сообщение об успешном удалении.
     """
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await db.get(UserModel, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     return {"message": "User deleted successfully"}
 
 
 @user_router.post('/user/login', tags=["User"], summary="Логин пользователя")
-async def login(user: Annotated[UserCreate, Body(..., example={"name": "dasha", "age": 88})], db: Session = Depends(get_db)):
+async def login(
+    user: Annotated[UserCreate, Body(..., example={"name": "dasha", "age": 88})],
+    db: AsyncSession = Depends(get_db),
+    sessions: SessionBackend = Depends(get_session_backend),
+):
     """
     Логин пользователя.
 
     - **name**: Имя пользователя.
     - **age**: Возраст пользователя.
 
-    Возвращает сообщение об успешном логине или ошибку.
+    Возвращает сообщение об успешном логине и токен сессии или ошибку.
+    Где хранятся сессии, задает SESSION_BACKEND: `memory`, `database` или `signed`.
     """
-    db_user = db.query(UserModel).filter(UserModel.name == user.name, UserModel.age == user.age).first()
-    if db_user is None:
+    user_id = await db.scalar(select(UserModel.id).where(UserModel.name == user.name, UserModel.age == user.age).limit(1))
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    session_token = f"session-{db_user.id}"
-    fake_session_store[session_token] = db_user.id
+    session_token = await sessions.create(db, user_id)
     return {"message": "Login successful", "session_token": session_token}
 
 
 @user_router.post('/user/logout', tags=["User"], summary="Выход из аккаунта")
-async def logout(session_token: str = Body(...)):
+async def logout(
+    session_token: str = Body(...),
+    db: AsyncSession = Depends(get_db),
+    sessions: SessionBackend = Depends(get_session_backend),
+):
     """
     Выход из аккаунта.
 
@@ -96,7 +145,6 @@ async def logout(session_token: str = Body(...)):
 
     Возвращает сообщение об успешном выходе.
     """
-    if session_token in fake_session_store:
-        del fake_session_store[session_token]
+    if await sessions.revoke(db, session_token):
         return {"message": "Logout successful"}
     raise HTTPException(status_code=404, detail="Session token not found")
\ No newline at end of file
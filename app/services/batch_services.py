@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.connect import settings
+from utils.serialization import RawJSONResponse, RowShape, dumps
+
+# Наибольшее число ID в одном запросе к API.
+BATCH_MAX_IDS = 1000
+
+FOUND = "found"
+NOT_FOUND = "not_found"
+
+
+def parse_ids(ids: str) -> List[int]:
+    """`1,2,3` -> [1, 2, 3]; порядок и повторы сохраняются."""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers.")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty.")
+    if len(parsed) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {BATCH_MAX_IDS} ids.")
+    return parsed
+
+
+async def fetch_by_ids(
+    db: AsyncSession, shape: RowShape, query, id_column, ids: List[int], chunk_size: Optional[int] = None
+) -> Dict[int, dict]:
+    """
+    Строки `query` с ID из `ids`, собранные по `shape`, в словаре по ID.
+
+    Один `IN (...)` на каждые `chunk_size` различных ID (по умолчанию DB_BATCH_READ_SIZE),
+    чтобы число параметров запроса оставалось в пределах лимита SQLite.
+    """
+    chunk_size = chunk_size or settings.batch_read_size
+    unique = list(dict.fromkeys(ids))
+    found = {}
+    for start in range(0, len(unique), chunk_size):
+        rows = await db.execute(query.where(id_column.in_(unique[start:start + chunk_size])))
+        for row in rows:
+            item = shape.build(row)
+            found[item["id"]] = item
+    return found
+
+
+def batch_response(ids: List[int], found: Dict[int, dict], response: Optional[Response] = None) -> RawJSONResponse:
+    """
+    Тело Batch[...]: элементы в порядке запроса, для отсутствующих ID — статус `not_found`.
+    Заголовки с `response` (ETag из conditional) переносятся, как в page_response.
+    """
+    items = [
+        {"id": id, "status": FOUND, "item": found[id]} if id in found else {"id": id, "status": NOT_FOUND, "item": None}
+        for id in ids
+    ]
+    missing = [id for id in dict.fromkeys(ids) if id not in found]
+    raw = RawJSONResponse(dumps({"items": items, "missing": missing}))
+    if response is not None:
+        raw.headers.update(response.headers)
+    return raw
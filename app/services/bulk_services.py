@@ -0,0 +1,103 @@
+import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.city_pages import city_column, mark_cities
+
+# Строк в одном INSERT: 500 строк по ~10 колонок укладываются в лимит
+# параметров SQLite (32766) и не раздувают один запрос в Postgres.
+BULK_CHUNK_SIZE = 500
+
+# Наибольший размер пакета в одном запросе к API.
+BULK_MAX_ITEMS = 5000
+
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def check_batch_size(items: list) -> None:
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {BULK_MAX_ITEMS} items.")
+
+
+async def existing_ids(db: AsyncSession, column, ids) -> set:
+    """Какие из ID есть в таблице: один запрос на весь пакет для проверки внешних ключей."""
+    ids = {id for id in ids if id is not None}
+    if not ids:
+        return set()
+    return set(await db.scalars(select(column).where(column.in_(ids))))
+
+
+async def _upsert_chunk(db: AsyncSession, model, rows: List[dict], key: str) -> Dict[str, tuple]:
+    key_column = getattr(model, key)
+    names = [row[key] for row in rows]
+    # Для путешествий и гидов заодно читается прежний город: перенос меняет обе страницы.
+    page_column = city_column(model)
+    moved = page_column is not None and page_column is not model.id
+    columns = [key_column, page_column] if moved else [key_column]
+    existing = {row[0]: row for row in await db.execute(select(*columns).where(key_column.in_(names)))}
+
+    insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+    statement = insert(model).values(rows)
+    updates = {column: statement.excluded[column] for column in rows[0] if column != key}
+    updates["updated_at"] = datetime.datetime.utcnow()
+    statement = statement.on_conflict_do_update(index_elements=[key], set_=updates)
+    # Страницы пересобираются только для городов пакета, а не все (database/city_pages.py).
+    result = (await db.execute(
+        statement.returning(model.id, key_column).execution_options(city_pages=page_column is None)
+    )).all()
+    if moved:
+        mark_cities(db.sync_session, [row[1] for row in existing.values()] + [row[page_column.key] for row in rows])
+    elif page_column is not None:
+        mark_cities(db.sync_session, [id for id, _ in result])
+    return {name: (id, name not in existing) for id, name in result}
+
+
+async def bulk_upsert(
+    db: AsyncSession, model, rows: List[dict], key: str = "name", errors: Optional[Dict[int, str]] = None
+) -> dict:
+    """
+    Вставляет или обновляет строки по уникальному ключу `key` одним
+    INSERT ... ON CONFLICT DO UPDATE на каждые BULK_CHUNK_SIZE строк и фиксирует
+    весь пакет одной транзакцией.
+
+    - **rows**: Строки для записи, уже прошедшие валидацию схемы.
+    - **errors**: Номера строк, отклоненных вызывающим кодом, и причина; они не пишутся.
+
+    Возвращает счетчики и результат для каждой строки в исходном порядке.
+    Если ключ повторяется в пакете, записывается последнее вхождение.
+    """
+    errors = dict(errors or {})
+    latest: Dict[str, int] = {}
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row[key] in latest:
+            errors[latest[row[key]]] = f"Duplicate {key} in batch, superseded by item {index}."
+        latest[row[key]] = index
+
+    valid = [rows[index] for index in sorted(latest.values())]
+    written: Dict[str, tuple] = {}
+    for start in range(0, len(valid), BULK_CHUNK_SIZE):
+        written.update(await _upsert_chunk(db, model, valid[start:start + BULK_CHUNK_SIZE], key))
+    await db.commit()
+
+    items = []
+    for index, row in enumerate(rows):
+        if index in errors:
+            items.append({"index": index, "status": "error", "detail": errors[index]})
+        else:
+            id, created = written[row[key]]
+            items.append({"index": index, "status": "created" if created else "updated", "id": id})
+    return {
+        "created": sum(item["status"] == "created" for item in items),
+        "updated": sum(item["status"] == "updated" for item in items),
+        "failed": len(errors),
+        "items": items,
+    }
@@ -0,0 +1,133 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload
+
+from database.models import Order, Travel, User
+from services.travel_services import travel_relations
+
+PENDING = "в ожидании"
+CONFIRMED = "подтвержден"
+CANCELLED = "отменен"
+COMPLETED = "завершен"
+
+# Допустимые переходы: новый статус -> статусы, из которых в него можно перейти.
+TRANSITIONS = {
+    CONFIRMED: (PENDING,),
+    CANCELLED: (PENDING, CONFIRMED),
+    COMPLETED: (CONFIRMED,),
+}
+
+# Статусы, в которых заказ держит место в путешествии.
+HOLDS_SEAT = (PENDING, CONFIRMED, COMPLETED)
+
+
+def select_orders():
+    return select(Order).options(
+        joinedload(Order.user),
+        joinedload(Order.travel).options(*travel_relations()),
+        raiseload("*"),
+    )
+
+
+async def _find_by_key(db: AsyncSession, user_id: int, key: str) -> Optional[Order]:
+    return await db.scalar(
+        select_orders().where(Order.user_id == user_id, Order.idempotency_key == key)
+    )
+
+
+def _replay(order: Order, travel_id: int) -> Order:
+    """
+    Заказ, уже созданный по ключу идемпотентности. Ключ действует для пользователя,
+    поэтому тело запроса — это путешествие, и оно хранится в самом заказе: тот же ключ
+    с другим путешествием — ошибка клиента (422), а не успешный повтор.
+    """
+    if order.travel_id != travel_id:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return order
+
+
+async def reserve_seat(db: AsyncSession, travel_id: int) -> None:
+    """
+    Занимает место одним условным UPDATE: счетчик растет, только если места еще есть.
+    Блокируется одна строка путешествия, и два запроса не могут продать последнее место дважды.
+    """
+    reserved = await db.scalar(
+        update(Travel)
+        .where(Travel.id == travel_id, or_(Travel.capacity.is_(None), Travel.seats_booked < Travel.capacity))
+        .values(seats_booked=Travel.seats_booked + 1)
+        .returning(Travel.id)
+        # Занятые места не показываются на странице города, пересобирать ее не нужно.
+        .execution_options(synchronize_session=False, city_pages=False)
+    )
+    if reserved is None:
+        exists = await db.scalar(select(Travel.id).where(Travel.id == travel_id))
+        raise HTTPException(status_code=404 if exists is None else 409,
+                            detail="Travel not found" if exists is None else "No seats available")
+
+
+async def release_seat(db: AsyncSession, travel_id: int) -> None:
+    await db.execute(
+        update(Travel)
+        .where(Travel.id == travel_id)
+        .values(seats_booked=Travel.seats_booked - 1)
+        .execution_options(synchronize_session=False, city_pages=False)
+    )
+
+
+async def create_order(db: AsyncSession, user_id: int, travel_id: int, key: Optional[str] = None) -> Order:
+    """
+    Создает заказ и занимает место в одной транзакции.
+
+    С ключом идемпотентности повторный запрос возвращает уже созданный заказ,
+    а не бронирует второе место; тот же ключ с другим путешествием вернет 422.
+    Если два запроса с одним ключом пришли одновременно, второй упрется в уникальный
+    индекс, его транзакция откатится вместе с местом, и он вернет заказ первого.
+    """
+    if key is not None:
+        existing = await _find_by_key(db, user_id, key)
+        if existing is not None:
+            return _replay(existing, travel_id)
+    if await db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    await reserve_seat(db, travel_id)
+    order = Order(user_id=user_id, travel_id=travel_id, status=PENDING, idempotency_key=key)
+    db.add(order)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        existing = await _find_by_key(db, user_id, key) if key is not None else None
+        if existing is None:
+            raise
+        return _replay(existing, travel_id)
+    return await db.scalar(select_orders().where(Order.id == order.id))
+
+
+async def change_status(db: AsyncSession, order_id: int, status: str) -> Order:
+    """
+    Переводит заказ в новый статус условным UPDATE по текущему статусу, поэтому
+    параллельная отмена одного заказа освобождает место ровно один раз.
+    """
+    if status not in TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown status. Allowed: {', '.join(TRANSITIONS)}")
+    travel_id = await db.scalar(
+        update(Order)
+        .where(Order.id == order_id, Order.status.in_(TRANSITIONS[status]))
+        .values(status=status)
+        .returning(Order.travel_id)
+        .execution_options(synchronize_session=False)
+    )
+    if travel_id is None:
+        current = await db.scalar(select(Order.status).where(Order.id == order_id))
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        raise HTTPException(status_code=409, detail=f"Cannot change status from '{current}' to '{status}'")
+    if status not in HOLDS_SEAT:
+        await release_seat(db, travel_id)
+    await db.commit()
+    return await db.scalar(select_orders().where(Order.id == order_id).execution_options(populate_existing=True))
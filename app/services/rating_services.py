@@ -0,0 +1,116 @@
+import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Review, Travel
+
+
+async def apply_rating_change(db: AsyncSession, travel_id: int, rating_delta: int, count_delta: int) -> None:
+    """
+    Меняет агрегаты отзывов путешествия одним UPDATE без чтения отзывов.
+    Правые части SET видят старые значения колонок, поэтому среднее считается
+    по уже измененным сумме и количеству в том же выражении.
+    """
+    new_sum = Travel.rating_sum + rating_delta
+    new_count = Travel.rating_count + count_delta
+    await db.execute(
+        update(Travel)
+        .where(Travel.id == travel_id)
+        .values(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating_avg=case((new_count > 0, new_sum * 1.0 / new_count), else_=0.0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Сколько раз повторить изменение оценки, если отзыв успели изменить параллельно.
+REVIEW_UPDATE_ATTEMPTS = 5
+
+
+async def change_review(db: AsyncSession, review_id: int, rating: int, comment: Optional[str]) -> None:
+    """
+    Меняет оценку и текст отзыва и поправляет агрегаты путешествия на разницу оценок.
+
+    Разница считается от оценки, которую условный UPDATE (`WHERE rating = <прочитанная>`)
+    действительно заменил: если параллельный запрос успел изменить отзыв между чтением
+    и записью, UPDATE не затронет строк, и попытка повторяется с новым значением.
+    Так два одновременных изменения не применяют разницу к одной и той же старой оценке.
+    """
+    for _ in range(REVIEW_UPDATE_ATTEMPTS):
+        current = (await db.execute(select(Review.travel_id, Review.rating).where(Review.id == review_id))).first()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Review not found")
+        travel_id, old_rating = current
+        changed = await db.scalar(
+            update(Review)
+            .where(Review.id == review_id, Review.rating == old_rating)
+            .values(rating=rating, comment=comment, updated_at=datetime.datetime.utcnow())
+            .returning(Review.id)
+            # Страницу города меняют агрегаты путешествия ниже, сам отзыв на нее не попадает.
+            .execution_options(synchronize_session=False, city_pages=False)
+        )
+        if changed is not None:
+            await apply_rating_change(db, travel_id, rating - old_rating, 0)
+            return
+    raise HTTPException(status_code=409, detail="Review was changed concurrently, retry the request")
+
+
+# Допуск сравнения rating_avg: среднее хранится как число с плавающей точкой.
+AVG_TOLERANCE = 1e-9
+
+
+def _actual_ratings():
+    return (
+        select(Review.travel_id, func.count().label("count"), func.sum(Review.rating).label("sum"))
+        .group_by(Review.travel_id)
+        .subquery()
+    )
+
+
+async def reconcile_ratings(db: AsyncSession, fix: bool = False) -> List[dict]:
+    """
+    Сверяет агрегаты в travels с отзывами одним запросом с группировкой.
+
+    - **fix**: Перезаписать расхождения значениями, посчитанными по отзывам.
+
+    Возвращает найденные расхождения: ID путешествия, сохраненные и фактические значения.
+    """
+    actual = _actual_ratings()
+    actual_count = func.coalesce(actual.c.count, 0)
+    actual_sum = func.coalesce(actual.c.sum, 0)
+    actual_avg = case((actual_count > 0, actual_sum * 1.0 / actual_count), else_=0.0)
+    rows = (await db.execute(
+        select(Travel.id, Travel.rating_count, Travel.rating_sum, Travel.rating_avg, actual_count, actual_sum, actual_avg)
+        .outerjoin(actual, actual.c.travel_id == Travel.id)
+        .where(
+            (Travel.rating_count != actual_count)
+            | (Travel.rating_sum != actual_sum)
+            | (func.abs(Travel.rating_avg - actual_avg) > AVG_TOLERANCE)
+        )
+        .order_by(Travel.id)
+    )).all()
+    mismatches = [
+        {
+            "travel_id": id, "stored_count": count, "stored_sum": total, "stored_avg": avg,
+            "actual_count": real_count, "actual_sum": real_sum, "actual_avg": real_avg,
+        }
+        for id, count, total, avg, real_count, real_sum, real_avg in rows
+    ]
+    if fix and mismatches:
+        await db.execute(
+            update(Travel).execution_options(synchronize_session=False),
+            [
+                {
+                    "id": row["travel_id"], "rating_count": row["actual_count"], "rating_sum": row["actual_sum"],
+                    "rating_avg": row["actual_avg"],
+                }
+                for row in mismatches
+            ],
+        )
+        await db.commit()
+    return mismatches
@@ -0,0 +1,66 @@
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.fulltext import KINDS_BY_CODE, POSTGRES_CONFIG, POSTGRES_TABLE, SEARCH_SOURCES, SQLITE_TABLE
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+# Совпадение в названии весит больше, чем в описании (как веса A/B в Postgres).
+TITLE_WEIGHT = 10.0
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """
+    Переводит пользовательский текст в запрос FTS5: каждое слово берется в кавычки
+    (операторы FTS5 в тексте не интерпретируются) и ищется по префиксу.
+    """
+    words = WORD.findall(q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+async def _search_sqlite(db: AsyncSession, q: str, kind: Optional[str], limit: int) -> list:
+    match = fts5_query(q)
+    if match is None:
+        return []
+    kind_filter = f"AND rowid % 3 = {SEARCH_SOURCES[kind][0]}" if kind else ""
+    rows = await db.execute(text(
+        f"SELECT rowid, title, snippet({SQLITE_TABLE}, 1, '[', ']', '…', 12) AS snippet, "
+        f"bm25({SQLITE_TABLE}, {TITLE_WEIGHT}, 1.0) AS score "
+        f"FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH :match {kind_filter} "
+        f"ORDER BY score LIMIT :limit"
+    ), {"match": match, "limit": limit})
+    # bm25 в FTS5 отрицателен и тем меньше, чем релевантнее документ.
+    return [
+        {"kind": KINDS_BY_CODE[rowid % 3], "id": rowid // 3, "title": title, "snippet": snippet, "rank": -score}
+        for rowid, title, snippet, score in rows
+    ]
+
+
+async def _search_postgres(db: AsyncSession, q: str, kind: Optional[str], limit: int) -> list:
+    kind_filter = "AND kind = :kind" if kind else ""
+    rows = await db.execute(text(
+        f"SELECT kind, ref_id, title, "
+        f"ts_headline('{POSTGRES_CONFIG}', coalesce(body, ''), query, 'StartSel=[,StopSel=],MaxFragments=1') AS snippet, "
+        f"ts_rank(document, query) AS score "
+        f"FROM {POSTGRES_TABLE}, websearch_to_tsquery('{POSTGRES_CONFIG}', :q) AS query "
+        f"WHERE document @@ query {kind_filter} ORDER BY score DESC LIMIT :limit"
+    ), {"q": q, "kind": kind, "limit": limit})
+    return [
+        {"kind": row_kind, "id": ref_id, "title": title, "snippet": snippet, "rank": score}
+        for row_kind, ref_id, title, snippet, score in rows
+    ]
+
+
+async def full_text_search(db: AsyncSession, q: str, kind: Optional[str] = None, limit: int = 20) -> list:
+    """
+    Ранжированный полнотекстовый поиск по путешествиям, городам и гидам:
+    FTS5 (bm25) в SQLite и tsvector с GIN-индексом (ts_rank) в Postgres.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_postgres(db, q, kind, limit)
+    return await _search_sqlite(db, q, kind, limit)
@@ -0,0 +1,168 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, contains_eager, joinedload, raiseload
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from database.models import City, TourGuide, Travel
+from models.city_model import CityResponse
+from models.tourguide_model import TourGuideResponse
+from models.travel_model import TravelResponse
+from utils.serialization import RowShape
+
+
+def travel_relations():
+    """
+    Связи, которые отдает TravelResponse: город и гид с его городом. Это отношения
+    многие-к-одному, поэтому они подгружаются JOIN-ом в том же запросе, что и путешествия.
+    """
+    return [joinedload(Travel.city), joinedload(Travel.guide).joinedload(TourGuide.city)]
+
+
+def select_travels():
+    # raiseload("*"): любая не описанная здесь связь вызовет ошибку вместо скрытого запроса.
+    return select(Travel).options(*travel_relations(), raiseload("*"))
+
+
+GuideModel = aliased(TourGuide, name="guide")
+GuideCity = aliased(City, name="guide_city")
+
+# Колонки TravelResponse для списков: путешествие, его город и гид с городом одной строкой.
+TRAVEL_SHAPE = RowShape(TravelResponse, Travel, {
+    "city": RowShape(CityResponse, City),
+    "guide": RowShape(TourGuideResponse, GuideModel, {"city": RowShape(CityResponse, GuideCity)}, optional=True),
+})
+
+
+def select_travel_rows():
+    """
+    То же, что select_travels(), но строками из нужных колонок (см. TRAVEL_SHAPE):
+    списки кодируются в JSON напрямую, без ORM-объектов и моделей ответа.
+    """
+    return (
+        select(*TRAVEL_SHAPE.columns())
+        .select_from(Travel)
+        .join(Travel.city)
+        .outerjoin(GuideModel, Travel.guide)
+        .outerjoin(GuideCity, GuideModel.city)
+    )
+
+
+class unindexed_order(ColumnElement):
+    """
+    Колонка в ORDER BY, которую планировщик SQLite не должен использовать для сортировки.
+    Без статистики SQLite при ORDER BY ... LIMIT предпочитает полный проход в порядке
+    индекса сортировки вместо поиска по индексу фильтра; унарный `+` это отключает.
+    """
+
+    inherit_cache = True
+    _traverse_internals = [("column", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, column):
+        self.column = column
+        self.type = column.type
+
+
+@compiles(unindexed_order)
+def _compile_unindexed_order(element, compiler, **kw):
+    return compiler.process(element.column, **kw)
+
+
+@compiles(unindexed_order, "sqlite")
+def _compile_unindexed_order_sqlite(element, compiler, **kw):
+    return "+" + compiler.process(element.column, **kw)
+
+
+# Ключи сортировки: колонка и функция разбора значения из курсора.
+SORT_KEYS = {
+    "id": (Travel.id, int),
+    "price": (Travel.price, float),
+    "start_date": (Travel.start_date, date.fromisoformat),
+    "end_date": (Travel.end_date, date.fromisoformat),
+    "rating": (Travel.rating_avg, float),
+}
+
+
+class TravelSearchParams:
+    """
+    Фильтры и сортировка поиска путешествий. Каждая комбинация фильтров
+    опирается на индекс таблицы travels (см. __table_args__ модели Travel).
+    """
+
+    def __init__(
+        self,
+        start_date: Optional[date] = Query(None, description="Дата начала путешествия, не раньше."),
+        end_date: Optional[date] = Query(None, description="Дата окончания путешествия, не позже."),
+        min_price: Optional[float] = Query(None, description="Минимальная цена."),
+        max_price: Optional[float] = Query(None, description="Максимальная цена."),
+        name_city: Optional[str] = Query(None, description="Название города."),
+        duration: Optional[str] = Query(None, description="Продолжительность путешествия."),
+        sort_by: str = Query("id", pattern=f"^({'|'.join(SORT_KEYS)})$", description="Поле сортировки."),
+        order: str = Query("asc", pattern="^(asc|desc)$", description="Направление сортировки."),
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_price = min_price
+        self.max_price = max_price
+        self.name_city = name_city
+        self.duration = duration
+        self.sort_by = sort_by
+        self.order = order
+
+    @property
+    def keys(self) -> list:
+        keys = [SORT_KEYS[self.sort_by]]
+        if self.sort_by != "id":
+            keys.append(SORT_KEYS["id"])
+        return keys
+
+    @property
+    def descending(self) -> bool:
+        return self.order == "desc"
+
+    @property
+    def filtered(self) -> set:
+        filters = {
+            "city_id": self.name_city, "start_date": self.start_date, "end_date": self.end_date,
+            "price": self.min_price if self.min_price is not None else self.max_price,
+            "duration": self.duration,
+        }
+        return {name for name, value in filters.items() if value is not None}
+
+    @property
+    def order_by(self) -> list:
+        """
+        Сортировка, при которой фильтр остается индексным поиском. Индекс (city_id, id)
+        и индексы по колонке сортировки сами отдают строки в нужном порядке.
+        """
+        filtered = self.filtered
+        if not filtered or self.sort_by in filtered or filtered == {"city_id"}:
+            return [column for column, _ in self.keys]
+        return [unindexed_order(column) for column, _ in self.keys]
+
+
+def build_search_query(params: TravelSearchParams, rows: bool = False):
+    if rows:
+        query = select_travel_rows()
+    else:
+        query = (
+            select(Travel)
+            .join(Travel.city)
+            .options(contains_eager(Travel.city), joinedload(Travel.guide).joinedload(TourGuide.city), raiseload("*"))
+        )
+    filters = [
+        City.name == params.name_city if params.name_city else None,
+        Travel.start_date >= params.start_date if params.start_date else None,
+        Travel.end_date <= params.end_date if params.end_date else None,
+        Travel.price >= params.min_price if params.min_price is not None else None,
+        Travel.price <= params.max_price if params.max_price is not None else None,
+        Travel.duration == params.duration if params.duration is not None else None,
+    ]
+    for condition in filters:
+        if condition is not None:
+            query = query.where(condition)
+    return query
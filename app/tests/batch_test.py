@@ -0,0 +1,54 @@
+import dataclasses
+
+import pytest
+
+from services import batch_services
+from services.batch_services import BATCH_MAX_IDS
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_travels_batch_keeps_request_order(client):
+    city, guide, first = await create_catalog(client)
+    second = (await client.post("/travel/create", json={
+        "name": "Castle", "price": 50.0, "duration": "1 день", "start_date": "2025-07-01",
+        "end_date": "2025-07-01", "city_id": city["id"],
+    })).json()
+
+    response = await client.get(f"/travels/batch?ids={second['id']},999,{first['id']},{second['id']}")
+    assert response.status_code == 200
+    assert "etag" in response.headers
+    body = response.json()
+    assert [(item["id"], item["status"]) for item in body["items"]] == [
+        (second["id"], "found"), (999, "not_found"), (first["id"], "found"), (second["id"], "found"),
+    ]
+    assert body["missing"] == [999]
+    assert body["items"][1]["item"] is None
+    assert body["items"][2]["item"] == (await client.get(f"/travel/{first['id']}")).json()
+    assert body["items"][0]["item"]["guide"] is None
+
+
+async def test_guides_batch_includes_city(client):
+    city, guide, _ = await create_catalog(client)
+    body = (await client.get(f"/tour_guides/batch?ids=5,{guide['id']}")).json()
+    assert body["items"][0] == {"id": 5, "status": "not_found", "item": None}
+    assert body["items"][1]["item"]["city"]["name"] == city["name"]
+
+
+async def test_users_batch_is_chunked(client, query_counter, monkeypatch):
+    for i in range(5):
+        await client.post("/user/create", json={"name": f"user{i}", "age": 20 + i})
+    monkeypatch.setattr(batch_services, "settings", dataclasses.replace(batch_services.settings, batch_read_size=2))
+
+    with query_counter:
+        body = (await client.get("/users/batch?ids=1,2,3,4,5,1")).json()
+    # Пять различных ID по два в запросе — три запроса IN.
+    assert query_counter.count == 3
+    assert [item["item"]["name"] for item in body["items"]] == ["user0", "user1", "user2", "user3", "user4", "user0"]
+    assert body["missing"] == []
+
+
+@pytest.mark.parametrize("ids", ["1,a", "", ",".join(["1"] * (BATCH_MAX_IDS + 1))])
+async def test_batch_rejects_bad_ids(client, ids):
+    assert (await client.get(f"/users/batch?ids={ids}")).status_code == 400
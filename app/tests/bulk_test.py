@@ -0,0 +1,55 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def travel(name, city_id=1, guide_id=None, price=100.0):
+    return {
+        "name": name, "price": price, "duration": "3 дня",
+        "start_date": "2025-06-01", "end_date": "2025-06-03",
+        "city_id": city_id, "guide_id": guide_id,
+    }
+
+
+async def test_bulk_cities_create_then_update(client):
+    created = (await client.post("/cities/bulk", json=[
+        {"name": "Минск", "description": "Столица"},
+        {"name": "Брест", "description": "Крепость"},
+    ])).json()
+    assert (created["created"], created["updated"], created["failed"]) == (2, 0, 0)
+
+    updated = (await client.post("/cities/bulk", json=[
+        {"name": "Брест", "description": "Новое описание"},
+        {"name": "Гродно", "description": "Замки"},
+    ])).json()
+    assert [item["status"] for item in updated["items"]] == ["updated", "created"]
+    assert updated["items"][0]["id"] == created["items"][1]["id"]
+
+    city = (await client.get(f"/city?id={created['items'][1]['id']}")).json()
+    assert city["description"] == "Новое описание"
+
+
+async def test_bulk_travels_reports_per_item_errors(client):
+    await client.post("/cities/bulk", json=[{"name": "Минск", "description": "Столица"}])
+    result = (await client.post("/travels/bulk", json=[
+        travel("Old Town"),
+        travel("Nowhere", city_id=99),
+        travel("Guided", guide_id=42),
+        travel("Old Town", price=150.0),
+    ])).json()
+
+    statuses = [item["status"] for item in result["items"]]
+    assert statuses == ["error", "error", "error", "created"]
+    assert "Duplicate" in result["items"][0]["detail"]
+    assert result["items"][1]["detail"] == "City not found."
+    assert (result["created"], result["failed"]) == (1, 3)
+
+    saved = (await client.get(f"/travel/{result['items'][3]['id']}")).json()
+    assert saved["price"] == 150.0
+    assert (await client.get("/search?q=Old")).json()[0]["title"] == "Old Town"
+
+
+async def test_bulk_rejects_invalid_batch_as_a_whole(client):
+    response = await client.post("/travels/bulk", json=[travel("Ok"), {"name": "Broken"}])
+    assert response.status_code == 422
+    assert (await client.get("/treves")).json()["items"] == []
@@ -0,0 +1,63 @@
+import pytest
+
+from utils.cache import MISSING, ReadThroughCache, TTLLRUCache, catalog_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLLRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLLRUCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_invalidate_bumps_namespace_only():
+    cache = ReadThroughCache(TTLLRUCache())
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert await cache.get_or_load("cities", "k", loader) == 1
+    assert await cache.get_or_load("guides", "k", loader) == 2
+    cache.invalidate("cities")
+    assert await cache.get_or_load("cities", "k", loader) == 3
+    assert await cache.get_or_load("guides", "k", loader) == 2
+
+
+@pytest.mark.anyio
+async def test_catalog_reads_are_cached_and_invalidated(client):
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "-"})).json()
+    await client.get("/cities")
+    await client.get("/cities")
+    stats = (await client.get("/debug/cache")).json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    await client.put(f"/city/{city['id']}", json={"name": "Минск", "description": "Столица"})
+    assert (await client.get("/cities")).json()["items"][0]["description"] == "Столица"
+    assert (await client.get("/city", params={"id": 42})).status_code == 404
+    assert catalog_cache.stats()["invalidations"] == 2
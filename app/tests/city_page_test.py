@@ -0,0 +1,136 @@
+import datetime
+
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from database.city_pages import lock_cities, rebuild_pages, upsert_pages
+from tests.rating_test import add_review
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_travel(client, city_id, name, days_from_now):
+    start = datetime.date.today() + datetime.timedelta(days=days_from_now)
+    response = await client.post("/travel/create", json={
+        "name": name, "price": 100.0, "duration": "3 дня",
+        "start_date": start.isoformat(), "end_date": (start + datetime.timedelta(days=2)).isoformat(),
+        "city_id": city_id,
+    })
+    return response.json()
+
+
+async def get_page(client, city_id):
+    response = await client.get(f"/city/{city_id}/page")
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_page_follows_related_changes(client):
+    # Путешествие из create_catalog уже прошло и на страницу не попадает.
+    city, guide, _ = await create_catalog(client)
+    page = await get_page(client, city["id"])
+    assert page["city"]["name"] == "Минск"
+    assert [item["name"] for item in page["guides"]] == ["Иван"]
+    assert page["upcoming_travels"] == []
+
+    later = await add_travel(client, city["id"], "Later", 30)
+    sooner = await add_travel(client, city["id"], "Sooner", 10)
+    page = await get_page(client, city["id"])
+    assert [item["name"] for item in page["upcoming_travels"]] == ["Sooner", "Later"]
+
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    await add_review(client, user["id"], sooner["id"], 5)
+    await add_review(client, user["id"], sooner["id"], 2)
+    assert (await get_page(client, city["id"]))["rating"] == {"average": 3.5, "count": 2}
+
+    await client.delete(f"/travel/{later['id']}")
+    await client.delete(f"/tour_guide/{guide['id']}")
+    page = await get_page(client, city["id"])
+    assert [item["name"] for item in page["upcoming_travels"]] == ["Sooner"]
+    assert page["guides"] == []
+
+
+async def test_moved_travel_leaves_old_city_page(client):
+    first = (await client.post("/city/create", json={"name": "Минск", "description": "Столица"})).json()
+    second = (await client.post("/city/create", json={"name": "Брест", "description": ""})).json()
+    travel = await add_travel(client, first["id"], "Castle", 5)
+    await client.put(f"/travel/{travel['id']}", json={**travel, "city_id": second["id"]})
+
+    assert (await get_page(client, first["id"]))["upcoming_travels"] == []
+    assert [item["name"] for item in (await get_page(client, second["id"]))["upcoming_travels"]] == ["Castle"]
+
+
+async def test_order_does_not_rebuild_page(client, session_maker):
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "Столица"})).json()
+    travel = await add_travel(client, city["id"], "Castle", 5)
+    built_at = (await get_page(client, city["id"]))["built_at"]
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    assert (await client.post("/order/create", json={"user_id": user["id"], "travel_id": travel["id"]})).status_code == 200
+    assert (await get_page(client, city["id"]))["built_at"] == built_at
+
+
+async def test_bulk_upsert_rebuilds_only_its_cities(client):
+    cities = (await client.post("/cities/bulk", json=[
+        {"name": name, "description": ""} for name in ("Минск", "Брест", "Гродно")
+    ])).json()["items"]
+    minsk, brest, grodno = (item["id"] for item in cities)
+    await add_travel(client, minsk, "Castle", 5)
+    built_at = {id: (await get_page(client, id))["built_at"] for id in (minsk, brest, grodno)}
+
+    # Путешествие переносится в Брест: пересобираются Минск и Брест, Гродно не трогается.
+    start = (datetime.date.today() + datetime.timedelta(days=5)).isoformat()
+    await client.post("/travels/bulk", json=[{
+        "name": "Castle", "price": 120.0, "duration": "3 дня", "start_date": start, "end_date": start, "city_id": brest,
+    }])
+    assert (await get_page(client, grodno))["built_at"] == built_at[grodno]
+    assert (await get_page(client, minsk))["upcoming_travels"] == []
+    assert [item["price"] for item in (await get_page(client, brest))["upcoming_travels"]] == [120.0]
+
+    await client.post("/cities/bulk", json=[{"name": "Брест", "description": "Крепость"}])
+    assert (await get_page(client, brest))["city"]["description"] == "Крепость"
+    assert (await get_page(client, grodno))["built_at"] == built_at[grodno]
+
+
+async def test_deleted_city_has_no_page(client):
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "Столица"})).json()
+    await get_page(client, city["id"])
+    await client.delete(f"/city/{city['id']}")
+    response = await client.get(f"/city/{city['id']}/page")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "City not found"
+
+
+async def test_full_rebuild_matches_incremental(client, session_maker):
+    city, _, _ = await create_catalog(client)
+    await add_travel(client, city["id"], "Castle", 5)
+    incremental = await get_page(client, city["id"])
+
+    async with session_maker() as db:
+        assert await (await db.connection()).run_sync(rebuild_pages) == 1
+        await db.commit()
+    rebuilt = await get_page(client, city["id"])
+    assert {**rebuilt, "built_at": None} == {**incremental, "built_at": None}
+
+
+async def test_page_is_single_lookup(client, query_counter):
+    city, _, _ = await create_catalog(client)
+    with query_counter:
+        await get_page(client, city["id"])
+    assert query_counter.count == 1
+
+
+async def test_concurrent_writes_to_one_city_all_reach_page(file_client):
+    client, _ = file_client
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "Столица"})).json()
+    await asyncio.gather(*(add_travel(client, city["id"], f"Travel {i}", i + 1) for i in range(8)))
+    assert len((await get_page(client, city["id"]))["upcoming_travels"]) == 8
+
+
+def test_page_writes_lock_cities_and_upsert_on_postgres():
+    dialect = postgresql.dialect()
+    assert "FOR NO KEY UPDATE" in str(lock_cities([1, 2]).compile(dialect=dialect))
+    sql = str(upsert_pages("postgresql").compile(dialect=dialect))
+    assert "ON CONFLICT (city_id) DO UPDATE" in sql
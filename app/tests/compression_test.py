@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+
+from utils import compression
+from utils.compression import COMPRESSION_MINIMUM_SIZE, negotiate_encoding
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", compression.ENCODINGS[0]),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+async def create_cities(client, count=20):
+    for i in range(count):
+        await client.post("/city/create", json={"name": f"Город {i}", "description": "Описание " * 10})
+
+
+async def test_large_response_is_gzipped(client):
+    await create_cities(client)
+    response = await client.get("/treves/export", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers  # пустая выгрузка меньше порога
+
+    plain = await client.get("/cities", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) >= COMPRESSION_MINIMUM_SIZE
+
+    response = await client.get("/cities", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == plain.headers["etag"]
+    assert response.json() == plain.json()
+    assert response.num_bytes_downloaded < len(plain.content) / 2
+
+
+async def test_small_response_is_not_compressed(client):
+    user = (await client.post("/user/create", json={"name": "anna", "age": 30})).json()
+    response = await client.get(f"/user/{user['id']}", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+async def test_cached_catalog_is_compressed_once(client, monkeypatch):
+    await create_cities(client)
+    calls = []
+    original = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda data, encoding: calls.append(encoding) or original(data, encoding))
+
+    bodies = [(await client.get("/cities", headers={"Accept-Encoding": "gzip"})).content for _ in range(3)]
+    assert calls == ["gzip"]
+    assert bodies[0] == bodies[1] == bodies[2]
+
+
+async def test_streaming_export_is_compressed_in_chunks(client):
+    await create_cities(client, 1)
+    city = (await client.get("/cities")).json()["items"][0]
+    travels = [
+        {"name": f"Travel {i}", "price": 10.0 + i, "duration": "3 дня", "start_date": "2025-06-01",
+         "end_date": "2025-06-03", "city_id": city["id"]}
+        for i in range(100)
+    ]
+    await client.post("/travels/bulk", json=travels)
+
+    response = await client.get("/treves/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 100
+
+
+def test_compress_roundtrip():
+    data = b'{"items": []}' * 100
+    assert gzip.decompress(compression.compress(data, "gzip")) == data
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import event, update
+
+from database.models import City
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cities_etag_and_not_modified(client):
+    await create_catalog(client)
+    first = await client.get("/cities")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and "last-modified" in first.headers
+
+    cached = await client.get("/cities", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    since = await client.get("/cities", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+
+async def test_write_changes_etag(client):
+    city, _, travel = await create_catalog(client)
+    etag = (await client.get(f"/travel/{travel['id']}")).headers["etag"]
+
+    await client.put(f"/city/{city['id']}", json={"name": "Минск", "description": "Новая"})
+    response = await client.get(f"/travel/{travel['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["city"]["description"] == "Новая"
+
+
+async def test_other_tables_keep_etag(client):
+    await create_catalog(client)
+    etag = (await client.get("/cities")).headers["etag"]
+    await client.post("/user/create", json={"name": "Анна", "age": 30})
+    assert (await client.get("/cities", headers={"If-None-Match": etag})).status_code == 304
+
+
+async def test_cached_cities_follow_writes_from_other_workers(client, session_maker):
+    city, _, _ = await create_catalog(client)
+    first = await client.get("/cities")
+
+    # Запись другого воркера: версия таблицы растет, а кэш этого процесса не сброшен.
+    async with session_maker() as db:
+        await db.execute(update(City).where(City.id == city["id"]).values(description="Новая"))
+        await db.commit()
+
+    response = await client.get("/cities", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json()["items"][0]["description"] == "Новая"
+
+
+
+async def test_version_bump_is_last_statement_before_commit(file_client):
+    client, session_maker = file_client
+    city, _, _ = await create_catalog(client)
+    engine, log = session_maker.kw["bind"].sync_engine, []
+
+    def statement(conn, cursor, sql, *args):
+        if not sql.startswith(("SELECT", "BEGIN")):
+            log.append(sql.split()[1] if sql.startswith("UPDATE") else sql.split()[0])
+
+    def commit(conn):
+        log.append("COMMIT")
+
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    try:
+        await client.put(f"/city/{city['id']}", json={"name": "Минск", "description": "Новая"})
+    finally:
+        event.remove(engine, "before_cursor_execute", statement)
+        event.remove(engine, "commit", commit)
+    # Версия растет в транзакции записи, после пересборки страницы города.
+    assert log[log.index("cities"):] == ["cities", "INSERT", "table_versions", "COMMIT"]
@@ -0,0 +1,169 @@
+import sqlite3
+
+import aiosqlite
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import database.models  # noqa: F401  регистрирует таблицы в Base.metadata
+from database.connect import Base
+from database.pool import engine_options
+from database.sqlite import install_sqlite_pragmas, use_immediate_transactions
+from main import app
+from routes.debug import get_debug_settings
+from routes.travel import travel_flight
+from utils.cache import catalog_cache
+from utils.helpers import get_db, get_session_maker
+from utils.metrics import metrics
+from utils.settings import DatabaseSettings, DebugSettings
+
+# Токен отладочных маршрутов в тестах; клиенты отправляют его в каждом запросе.
+DEBUG_TOKEN = "test-debug-token"
+DEBUG_HEADERS = {"X-Debug-Token": DEBUG_TOKEN}
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def template_db():
+    """
+    Схема строится один раз на процесс (с pytest-xdist — на воркер) в SQLite в памяти,
+    вместе с полнотекстовым индексом и начальными версиями таблиц.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    connection = engine.raw_connection()
+    yield connection.driver_connection
+    connection.close()
+    engine.dispose()
+
+
+def clone_database(template: sqlite3.Connection) -> sqlite3.Connection:
+    """Копия шаблона в новую базу в памяти через backup API SQLite: страницы копируются без DDL."""
+    target = sqlite3.connect(":memory:", check_same_thread=False)
+    template.backup(target)
+    return target
+
+
+@pytest.fixture(scope="session")
+async def db_engine(template_db):
+    """
+    Общая база в памяти на весь прогон: одно соединение (StaticPool), скопированное из шаблона.
+    Транзакциями управляет SQLAlchemy (BEGIN вместо неявных транзакций драйвера),
+    иначе SAVEPOINT в pysqlite работают неправильно.
+    """
+    async def connect():
+        return await aiosqlite.Connection(lambda: clone_database(template_db), 64)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool, async_creator=connect)
+    use_immediate_transactions(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db_connection(db_engine):
+    """Внешняя транзакция теста: все, что тест записал, откатывается после него."""
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+        yield connection
+        await transaction.rollback()
+
+
+@pytest.fixture
+def session_maker(db_connection):
+    # commit в коде приложения фиксирует только SAVEPOINT внутри транзакции теста.
+    return async_sessionmaker(
+        bind=db_connection, join_transaction_mode="create_savepoint", autoflush=False, expire_on_commit=False
+    )
+
+
+@pytest.fixture
+async def client(session_maker):
+    async def override_get_db():
+        async with session_maker() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_maker] = lambda: session_maker
+    app.dependency_overrides[get_debug_settings] = lambda: DebugSettings(token=DEBUG_TOKEN)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=DEBUG_HEADERS) as client:
+        yield client
+    app.dependency_overrides.clear()
+    catalog_cache.clear()
+    travel_flight.clear()
+    metrics.reset()
+
+
+@pytest.fixture
+async def file_client(tmp_path):
+    """
+    Клиент поверх файловой базы с теми же настройками пула и PRAGMA, что и в приложении.
+    Нужен тестам с одновременными запросами: у каждого запроса свое соединение и транзакция.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'database.db'}"
+    # Таймауты с запасом: под pytest-xdist на загруженной машине 2000 писателей ждут дольше.
+    settings = DatabaseSettings(pool_timeout=120.0, sqlite_busy_timeout=60000)
+    engine = create_async_engine(url, **engine_options(settings, url, is_async=True))
+    install_sqlite_pragmas(engine, settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_maker() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_maker] = lambda: session_maker
+    app.dependency_overrides[get_debug_settings] = lambda: DebugSettings(token=DEBUG_TOKEN)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test", headers=DEBUG_HEADERS, timeout=60
+    ) as client:
+        yield client, session_maker
+    app.dependency_overrides.clear()
+    catalog_cache.clear()
+    travel_flight.clear()
+    metrics.reset()
+    await engine.dispose()
+
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryCounter:
+    """Считает SQL-запросы, которые движок отправил в базу."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.executed = 0
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.executed += 1
+        # SAVEPOINT и откаты к ним добавляет транзакция теста (см. session_maker), это не запросы приложения.
+        if not statement.startswith(TRANSACTION_CONTROL):
+            self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        self.statements = []
+        self.executed = 0
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    return QueryCounter(db_engine.sync_engine)
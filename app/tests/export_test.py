@@ -0,0 +1,98 @@
+import asyncio
+import csv
+import io
+import json
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.seed import seed_database
+from main import app
+from utils.helpers import get_session_maker
+
+pytestmark = pytest.mark.anyio
+
+# Полный прогон на 1M строк занимает около минуты, по умолчанию берем 100k.
+RSS_ROWS = int(os.environ.get("EXPORT_RSS_ROWS", 1_000_000 if os.environ.get("RUN_SLOW_TESTS") else 100_000))
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def drain(path: str) -> dict:
+    """
+    Вызывает приложение напрямую по ASGI и сразу выбрасывает тело ответа:
+    httpx.ASGITransport буферизует ответ целиком и исказил бы замер памяти.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "server": ("test", 80), "client": ("test", 1),
+    }
+    done = asyncio.Event()
+    requested = False
+    stats = {"status": None, "bytes": 0, "lines": 0, "baseline": rss_bytes()}
+    stats["peak"] = stats["baseline"]
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+            stats["peak"] = max(stats["peak"], rss_bytes())
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    return stats
+
+
+async def test_export_travels_ndjson(client):
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "-"})).json()
+    for i in range(3):
+        await client.post("/travel/create", json={
+            "name": f"Trip {i}", "price": 10.0 + i, "duration": "1 день",
+            "start_date": "2025-06-01", "end_date": "2025-06-02", "city_id": city["id"],
+        })
+    response = await client.get("/treves/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Trip 0", "Trip 1", "Trip 2"]
+    assert rows[0]["start_date"] == "2025-06-01"
+
+
+async def test_export_reviews_csv_empty(client):
+    response = await client.get("/reviews/export", params={"format": "csv"})
+    assert response.status_code == 200
+    header = next(csv.reader(io.StringIO(response.text)))
+    assert header[:2] == ["id", "user_id"]
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="нужен /proc для замера RSS")
+async def test_export_memory_is_flat(tmp_path):
+    url = f"sqlite:///{tmp_path / 'export.db'}"
+    seed_database(url, cities=10, guides=1, travels=RSS_ROWS, users=1, reviews=0)
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    app.dependency_overrides[get_session_maker] = lambda: async_sessionmaker(engine)
+    try:
+        stats = await drain("/treves/export")
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+    assert stats["status"] == 200
+    assert stats["lines"] == RSS_ROWS
+    # Тело выгрузки занимает сотни мегабайт, рост RSS должен оставаться постоянным.
+    assert stats["peak"] - stats["baseline"] < 64 * 1024 * 1024, stats
@@ -0,0 +1,91 @@
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.pool import engine_options
+from tests.travel_test import create_catalog
+from utils.metrics import Histogram, Metrics
+from utils.settings import DatabaseSettings
+
+pytestmark = pytest.mark.anyio
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram()
+    for value in (0.001, 0.005, 0.3, 20.0):
+        histogram.observe(value)
+    cumulative = histogram.cumulative()
+    assert cumulative[0] == 2  # le=0.005 включает границу
+    assert cumulative[-1] == 3  # 20 с попадает только в +Inf
+    assert histogram.count == 4
+
+
+async def test_server_timing_counts_queries(client, query_counter):
+    _, _, travel = await create_catalog(client)
+    with query_counter:
+        response = await client.get(f"/travel/{travel['id']}")
+    timing = response.headers["server-timing"]
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries"', timing)
+    # Server-Timing считает все команды курсора, включая SAVEPOINT транзакции теста.
+    assert timing.endswith(f'desc="{query_counter.executed} queries"')
+
+
+async def test_metrics_endpoint_reports_routes(client):
+    _, _, travel = await create_catalog(client)
+    await client.get(f"/travel/{travel['id']}")
+    await client.get("/travel/999")
+    await client.get("/no/such/path")
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/travel/{id}",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/travel/{id}",status="404"} 1' in body
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/travel/{id}"} 2' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/travel/{id}",le="+Inf"} 2' in body
+    queries = re.search(r'db_queries_total\{method="GET",route="/travel/\{id\}"\} (\d+)', body)
+    assert int(queries.group(1)) > 0
+    # Сам запрос к /metrics еще обрабатывается.
+    assert "http_requests_in_flight 1" in body
+    # Пул приложения тоже виден Prometheus.
+    assert 'db_pool_size{pool="write"}' in body
+    assert 'db_pool_wait_seconds_bucket{pool="write",le="+Inf"}' in body
+
+
+async def test_pool_metrics_are_exported(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(url, **engine_options(
+        DatabaseSettings(pool_size=1, max_overflow=0, pool_timeout=5), url, is_async=True
+    ))
+    registry = Metrics()
+    registry.register_pool("write", engine)
+    registry.register_pool("memory", create_async_engine("sqlite+aiosqlite://"))
+
+    async def hold():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(0.05)
+
+    try:
+        await asyncio.gather(hold(), hold())
+        async with engine.connect():
+            body = registry.render()
+    finally:
+        await engine.dispose()
+
+    assert "# TYPE db_pool_connections_in_use gauge" in body
+    assert 'db_pool_size{pool="write"} 1' in body
+    assert 'db_pool_connections_in_use{pool="write"} 1' in body
+    assert 'db_pool_checkouts_total{pool="write"} 3' in body
+    assert 'db_pool_timeouts_total{pool="write"} 0' in body
+    assert "# TYPE db_pool_wait_seconds histogram" in body
+    assert 'db_pool_wait_seconds_bucket{pool="write",le="+Inf"} 3' in body
+    # Второе соединение ждало, пока первое вернется в пул (около 50 мс).
+    waited = re.search(r'db_pool_wait_seconds_sum\{pool="write"\} ([\d.]+)', body)
+    assert float(waited.group(1)) >= 0.04
+    # StaticPool без замеров в метрики не попадает.
+    assert 'pool="memory"' not in body
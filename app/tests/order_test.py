@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from database.models import Order, Travel, User
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_user(client, name="Анна"):
+    return (await client.post("/user/create", json={"name": name, "age": 30})).json()
+
+
+async def test_order_lifecycle(client):
+    city, guide, travel = await create_catalog(client)
+    await client.put(f"/travel/{travel['id']}", json={**travel, "capacity": 1, "city_id": city["id"], "guide_id": guide["id"]})
+    user = await create_user(client)
+
+    order = (await client.post("/order/create", json={"user_id": user["id"], "travel_id": travel["id"]})).json()
+    assert order["status"] == "в ожидании" and order["travel"]["seats_booked"] == 1
+    sold_out = await client.post("/order/create", json={"user_id": user["id"], "travel_id": travel["id"]})
+    assert sold_out.status_code == 409
+
+    confirmed = await client.put(f"/order/{order['id']}/status", json={"status": "подтвержден"})
+    assert confirmed.json()["status"] == "подтвержден"
+    cancelled = (await client.put(f"/order/{order['id']}/status", json={"status": "отменен"})).json()
+    assert cancelled["travel"]["seats_booked"] == 0
+    again = await client.put(f"/order/{order['id']}/status", json={"status": "отменен"})
+    assert again.status_code == 409
+
+    orders = (await client.get(f"/user/{user['id']}/orders")).json()
+    assert [item["id"] for item in orders["items"]] == [order["id"]]
+    assert (await client.post("/order/create", json={"user_id": 999, "travel_id": travel["id"]})).status_code == 404
+    assert (await client.post("/order/create", json={"user_id": user["id"], "travel_id": 999})).status_code == 404
+
+
+async def test_idempotency_key_returns_same_order(client):
+    _, _, travel = await create_catalog(client)
+    user = await create_user(client)
+    body = {"user_id": user["id"], "travel_id": travel["id"]}
+    first = (await client.post("/order/create", json=body, headers={"Idempotency-Key": "abc"})).json()
+    second = (await client.post("/order/create", json=body, headers={"Idempotency-Key": "abc"})).json()
+    assert first["id"] == second["id"]
+    assert second["travel"]["seats_booked"] == 1
+
+
+async def test_idempotency_key_with_different_travel_is_rejected(client):
+    city, guide, travel = await create_catalog(client)
+    other = (await client.post("/travel/create", json={
+        **travel, "name": "New Town", "city_id": city["id"], "guide_id": guide["id"],
+    })).json()
+    user = await create_user(client)
+    headers = {"Idempotency-Key": "abc"}
+    first = await client.post("/order/create", json={"user_id": user["id"], "travel_id": travel["id"]}, headers=headers)
+    assert first.status_code == 200
+
+    reused = await client.post("/order/create", json={"user_id": user["id"], "travel_id": other["id"]}, headers=headers)
+    assert reused.status_code == 422
+    assert (await client.get(f"/travel/{other['id']}")).json()["seats_booked"] == 0
+    orders = (await client.get(f"/user/{user['id']}/orders")).json()
+    assert [item["id"] for item in orders["items"]] == [first.json()["id"]]
+
+
+FLASH_SALE_REQUESTS = 2000
+FLASH_SALE_SEATS = 100
+
+
+async def test_flash_sale_never_oversells(file_client):
+    client, session_maker = file_client
+    city, guide, travel = await create_catalog(client)
+    await client.put(f"/travel/{travel['id']}", json={**travel, "capacity": FLASH_SALE_SEATS, "city_id": city["id"], "guide_id": guide["id"]})
+    async with session_maker() as db:
+        await db.execute(insert(User), [{"name": f"user{i}", "age": 30} for i in range(FLASH_SALE_REQUESTS)])
+        await db.commit()
+        user_ids = list(await db.scalars(select(User.id)))
+
+    async def book(user_id, key=None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return await client.post("/order/create", json={"user_id": user_id, "travel_id": travel["id"]}, headers=headers)
+
+    # Каждый второй запрос — повтор одного и того же клиента с одним ключом.
+    distinct = [book(user_id) for user_id in user_ids[: FLASH_SALE_REQUESTS // 2]]
+    retries = [book(user_ids[-1], key="retry") for _ in range(FLASH_SALE_REQUESTS // 2)]
+    responses = await asyncio.gather(*(request for pair in zip(distinct, retries) for request in pair))
+
+    assert {response.status_code for response in responses} <= {200, 409}
+    booked_by_distinct = sum(response.status_code == 200 for response in responses[::2])
+    retried = {response.json()["id"] for response in responses[1::2] if response.status_code == 200}
+    assert len(retried) <= 1
+
+    async with session_maker() as db:
+        booked = await db.scalar(select(Travel.seats_booked).where(Travel.id == travel["id"]))
+        orders = await db.scalar(select(func.count()).select_from(Order))
+    assert booked == orders == booked_by_distinct + len(retried) == FLASH_SALE_SEATS
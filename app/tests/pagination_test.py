@@ -0,0 +1,38 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def collect(client, url, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["after"] = cursor
+        body = (await client.get(url, params=params)).json()
+        ids += [item["id"] for item in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+async def test_cities_keyset_pages(client):
+    for i in range(7):
+        await client.post("/city/create", json={"name": f"City {i}", "description": "-"})
+    ids, pages = await collect(client, "/cities", limit=3)
+    assert ids == list(range(1, 8))
+    assert pages == 3
+
+
+async def test_exact_page_has_no_next_cursor(client):
+    for i in range(4):
+        await client.post("/user/create", json={"name": f"u{i}", "age": 20})
+    body = (await client.get("/users", params={"limit": 4})).json()
+    assert len(body["items"]) == 4
+    assert body["next_cursor"] is None
+
+
+async def test_invalid_cursor(client):
+    response = await client.get("/treves", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
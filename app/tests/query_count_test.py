@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+
+from database.models import City, Review, TourGuide, Travel, User
+from utils.cache import catalog_cache
+
+pytestmark = pytest.mark.anyio
+
+# Верхняя граница числа SQL-запросов на один запрос к списку, независимо от числа строк.
+MAX_LIST_QUERIES = 4
+
+LIST_ENDPOINTS = [
+    "/treves",
+    "/travels/search",
+    "/city/1/travels",
+    "/reviews",
+    "/reviews/1",
+    "/cities",
+    "/tour_guides/",
+    "/users",
+]
+
+
+async def seed(session_maker, start, rows):
+    """Каждая строка со своим городом, гидом, пользователем и путешествием: худший случай для N+1."""
+    async with session_maker() as db:
+        for i in range(start, start + rows):
+            city = City(name=f"City {i}", description="")
+            guide = TourGuide(name=f"Guide {i}", experience_years=1, contact_info="+375", city=city)
+            travel = Travel(
+                name=f"Travel {i}", price=100.0 + i, duration="3 дня",
+                start_date=datetime.date(2025, 6, 1), end_date=datetime.date(2025, 6, 3),
+                # Все путешествия в первом городе, чтобы /city/1/travels вернул все строки.
+                city_id=1, guide=guide,
+            )
+            user = User(name=f"User {i}", age=20 + i)
+            # ReviewBase.created_at — дата, поэтому время должно быть нулевым.
+            created_at = datetime.datetime(2025, 6, 4)
+            # Отзыв на первое путешествие, чтобы /reviews/1 вернул все строки, и на свое.
+            db.add_all([
+                city, guide, travel, user,
+                Review(user=user, travel_id=1, rating=5, created_at=created_at),
+                Review(user=user, travel=travel, rating=4, created_at=created_at),
+            ])
+        await db.commit()
+
+
+@pytest.mark.parametrize("url", LIST_ENDPOINTS)
+async def test_list_query_count_is_constant(client, session_maker, query_counter, url):
+    await seed(session_maker, 0, 1)
+    with query_counter:
+        small = await client.get(url)
+    few = query_counter.count
+
+    await seed(session_maker, 1, 20)
+    # Сбрасываем кэш справочников, иначе второй запрос вовсе не дойдет до базы.
+    catalog_cache.clear()
+    with query_counter:
+        large = await client.get(url)
+
+    assert small.status_code == large.status_code == 200
+    assert few <= MAX_LIST_QUERIES, query_counter.statements
+    assert query_counter.count == few, query_counter.statements
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from database.models import Travel
+from services.rating_services import reconcile_ratings
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_review(client, user_id, travel_id, rating):
+    response = await client.post("/review/create", json={
+        "user_id": user_id, "travel_id": travel_id, "rating": rating, "created_at": "2025-06-04",
+    })
+    return response.json()
+
+
+async def test_aggregates_follow_review_changes(client, session_maker):
+    _, _, travel = await create_catalog(client)
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+
+    first = await add_review(client, user["id"], travel["id"], 5)
+    second = await add_review(client, user["id"], travel["id"], 2)
+    assert (second["travel"]["rating_count"], second["travel"]["rating_avg"]) == (2, 3.5)
+
+    updated = (await client.put(f"/review/{second['id']}", json={
+        "user_id": user["id"], "travel_id": travel["id"], "rating": 4, "created_at": "2025-06-04",
+    })).json()
+    assert updated["travel"]["rating_avg"] == 4.5
+
+    await client.delete(f"/review/{first['id']}")
+    saved = (await client.get(f"/travel/{travel['id']}")).json()
+    assert (saved["rating_count"], saved["rating_avg"]) == (1, 4.0)
+
+    async with session_maker() as db:
+        assert await reconcile_ratings(db) == []
+
+
+async def test_search_sorted_by_rating(client):
+    city, _, travel = await create_catalog(client)
+    other = (await client.post("/travel/create", json={**travel, "name": "Castle", "city_id": city["id"]})).json()
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    await add_review(client, user["id"], travel["id"], 3)
+    await add_review(client, user["id"], other["id"], 5)
+
+    page = (await client.get("/travels/search", params={"sort_by": "rating", "order": "desc", "limit": 1})).json()
+    assert page["items"][0]["name"] == "Castle"
+    rest = (await client.get("/travels/search", params={
+        "sort_by": "rating", "order": "desc", "limit": 1, "after": page["next_cursor"],
+    })).json()
+    assert rest["items"][0]["name"] == "Old Town"
+
+
+async def test_reconcile_detects_and_fixes_drift(client, session_maker):
+    _, _, travel = await create_catalog(client)
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    await add_review(client, user["id"], travel["id"], 4)
+    async with session_maker() as db:
+        await db.execute(update(Travel).values(rating_count=7, rating_sum=1))
+        await db.commit()
+
+        mismatches = await reconcile_ratings(db, fix=True)
+        assert mismatches == [{
+            "travel_id": travel["id"], "stored_count": 7, "stored_sum": 1, "stored_avg": 4.0,
+            "actual_count": 1, "actual_sum": 4, "actual_avg": 4.0,
+        }]
+        assert await reconcile_ratings(db) == []
+    saved = (await client.get(f"/travel/{travel['id']}")).json()
+    assert (saved["rating_count"], saved["rating_avg"]) == (1, 4.0)
+
+
+async def test_reconcile_checks_average(client, session_maker):
+    _, _, travel = await create_catalog(client)
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    await add_review(client, user["id"], travel["id"], 4)
+    async with session_maker() as db:
+        await db.execute(update(Travel).values(rating_avg=2.5))
+        await db.commit()
+        assert [row["stored_avg"] for row in await reconcile_ratings(db, fix=True)] == [2.5]
+        assert await reconcile_ratings(db) == []
+
+
+async def test_concurrent_review_updates_keep_aggregates(file_client):
+    # Одновременные запросы: у каждого свое соединение, поэтому файловая база, а не транзакция теста.
+    client, session_maker = file_client
+    _, _, travel = await create_catalog(client)
+    user = (await client.post("/user/create", json={"name": "Анна", "age": 30})).json()
+    review = await add_review(client, user["id"], travel["id"], 5)
+
+    responses = await asyncio.gather(*(
+        client.put(f"/review/{review['id']}", json={
+            "user_id": user["id"], "travel_id": travel["id"], "rating": rating, "created_at": "2025-06-04",
+        })
+        for rating in (1, 2, 3, 4, 2, 3)
+    ))
+    assert {response.status_code for response in responses} <= {200, 409}
+    async with session_maker() as db:
+        assert await reconcile_ratings(db) == []
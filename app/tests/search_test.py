@@ -0,0 +1,51 @@
+import pytest
+
+from services.search_services import fts5_query
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(client):
+    city = (await client.post("/city/create", json={
+        "name": "Минск", "description": "Столица Беларуси с замками неподалеку",
+    })).json()
+    await client.post("/tour_guide/create", json={
+        "name": "Анна", "experience_years": 3, "bio": "Знаток замков и костелов",
+        "contact_info": "-", "city_id": city["id"],
+    })
+    for name, description in [
+        ("Замки Беларуси", "Мир и Несвиж за один день"),
+        ("Браслав", "Озера и замок на горе"),
+        ("Нарочь", "Отдых на озере"),
+    ]:
+        await client.post("/travel/create", json={
+            "name": name, "description": description, "price": 50.0, "duration": "1 день",
+            "start_date": "2025-06-01", "end_date": "2025-06-02", "city_id": city["id"],
+        })
+    return city
+
+
+async def test_ranked_results_across_kinds(client):
+    await seed(client)
+    hits = (await client.get("/search", params={"q": "замк"})).json()
+    assert {hit["kind"] for hit in hits} == {"travel", "city", "guide"}
+    assert hits[0]["title"] == "Замки Беларуси"
+    assert [hit["rank"] for hit in hits] == sorted((hit["rank"] for hit in hits), reverse=True)
+
+
+async def test_index_follows_updates_and_deletes(client):
+    city = await seed(client)
+    travels = (await client.get("/search", params={"q": "озер", "kind": "travel"})).json()
+    assert {hit["title"] for hit in travels} == {"Браслав", "Нарочь"}
+
+    await client.put(f"/city/{city['id']}", json={"name": "Минск", "description": "Город героев"})
+    assert (await client.get("/search", params={"q": "столица"})).json() == []
+    assert (await client.get("/search", params={"q": "героев", "kind": "city"})).json()[0]["id"] == city["id"]
+
+    await client.delete(f"/travel/{travels[0]['id']}")
+    assert len((await client.get("/search", params={"q": "озер"})).json()) == 1
+
+
+def test_fts5_query_escapes_syntax():
+    assert fts5_query('замок" OR *') == '"замок"* "OR"*'
+    assert fts5_query("!!!") is None
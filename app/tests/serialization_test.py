@@ -0,0 +1,50 @@
+import pytest
+
+from models.travel_model import TravelResponse
+from models.user_model import UserResponse
+from routes.user import USER_SHAPE
+from services.travel_services import select_travels
+from tests.travel_test import create_catalog
+from utils.classes import Page
+from utils.serialization import RowShape
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_travel_rows_match_response_model(client, session_maker):
+    city, _, _ = await create_catalog(client)
+    # Путешествие без гида: LEFT JOIN дает NULL-колонки, в ответе должно быть "guide": null.
+    await client.post("/travel/create", json={
+        "name": "Без гида", "price": 50.5, "duration": "1 день",
+        "start_date": "2025-07-01", "end_date": "2025-07-01", "city_id": city["id"],
+    })
+
+    response = await client.get("/treves")
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"]
+
+    async with session_maker() as db:
+        travels = (await db.scalars(select_travels())).all()
+    expected = Page[TravelResponse].model_validate({"items": travels, "next_cursor": None}, from_attributes=True)
+    assert response.json() == expected.model_dump(mode="json")
+    assert response.json()["items"][1]["guide"] is None
+
+    search = await client.get("/travels/search", params={"name_city": "Минск"})
+    assert search.json() == response.json()
+    assert (await client.get(f"/city/{city['id']}/travels")).json() == response.json()
+
+
+async def test_users_page(client):
+    for age in (20, 30, 40):
+        await client.post("/user/create", json={"name": f"user{age}", "age": age})
+    first = (await client.get("/users", params={"limit": 2})).json()
+    assert first["items"] == [{"name": "user20", "age": 20, "id": 1}, {"name": "user30", "age": 30, "id": 2}]
+    rest = (await client.get("/users", params={"after": first["next_cursor"]})).json()
+    assert rest == {"items": [{"name": "user40", "age": 40, "id": 3}], "next_cursor": None}
+    assert USER_SHAPE.fields == list(UserResponse.model_fields)
+
+
+def test_shape_requires_columns_for_every_field():
+    from database.models import City
+    with pytest.raises(ValueError):
+        RowShape(TravelResponse, City)
@@ -0,0 +1,89 @@
+import pytest
+
+from utils.sessions import (
+    DatabaseSessionBackend, MemorySessionBackend, SignedTokenBackend, get_session_backend, make_session_backend,
+)
+from utils.settings import SessionSettings, load_session_settings
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "database", "signed"])
+def backend(request):
+    settings = SessionSettings(backend=request.param, secret="test-secret", ttl=60)
+    backend = make_session_backend(settings)
+    app.dependency_overrides[get_session_backend] = lambda: backend
+    yield backend
+    app.dependency_overrides.pop(get_session_backend, None)
+
+
+async def test_login_me_logout(client, backend):
+    user = (await client.post("/user/create", json={"name": "dasha", "age": 88})).json()
+    assert (await client.post("/user/login", json={"name": "dasha", "age": 1})).status_code == 401
+
+    token = (await client.post("/user/login", json={"name": "dasha", "age": 88})).json()["session_token"]
+    me = await client.get("/user/me", headers={"X-Session-Token": token})
+    assert me.json()["id"] == user["id"]
+    assert (await client.get("/user/me", headers={"X-Session-Token": token + "x"})).status_code == 401
+
+    assert (await client.post("/user/logout", json=token)).status_code == 200
+    if not isinstance(backend, SignedTokenBackend):
+        assert (await client.get("/user/me", headers={"X-Session-Token": token})).status_code == 401
+        assert (await client.post("/user/logout", json=token)).status_code == 404
+
+
+async def test_memory_sessions_expire_and_are_bounded():
+    clock = FakeClock()
+    sessions = MemorySessionBackend(ttl=10, maxsize=3, clock=clock)
+    first = await sessions.create(None, 1)
+    clock.now += 5
+    tokens = [await sessions.create(None, user_id) for user_id in (2, 3)]
+    assert await sessions.resolve(None, first) == 1
+
+    clock.now += 6
+    assert await sessions.resolve(None, first) is None
+    await sessions.create(None, 4)
+    assert len(sessions) == 3 and await sessions.resolve(None, tokens[0]) == 2
+    await sessions.create(None, 5)
+    assert len(sessions) == 3 and await sessions.resolve(None, tokens[0]) is None
+
+
+async def test_signed_tokens_expire_and_reject_tampering():
+    clock = FakeClock()
+    sessions = SignedTokenBackend("secret", ttl=10, clock=clock)
+    token = await sessions.create(None, 7)
+    assert await sessions.resolve(None, token) == 7
+    assert await SignedTokenBackend("other", ttl=10, clock=clock).resolve(None, token) is None
+    clock.now += 11
+    assert await sessions.resolve(None, token) is None
+
+
+async def test_non_ascii_tokens_are_rejected(client, backend):
+    # X-Session-Token в latin-1 и JSON-строка не из ASCII: 401/404, а не 500.
+    assert (await client.get("/user/me", headers={"X-Session-Token": b"a.\xe9"})).status_code == 401
+    assert (await client.post("/user/logout", json="a.é")).status_code == 404
+
+
+async def test_database_sessions_survive_backend_restart(session_maker):
+    async with session_maker() as db:
+        token = await DatabaseSessionBackend(ttl=60).create(db, 1)
+    async with session_maker() as db:
+        assert await DatabaseSessionBackend(ttl=60).resolve(db, token) == 1
+        assert await DatabaseSessionBackend(ttl=-1).resolve(db, await DatabaseSessionBackend(ttl=-1).create(db, 1)) is None
+
+
+def test_session_settings():
+    assert load_session_settings({"SESSION_BACKEND": "signed", "SESSION_TTL": "30"}).ttl == 30
+    with pytest.raises(ValueError):
+        make_session_backend(SessionSettings(backend="signed"))
+    with pytest.raises(ValueError):
+        make_session_backend(SessionSettings(backend="redis"))
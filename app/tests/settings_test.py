@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.pool import TimedAsyncQueuePool, TimedQueuePool, engine_options, pool_stats
+from utils.settings import DatabaseSettings, load_database_settings
+
+
+def test_defaults_without_environment():
+    assert load_database_settings({}) == DatabaseSettings()
+
+
+def test_environment_overrides_config_file(tmp_path):
+    config = tmp_path / "myapi.ini"
+    config.write_text("[database]\nurl = postgresql://db/app\npool_size = 20\npool_pre_ping = no\n")
+    settings = load_database_settings({"MYAPI_CONFIG": str(config), "DB_POOL_SIZE": "30", "DB_POOL_TIMEOUT": "2.5"})
+    assert settings.url == "postgresql://db/app"
+    assert (settings.pool_size, settings.pool_timeout, settings.pool_pre_ping) == (30, 2.5, False)
+    assert load_database_settings({"DATABASE_URL": "sqlite:///x.db"}).url == "sqlite:///x.db"
+
+
+def test_invalid_settings_are_rejected(tmp_path):
+    config = tmp_path / "myapi.ini"
+    config.write_text("[database]\npool_sise = 20\n")
+    with pytest.raises(ValueError):
+        load_database_settings({"MYAPI_CONFIG": str(config)})
+    with pytest.raises(ValueError):
+        load_database_settings({"DB_ECHO": "maybe"})
+
+
+def test_pool_class_per_dialect():
+    settings = DatabaseSettings(pool_size=7)
+    memory = engine_options(settings, "sqlite+aiosqlite://", is_async=True)
+    assert memory["poolclass"] is StaticPool and "pool_size" not in memory
+
+    sqlite_file = engine_options(settings, "sqlite:///./database.db", is_async=False)
+    assert sqlite_file["poolclass"] is TimedQueuePool and "pool_pre_ping" not in sqlite_file
+
+    writer = engine_options(settings, "sqlite+aiosqlite:///./database.db", is_async=True, single_writer=True)
+    assert (writer["pool_size"], writer["max_overflow"]) == (1, 0)
+
+    postgres = engine_options(settings, "postgresql+asyncpg://db/app", is_async=True, single_writer=True)
+    assert postgres["poolclass"] is TimedAsyncQueuePool
+    assert (postgres["pool_size"], postgres["pool_pre_ping"], postgres["pool_recycle"]) == (7, True, 1800)
+
+
+@pytest.mark.anyio
+async def test_pool_metrics_record_waits(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    settings = DatabaseSettings(pool_size=1, max_overflow=0, pool_timeout=5)
+    engine = create_async_engine(url, **engine_options(settings, url, is_async=True))
+
+    async def hold():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(0.05)
+
+    try:
+        await asyncio.gather(hold(), hold())
+        stats = pool_stats(engine)
+    finally:
+        await engine.dispose()
+    assert stats["checkouts"] == 2 and stats["in_use"] == 0 and stats["timeouts"] == 0
+    assert stats["wait_ms_max"] >= 40
+
+
+@pytest.mark.anyio
+async def test_debug_pool_endpoint(client):
+    stats = (await client.get("/debug/pool")).json()
+    assert {"size", "in_use", "overflow", "wait_ms_p95"} <= set(stats)
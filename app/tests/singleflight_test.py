@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from tests.conftest import QueryCounter
+from routes.travel import travel_flight
+from tests.travel_test import create_catalog
+from utils.metrics import Metrics, metrics
+from utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def flight():
+    return SingleFlight("test", registry=Metrics())
+
+
+async def test_concurrent_calls_share_one_load(flight):
+    release, calls = asyncio.Event(), []
+
+    async def load():
+        calls.append(1)
+        await release.wait()
+        return b"result"
+
+    waiters = [asyncio.create_task(flight.do("key", load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [b"result"] * 10
+    assert len(calls) == 1
+    assert flight.registry.flights == {("test", "leader"): 1, ("test", "coalesced"): 9}
+
+    # Загрузка закончилась: следующий вызов выполняет новую.
+    await flight.do("key", load)
+    assert len(calls) == 2
+
+
+async def test_follower_retries_when_leader_is_cancelled(flight):
+    release, calls = asyncio.Event(), []
+
+    async def load():
+        calls.append(1)
+        await release.wait()
+        return b"result"
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await follower == b"result"
+    assert leader.cancelled()
+    # Загрузку лидера отменили вместе с ним; ожидавший запрос выполнил свою.
+    assert len(calls) == 2
+
+
+async def test_leader_cancelled_before_load_starts(flight):
+    async def load():
+        return b"result"
+
+    # Отмена до первого шага задачи загрузки: код _load не выполняется вовсе.
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert flight._inflight == {}
+    assert await asyncio.wait_for(flight.do("key", load), 2) == b"result"
+
+
+async def test_follower_runs_before_wait(flight):
+    release, waited = asyncio.Event(), []
+
+    async def load():
+        await release.wait()
+        return b"result"
+
+    async def before_wait():
+        waited.append(1)
+
+    leader = asyncio.create_task(flight.do("key", load, before_wait=before_wait))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(flight.do("key", load, before_wait=before_wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(leader, *followers) == [b"result"] * 4
+    # Только ожидающие запросы отдают соединение; лидеру оно нужно для загрузки.
+    assert len(waited) == 3
+
+
+async def test_not_found_is_cached_briefly(flight):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        raise HTTPException(status_code=404, detail="Not found")
+
+    flight.negative_ttl = 0.05
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await flight.do("key", load)
+    assert len(calls) == 1
+    assert flight.registry.flights[("test", "negative_cache")] == 2
+
+    await asyncio.sleep(0.06)
+    with pytest.raises(HTTPException):
+        await flight.do("key", load)
+    assert len(calls) == 2
+
+
+async def test_other_errors_are_not_cached(flight):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        raise RuntimeError("database is down")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await flight.do("key", load)
+    assert len(calls) == 2
+
+
+async def test_travel_requests_are_coalesced(file_client, monkeypatch):
+    # Одновременные запросы: у каждого свое соединение, поэтому файловая база, а не транзакция теста.
+    client, session_maker = file_client
+    _, _, travel = await create_catalog(client)
+    query_counter = QueryCounter(session_maker.kw["bind"].sync_engine)
+
+    # Загрузка ждет, пока все запросы дойдут до SingleFlight, иначе результат зависит от планировщика.
+    gate, load = asyncio.Event(), travel_flight._load
+
+    async def gated_load(key, loader):
+        await gate.wait()
+        return await load(key, loader)
+
+    async def open_gate():
+        while sum(metrics.flights.values()) < 5:
+            await asyncio.sleep(0.001)
+        gate.set()
+
+    monkeypatch.setattr(travel_flight, "_load", gated_load)
+    with query_counter:
+        *responses, _ = await asyncio.gather(*(client.get(f"/travel/{travel['id']}") for _ in range(5)), open_gate())
+    assert {response.status_code for response in responses} == {200}
+    assert all(response.json() == travel for response in responses)
+    assert all(response.headers["etag"] for response in responses)
+    assert sum("FROM travels" in statement for statement in query_counter.statements) == 1
+
+    body = (await client.get("/metrics")).text
+    assert 'singleflight_requests_total{name="travel",result="leader"} 1' in body
+    assert 'singleflight_requests_total{name="travel",result="coalesced"} 4' in body
+
+
+async def test_travel_not_found_is_cached_until_data_changes(client, query_counter):
+    city, _, travel = await create_catalog(client)
+    missing = travel["id"] + 1
+
+    with query_counter:
+        for _ in range(2):
+            assert (await client.get(f"/travel/{missing}")).status_code == 404
+    assert sum("FROM travels" in statement for statement in query_counter.statements) == 1
+
+    # Новое путешествие меняет ETag, поэтому запомненный 404 больше не используется.
+    created = (await client.post("/travel/create", json={
+        "name": "Castle", "price": 50.0, "duration": "1 день", "start_date": "2025-07-01",
+        "end_date": "2025-07-01", "city_id": city["id"],
+    })).json()
+    assert created["id"] == missing
+    assert (await client.get(f"/travel/{missing}")).status_code == 200
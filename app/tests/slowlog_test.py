@@ -0,0 +1,118 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from database.models import City
+from database.slowlog import SlowQueryLog, statement_shape
+from routes import debug
+from main import app
+from routes.debug import get_debug_settings
+from utils.settings import DebugSettings
+from tests.travel_test import create_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+def test_statement_shape_collapses_in_lists():
+    first = statement_shape("SELECT * FROM travels\nWHERE id IN (?, ?, ?)")
+    assert first == statement_shape("SELECT * FROM travels WHERE id IN (?,?)") == "SELECT * FROM travels WHERE id IN (?, ...)"
+
+
+@pytest.fixture
+def slow_log(db_engine, monkeypatch):
+    # Порог ничтожно мал: в журнал попадает каждый запрос.
+    log = SlowQueryLog(threshold_ms=1e-6)
+    log.install(db_engine)
+    monkeypatch.setattr(debug, "slow_query_log", log)
+    yield log
+    log.uninstall(db_engine)
+
+
+async def test_slow_queries_are_grouped_with_route_and_plan(client, slow_log, caplog):
+    await create_catalog(client)
+    slow_log.clear()
+    with caplog.at_level(logging.WARNING, logger="myapi.slow_query"):
+        for name in ("Мин", "Гродно"):
+            await client.get("/city", params={"filter": name})
+    assert "slow query" in caplog.text
+    assert "Гродно" not in caplog.text
+
+    report = (await client.get("/debug/slow_queries")).json()
+    assert report["enabled"] is True
+    city = next(entry for entry in report["queries"] if "FROM cities" in entry["statement"])
+    assert city["count"] == 2
+    assert city["routes"] == ["GET /city"]
+    # Значения параметров (токены, адреса) не сохраняются, только их типы.
+    assert city["parameter_types"][0] == "str"
+    assert "Гродно" not in str(report)
+    # ilike по подстроке не может использовать индекс: это полный проход таблицы.
+    assert city["full_scan"] is True
+    assert any("cities" in step for step in city["plan"])
+
+    await client.delete("/debug/slow_queries")
+    assert slow_log.entries == {}
+
+
+async def test_indexed_search_is_not_a_full_scan(client, slow_log):
+    await create_catalog(client)
+    slow_log.clear()
+    await client.get("/travels/search", params={"name_city": "Минск", "sort_by": "price"})
+    search = next(entry for entry in slow_log.top(50) if "FROM travels" in entry["statement"])
+    assert search["routes"] == ["GET /travels/search"]
+    assert not search["full_scan"], search["plan"]
+
+
+async def test_failed_explain_keeps_the_transaction(slow_log, session_maker):
+    async with session_maker() as db:
+        db.add(City(name="Брест", description="Крепость"))
+        await db.flush()
+        connection = await db.connection()
+        plan = await connection.run_sync(
+            lambda sync_connection: slow_log.capture_plan(sync_connection, "SELECT * FROM no_such_table", ())
+        )
+        assert plan[0].startswith("EXPLAIN failed")
+        # SAVEPOINT откатил только EXPLAIN: транзакция запроса и ее изменения на месте.
+        assert await db.scalar(select(City.name).where(City.name == "Брест")) == "Брест"
+
+
+def test_postgres_plan_uses_analyze_only_when_enabled():
+    executed = []
+
+    class Cursor:
+        def execute(self, statement, parameters=None):
+            executed.append(statement)
+
+        def fetchall(self):
+            return [("Seq Scan on travels",)]
+
+        def close(self):
+            pass
+
+    class Connection:
+        class dialect:
+            name = "postgresql"
+
+        class connection:
+            cursor = Cursor
+
+    plain = SlowQueryLog(threshold_ms=1).capture_plan(Connection, "SELECT * FROM travels", {})
+    assert plain == ["Seq Scan on travels"]
+    assert executed == ["SAVEPOINT slow_query_plan", "EXPLAIN SELECT * FROM travels", "RELEASE SAVEPOINT slow_query_plan"]
+    executed.clear()
+    SlowQueryLog(threshold_ms=1, analyze=True).capture_plan(Connection, "SELECT * FROM travels", {})
+    assert executed[1] == "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM travels"
+
+
+async def test_debug_routes_need_token(client):
+    assert (await client.get("/debug/slow_queries")).status_code == 200
+    assert (await client.get("/debug/slow_queries", headers={"X-Debug-Token": "wrong"})).status_code == 403
+    assert (await client.delete("/debug/slow_queries", headers={"X-Debug-Token": "wrong"})).status_code == 403
+    assert (await client.get("/debug/pool", headers={"X-Debug-Token": "wrong"})).status_code == 403
+    del client.headers["X-Debug-Token"]
+    assert (await client.get("/debug/cache")).status_code == 403
+
+    app.dependency_overrides[get_debug_settings] = lambda: DebugSettings()
+    assert (await client.get("/debug/cache", headers={"X-Debug-Token": ""})).status_code == 404
+    # /metrics собирает Prometheus, он от токена не зависит.
+    assert (await client.get("/metrics")).status_code == 200
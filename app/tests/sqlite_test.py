@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.pool import engine_options
+from database.sqlite import install_sqlite_pragmas, use_immediate_transactions
+from utils.settings import DatabaseSettings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pragmas_applied_on_connect(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    settings = DatabaseSettings(sqlite_busy_timeout=1234)
+    engine = create_async_engine(url, **engine_options(settings, url, is_async=True))
+    install_sqlite_pragmas(engine, settings)
+    try:
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("PRAGMA journal_mode")) == "wal"
+            assert await conn.scalar(text("PRAGMA synchronous")) == 1  # NORMAL
+            assert await conn.scalar(text("PRAGMA busy_timeout")) == 1234
+            assert await conn.scalar(text("PRAGMA cache_size")) == settings.sqlite_cache_size
+    finally:
+        await engine.dispose()
+
+
+async def test_read_engine_rejects_writes(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    settings = DatabaseSettings()
+    writer = create_async_engine(url, **engine_options(settings, url, is_async=True))
+    reader = create_async_engine(url, **engine_options(settings, url, is_async=True))
+    install_sqlite_pragmas(writer, settings)
+    install_sqlite_pragmas(reader, settings, read_only=True)
+    try:
+        async with writer.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            await conn.execute(text("INSERT INTO t VALUES (1)"))
+        async with reader.connect() as conn:
+            assert await conn.scalar(text("SELECT x FROM t")) == 1
+            with pytest.raises(exc.OperationalError):
+                await conn.execute(text("INSERT INTO t VALUES (2)"))
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+async def test_immediate_transactions_take_write_lock(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+    settings = DatabaseSettings(sqlite_busy_timeout=0)
+    engine = create_async_engine(url, **engine_options(settings, url, is_async=True))
+    install_sqlite_pragmas(engine, settings)
+    use_immediate_transactions(engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        async with engine.connect() as first:
+            await first.execute(text("SELECT count(*) FROM t"))
+            # Первая транзакция держит блокировку записи, хотя пока только читала.
+            with pytest.raises(exc.OperationalError, match="locked"):
+                async with engine.connect() as second:
+                    await second.execute(text("SELECT count(*) FROM t"))
+            await first.execute(text("INSERT INTO t VALUES (1)"))
+            await first.commit()
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT count(*) FROM t")) == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from main import app
+from utils import openapi_cache
+
+pytestmark = pytest.mark.anyio
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Потолок времени импорта main. Сейчас импорт занимает около секунды, почти вся она —
+# импорт FastAPI и SQLAlchemy; потолок оставляет запас на медленные машины CI.
+IMPORT_TIME_LIMIT = 2.5
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "httpx": "httpx" in sys.modules,
+    "openapi_built": main.app.openapi_schema is not None,
+}))
+"""
+
+
+def test_import_time_of_main_is_capped():
+    runs = [
+        json.loads(subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout)
+        for _ in range(3)
+    ]
+    assert min(run["seconds"] for run in runs) < IMPORT_TIME_LIMIT
+    # Импорт не должен тянуть клиент прогрева и строить схему OpenAPI.
+    assert not any(run["httpx"] or run["openapi_built"] for run in runs)
+
+
+@pytest.fixture
+def schema_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "openapi_schema", None)
+    path = tmp_path / "openapi.json"
+    monkeypatch.setenv("MYAPI_OPENAPI_CACHE", str(path))
+    return path
+
+
+async def test_openapi_schema_is_cached_on_disk(client, schema_path, monkeypatch):
+    schema = (await client.get("/openapi.json")).json()
+    assert json.loads(schema_path.read_text())["schema"] == schema
+
+    # Следующий запуск того же релиза берет схему из файла и не строит ее.
+    app.openapi_schema = None
+    monkeypatch.setattr(openapi_cache, "build_schema", pytest.fail)
+    assert (await client.get("/openapi.json")).json() == schema
+
+
+def test_openapi_cache_is_rebuilt_for_new_release(schema_path, monkeypatch):
+    schema_path.write_text(json.dumps({"fingerprint": "old release", "schema": {"stale": True}}))
+    assert "paths" in app.openapi()
+    assert json.loads(schema_path.read_text())["fingerprint"] == openapi_cache.release_fingerprint()
@@ -0,0 +1,91 @@
+import itertools
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import sqlite
+
+from services.travel_services import SORT_KEYS, TravelSearchParams, build_search_query
+from utils.pagination import PageParams, encode_cursor, keyset_query
+
+pytestmark = pytest.mark.anyio
+
+FILTERS = {
+    "start_date": date(2025, 1, 1),
+    "end_date": date(2025, 2, 1),
+    "min_price": 10.0,
+    "max_price": 100.0,
+    "name_city": "Минск",
+    "duration": "3 дня",
+}
+
+CURSORS = {
+    "id": [10],
+    "price": [50.0, 10],
+    "start_date": ["2025-01-10", 10],
+    "end_date": ["2025-01-20", 10],
+    "rating": [4.5, 10],
+}
+
+
+def search_params(sort_by="id", order="asc", **filters):
+    values = {name: filters.get(name) for name in FILTERS}
+    return TravelSearchParams(**values, sort_by=sort_by, order=order)
+
+
+async def query_plan(db_engine, params, after=None):
+    page = PageParams(limit=50, after=after)
+    query = keyset_query(build_search_query(params, rows=True), params.keys, page, params.descending, params.order_by)
+    sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    async with db_engine.connect() as conn:
+        return [row[3] for row in await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def assert_uses_index(plan):
+    travels = [step for step in plan if " travels" in step]
+    assert any(step.startswith("SEARCH travels USING") for step in travels), plan
+    assert all("INDEX" in step or "PRIMARY KEY" in step for step in travels), plan
+
+
+@pytest.mark.parametrize("combo", [
+    combo for size in range(1, len(FILTERS) + 1) for combo in itertools.combinations(FILTERS, size)
+], ids="+".join)
+async def test_every_filter_combination_uses_index(db_engine, combo):
+    for sort_by, order in itertools.product(SORT_KEYS, ("asc", "desc")):
+        params = search_params(sort_by, order, **{name: FILTERS[name] for name in combo})
+        assert_uses_index(await query_plan(db_engine, params))
+        assert_uses_index(await query_plan(db_engine, params, encode_cursor(CURSORS[sort_by])))
+
+
+@pytest.mark.parametrize("sort_by", list(SORT_KEYS))
+async def test_sorted_pages_read_index_in_order(db_engine, sort_by):
+    plan = await query_plan(db_engine, search_params(sort_by), encode_cursor(CURSORS[sort_by]))
+    assert_uses_index(plan)
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+async def test_search_by_city_sorted_by_price(client):
+    cities = [
+        (await client.post("/city/create", json={"name": name, "description": "-"})).json()
+        for name in ("Минск", "Гродно")
+    ]
+    for i in range(5):
+        for city in cities:
+            await client.post("/travel/create", json={
+                "name": f"{city['name']} {i}", "price": 100.0 - i * 10, "duration": "3 дня",
+                "start_date": f"2025-06-0{i + 1}", "end_date": "2025-06-20", "city_id": city["id"],
+            })
+
+    params = {"name_city": "Минск", "sort_by": "price", "limit": 2}
+    names, cursor = [], None
+    while True:
+        body = (await client.get("/travels/search", params={**params, **({"after": cursor} if cursor else {})})).json()
+        names += [(item["city"]["name"], item["price"]) for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert names == [("Минск", price) for price in (60.0, 70.0, 80.0, 90.0, 100.0)]
+
+    response = await client.get("/travels/search", params={"start_date": "2025-06-04", "order": "desc"})
+    assert [item["name"] for item in response.json()["items"]] == ["Гродно 4", "Минск 4", "Гродно 3", "Минск 3"]
+
+    assert (await client.get("/travels/search", params={"name_city": "Брест"})).status_code == 404
@@ -0,0 +1,43 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_catalog(client):
+    city = (await client.post("/city/create", json={"name": "Минск", "description": "Столица"})).json()
+    guide = (await client.post("/tour_guide/create", json={
+        "name": "Иван", "experience_years": 5, "contact_info": "+375", "city_id": city["id"],
+    })).json()
+    travel = (await client.post("/travel/create", json={
+        "name": "Old Town", "price": 100.0, "duration": "3 дня",
+        "start_date": "2025-06-01", "end_date": "2025-06-03",
+        "city_id": city["id"], "guide_id": guide["id"],
+    })).json()
+    return city, guide, travel
+
+
+async def test_create_travel_loads_relations(client):
+    city, guide, travel = await create_catalog(client)
+    assert travel["city"]["id"] == city["id"]
+    assert travel["guide"]["city"]["name"] == "Минск"
+
+
+async def test_get_travel(client):
+    _, _, travel = await create_catalog(client)
+    response = await client.get(f"/travel/{travel['id']}")
+    assert response.status_code == 200
+    assert response.json()["guide"]["name"] == "Иван"
+    assert (await client.get("/travel/999")).status_code == 404
+
+
+async def test_update_travel_reloads_city(client):
+    city, _, travel = await create_catalog(client)
+    other = (await client.post("/city/create", json={"name": "Гродно", "description": "Запад"})).json()
+    payload = {
+        "name": "Old Town", "price": 120.0, "duration": "3 дня",
+        "start_date": "2025-06-01", "end_date": "2025-06-03", "city_id": other["id"],
+    }
+    response = await client.put(f"/travel/{travel['id']}", json=payload)
+    assert response.status_code == 200
+    assert response.json()["city"]["name"] == "Гродно"
+    assert len((await client.get("/treves")).json()["items"]) == 1
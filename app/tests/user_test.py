@@ -1,23 +1,21 @@
-# from fastapi.testclient import TestClient
-# from app import main
-# from routes.user import *
-# from sqlalchemy import create_engine
-# from sqlalchemy.orm import sessionmaker
-# from database.models import Base
+import pytest
 
-# SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-# engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-# TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+pytestmark = pytest.mark.anyio
 
-# Base.metadata.create_all(bind=engine)
 
-# client = TestClient(main.app)
+async def test_create_user(client):
+    user_data = {"name": "Dasha", "age": 88}
+    response = await client.post("/user/create", json=user_data)
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["name"] == "Dasha"
+    assert response_data["age"] == 88
+    assert "id" in response_data
 
-# def test_create_user():
-#     user_data = {"name": "Dasha", "age": 88}
-#     response = client.post("/user/create", json=user_data)
-#     assert response.status_code == 200
-#     response_data = response.json()
-#     assert response_data["name"] == "Dasha"
-#     assert response_data["age"] == 88
-#     assert "id" in response_data
\ No newline at end of file
+
+async def test_get_and_delete_user(client):
+    user = (await client.post("/user/create", json={"name": "Dasha", "age": 88})).json()
+    assert (await client.get(f"/user/{user['id']}")).json() == user
+    response = await client.delete(f"/user/{user['id']}")
+    assert response.json()["message"] == "User deleted successfully"
+    assert (await client.get(f"/user/{user['id']}")).status_code == 404
@@ -0,0 +1,107 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from main import app
+from utils.cache import catalog_cache
+from utils.warmup import warmup
+
+pytestmark = pytest.mark.anyio
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def test_warmup_primes_catalog_and_openapi(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("MYAPI_OPENAPI_CACHE", str(tmp_path / "openapi.json"))
+    await client.post("/city/create", json={"name": "Минск", "description": "Столица"})
+    app.openapi_schema = None
+    # Соединение тестовой базы занято транзакцией теста, поэтому пул прогревается у отдельного движка.
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/warmup.db", poolclass=AsyncAdaptedQueuePool, pool_size=3
+    )
+
+    timings = await warmup(app, engines=[engine])
+    opened = engine.pool.checkedin()
+    await engine.dispose()
+
+    assert opened == 3
+
+    assert set(timings) == {"connections_ms", "catalog_ms", "openapi_ms", "total_ms"}
+    assert app.openapi_schema is not None
+    assert catalog_cache.stats()["misses"] == 2
+    response = await client.get("/cities")
+    assert response.json()["items"][0]["name"] == "Минск"
+    assert catalog_cache.stats()["hits"] == 1
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_gunicorn_startup_and_first_request(tmp_path):
+    pytest.importorskip("gunicorn")
+    pytest.importorskip("uvicorn_worker")
+    subprocess.run(
+        [sys.executable, "-c", "from benchmarks.seed import seed_database; seed_database("
+         f"'sqlite:///{tmp_path}/database.db', cities=5, guides=10, travels=50, users=10, reviews=20)"],
+        cwd=APP_DIR, check=True,
+    )
+    port = free_port()
+    env = {
+        **os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/database.db",
+        "SERVER_BIND": f"127.0.0.1:{port}", "SERVER_WORKERS": "2",
+        "MYAPI_OPENAPI_CACHE": str(tmp_path / "openapi.json"), "DEBUG_TOKEN": "warmup",
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app"], cwd=APP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as http:
+            while True:
+                assert server.poll() is None, "gunicorn exited during startup"
+                assert time.perf_counter() - started < 60, "server did not start in 60 s"
+                try:
+                    first = http.get("/cities")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.05)
+            startup = time.perf_counter() - started
+            # Сокет слушает мастер; запрос ждет, пока воркер закончит прогрев, и сразу берет кэш.
+            assert first.status_code == 200
+            assert len(first.json()["items"]) == 5
+            warmed = http.get("/debug/warmup", headers={"X-Debug-Token": "warmup"}).json()
+            assert warmed["enabled"]
+            assert warmed["total_ms"] < startup * 1000
+
+            # Два воркера: сессия, выданная одним, должна узнаваться и другим (user_sessions по умолчанию).
+            http.post("/user/create", json={"name": "dasha", "age": 88})
+            token = http.post("/user/login", json={"name": "dasha", "age": 88}).json()["session_token"]
+            assert {http.get("/user/me", headers={"X-Session-Token": token, "Connection": "close"}).status_code
+                    for _ in range(20)} == {200}
+    finally:
+        server.terminate()
+        assert server.wait(timeout=30) == 0
+
+
+def test_gunicorn_refuses_memory_sessions_with_several_workers(tmp_path):
+    pytest.importorskip("gunicorn")
+    env = {
+        **os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/database.db", "SESSION_BACKEND": "memory",
+        "SERVER_BIND": f"127.0.0.1:{free_port()}", "SERVER_WORKERS": "2",
+    }
+    result = subprocess.run(
+        [sys.executable, "-m", "gunicorn", "main:app"], cwd=APP_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode != 0
+    assert "SESSION_BACKEND=memory" in result.stderr
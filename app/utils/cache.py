@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+MISSING = object()
+
+
+class CacheBackend:
+    """
+    Хранилище кэша. Реализация должна быть синхронной и не блокирующей:
+    ее методы вызываются прямо из обработчиков в цикле событий.
+    """
+
+    def get(self, key: Hashable) -> Any:
+        """Возвращает значение или MISSING."""
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Удаляет все записи и обнуляет статистику."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullCache(CacheBackend):
+    """Ничего не хранит: каждое чтение идет в базу."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return MISSING
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": 0, "misses": self.misses, "evictions": 0, "expirations": 0, "size": 0}
+
+
+class TTLLRUCache(CacheBackend):
+    """
+    Ограниченный по размеру LRU-кэш с временем жизни записей.
+    При переполнении вытесняется давно не читавшаяся запись.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "expirations": self.expirations, "size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl,
+        }
+
+
+class ReadThroughCache:
+    """
+    Кэш чтения по пространствам имен ("cities", "tour_guides", ...).
+
+    Сброс пространства имен увеличивает его поколение, которое входит в ключ,
+    поэтому инвалидация стоит O(1), а старые записи вытесняются LRU. Загрузка,
+    начавшаяся до сброса, сохранит результат под старым поколением и не будет прочитана.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._generations: dict = {}
+        self.invalidations = 0
+
+    async def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        full_key = (namespace, self._generations.get(namespace, 0), key)
+        value = self.backend.get(full_key)
+        if value is MISSING:
+            value = await loader()
+            self.backend.set(full_key, value)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self._generations.clear()
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "invalidations": self.invalidations, "backend": type(self.backend).__name__}
+
+
+CATALOG_CACHE_SIZE = 1024
+CATALOG_CACHE_TTL = 60.0
+
+# Кэш редко меняющихся справочников: города и гиды. Он живет в процессе, поэтому
+# запись в другом воркере становится видна здесь не позже чем через TTL.
+catalog_cache = ReadThroughCache(TTLLRUCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL))
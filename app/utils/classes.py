@@ -1,6 +1,6 @@
-from datetime import date
-from pydantic import BaseModel
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
 
 class UserBase(BaseModel):
     name: str
@@ -15,6 +15,7 @@ class TravelBase(BaseModel):
     start_date: date
     end_date: date
     image_url: Optional[str] = None
+    capacity: Optional[int] = Field(None, ge=0)
 
 
 class TourGuideBase(BaseModel):
@@ -31,11 +32,29 @@ class CityBase(BaseModel):
 
 
 class OrderBase(BaseModel):
-    order_date: date
+    order_date: datetime
     status: str
 
 
 class ReviewBase(BaseModel):
     rating: int
     comment: Optional[str] = None
-    created_at: date
\ No newline at end of file
+    created_at: date
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class BatchItem(BaseModel, Generic[T]):
+    id: int
+    status: str
+    item: Optional[T] = None
+
+
+class Batch(BaseModel, Generic[T]):
+    items: List[BatchItem[T]]
+    missing: List[int]
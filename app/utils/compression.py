@@ -0,0 +1,188 @@
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Тела меньше порога отдаются как есть: выигрыш меньше накладных расходов на сжатие.
+COMPRESSION_MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Поддерживаемые кодировки в порядке предпочтения при равном q.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+UNCOMPRESSED_STATUSES = (204, 304)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Выбирает кодировку по заголовку Accept-Encoding с учетом q-значений и `*`.
+    None означает, что ответ нужно отдать без сжатия.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class Compressor:
+    """Потоковый компрессор: gzip через zlib или brotli, если пакет установлен."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Сжимает очередной фрагмент. Промежуточные фрагменты сбрасываются (sync flush),
+        чтобы клиент потоковой выгрузки получал данные по мере их отправки.
+        """
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return Compressor(encoding).compress(data, final=True)
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы gzip или brotli по Accept-Encoding. Ответ целиком сжимается,
+    только если он не меньше `minimum_size`; потоковые ответы сжимаются по фрагментам.
+    Ответы с уже выставленным Content-Encoding (см. PrecompressedResponse) не трогаются.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not is_compressible(headers) or start_message["status"] in UNCOMPRESSED_STATUSES:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = Compressor(encoding)
+                body = compressor.compress(body, final=not more_body)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+            else:
+                body = compressor.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class EncodedBody:
+    """
+    Тело ответа в JSON и его сжатые варианты для кэша. Каждая кодировка сжимается
+    один раз, при первом запросе с ней, и дальше отдается из записи кэша.
+    """
+
+    __slots__ = ("raw", "_variants")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._variants: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_model(cls, model) -> "EncodedBody":
+        return cls(model.model_dump_json().encode())
+
+    def encoded(self, encoding: str) -> bytes:
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.raw, encoding)
+        return variant
+
+
+class PrecompressedResponse(Response):
+    """
+    Ответ из записи EncodedBody: кодировка выбирается по Accept-Encoding запроса
+    при отправке, сжатые байты берутся из записи, а не сжимаются заново.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, body: EncodedBody, headers: Optional[Headers] = None,
+                 minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        super().__init__(body.raw, headers=dict(headers or {}))
+        self.encoded_body = body
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if len(self.body) >= self.minimum_size:
+            self.headers.add_vary_header("Accept-Encoding")
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding is not None:
+                self.body = self.encoded_body.encoded(encoding)
+                self.headers["Content-Encoding"] = encoding
+                self.headers["Content-Length"] = str(len(self.body))
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,64 @@
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import TableVersion
+from utils.helpers import get_db
+
+
+async def table_validators(db: AsyncSession, tables: tuple) -> dict:
+    """
+    Строит ETag и Last-Modified по счетчикам версий таблиц: один запрос
+    к table_versions по первичному ключу, без выборки и сериализации данных.
+    """
+    rows = (await db.execute(
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.table_name.in_(tables))
+        .order_by(TableVersion.table_name)
+    )).all()
+    etag = 'W/"' + "-".join(f"{name}.{version}" for name, version, _ in rows) + '"'
+    headers = {"ETag": etag}
+    if rows:
+        last_modified = max(updated_at for _, _, updated_at in rows).replace(microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Для GET сравнение слабое: W/"x" и "x" совпадают.
+    weak = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == weak for candidate in header.split(","))
+
+
+def is_not_modified(request: Request, headers: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers["ETag"])
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            return parsedate_to_datetime(headers["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional(*tables: str):
+    """
+    Зависимость для GET-обработчиков: отвечает 304 Not Modified еще до выполнения
+    обработчика, если клиент прислал актуальный ETag или Last-Modified, иначе
+    добавляет эти заголовки к ответу.
+    """
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_db)) -> dict:
+        headers = await table_validators(db, tables)
+        if is_not_modified(request, headers):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return dependency
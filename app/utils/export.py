@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_BATCH = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ndjson_chunk(columns: list, rows: list) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n" for row in rows
+    ).encode()
+
+
+def _csv_chunk(columns: list, rows: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(session_maker: Callable, query: Any, fmt: str, batch: int = EXPORT_BATCH) -> AsyncIterator[bytes]:
+    """
+    Читает строки серверным курсором (stream_results + yield_per) и отдает их пачками,
+    так что в памяти одновременно находится не больше `batch` строк.
+    """
+    async with session_maker() as db:
+        result = await db.stream(query.execution_options(yield_per=batch))
+        columns = list(result.keys())
+        header = True
+        async for partition in result.partitions():
+            if fmt == "csv":
+                yield _csv_chunk(columns, partition, header)
+            else:
+                yield _ndjson_chunk(columns, partition)
+            header = False
+        if header and fmt == "csv":
+            yield _csv_chunk(columns, [], header)
+
+
+def export_response(session_maker: Callable, query: Any, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(session_maker, query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
@@ -1,8 +1,24 @@
-from database.connect import engine,session_local
+from fastapi import Request
 
-def get_db():
-    db = session_local()
-    try:
+from database.connect import async_read_session_local, async_session_local
+
+READ_METHODS = ("GET", "HEAD")
+
+
+async def get_db(request: Request):
+    """
+    Сессия на время запроса. GET и HEAD идут в движок для чтения, если он включен
+    (DB_READ_ONLY_ENGINE); иначе это тот же движок, что и для записи.
+    """
+    session_maker = async_read_session_local if request.method in READ_METHODS else async_session_local
+    async with session_maker() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+def get_session_maker():
+    """
+    Фабрика сессий для кода, который живет дольше запроса (например, потоковая выгрузка):
+    сессия из get_db закрывается до того, как StreamingResponse начнет отдавать тело.
+    Выгрузка только читает, поэтому сессии берутся из движка для чтения.
+    """
+    return async_read_session_local
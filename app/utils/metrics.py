@@ -0,0 +1,256 @@
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# Границы корзин гистограмм в секундах (значения Prometheus по умолчанию).
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Ряды пула соединений: имя метрики, тип, описание и поле PoolMetrics.snapshot.
+POOL_SERIES = (
+    ("db_pool_size", "gauge", "Размер пула соединений.", "size"),
+    ("db_pool_connections_in_use", "gauge", "Соединения, выданные из пула.", "in_use"),
+    ("db_pool_connections_idle", "gauge", "Соединения, простаивающие в пуле.", "idle"),
+    ("db_pool_overflow", "gauge", "Соединения сверх размера пула.", "overflow"),
+    ("db_pool_checkouts_total", "counter", "Выдачи соединений из пула.", "checkouts"),
+    ("db_pool_timeouts_total", "counter", "Запросы, не дождавшиеся соединения за pool_timeout.", "timeouts"),
+)
+
+# Метка маршрута для запросов, не попавших ни в один маршрут: путь в метке
+# дал бы неограниченное число рядов.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами; хранит счетчики корзин, сумму и число наблюдений."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(BUCKETS, value)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class RequestStats:
+    """Счетчики одного запроса: число SQL-запросов и время в базе; `scope` — ASGI scope запроса."""
+
+    __slots__ = ("queries", "db_seconds", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.scope = scope or {}
+
+
+# Статистика текущего запроса. Сессии AsyncSession выполняют SQL в greenlet
+# с контекстом вызывающей задачи, поэтому события движка видят эту переменную.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Metrics:
+    """Метрики HTTP по маршрутам и времени в базе, в формате Prometheus."""
+
+    def __init__(self):
+        # Движки, чьи пулы показываются в метриках; reset их не забывает.
+        self.pools: Dict[str, object] = {}
+        self.reset()
+
+    def register_pool(self, name: str, engine) -> None:
+        """
+        Добавляет в /metrics пул движка под меткой `pool`. Хранится движок, а не пул:
+        dispose заменяет пул новым. Пулы без замеров (StaticPool) пропускаются.
+        """
+        self.pools[name] = engine
+
+    def reset(self) -> None:
+        self.in_flight = 0
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.queries: Dict[Tuple[str, str], int] = {}
+        self.statuses: Dict[Tuple[str, str, int], int] = {}
+        self.flights: Dict[Tuple[str, str], int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram()
+            self.db_time[key] = Histogram()
+            self.queries[key] = 0
+        latency.observe(seconds)
+        self.db_time[key].observe(stats.db_seconds)
+        self.queries[key] += stats.queries
+        status_key = (method, route, status)
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def count_flight(self, name: str, result: str) -> None:
+        """Учет запроса через SingleFlight: `leader`, `coalesced` или `negative_cache`."""
+        key = (name, result)
+        self.flights[key] = self.flights.get(key, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Число HTTP-запросов по маршруту и статусу.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.statuses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+        lines += [
+            "# HELP http_requests_in_flight Число запросов, обрабатываемых сейчас.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        lines += _render_histogram(
+            "http_request_duration_seconds", "Время обработки запроса до конца ответа.", self.latency
+        )
+        lines += _render_histogram(
+            "db_query_duration_seconds", "Суммарное время SQL-запросов за один HTTP-запрос.", self.db_time
+        )
+        lines += [
+            "# HELP db_queries_total Число SQL-запросов, выполненных при обработке HTTP-запросов.",
+            "# TYPE db_queries_total counter",
+        ]
+        for (method, route), count in sorted(self.queries.items()):
+            lines.append(f"db_queries_total{_labels(method=method, route=route)} {count}")
+        lines += [
+            "# HELP singleflight_requests_total Чтения через SingleFlight: выполнившие загрузку (leader),"
+            " дождавшиеся чужой (coalesced) и получившие запомненный 404 (negative_cache).",
+            "# TYPE singleflight_requests_total counter",
+        ]
+        for (name, result), count in sorted(self.flights.items()):
+            lines.append(f"singleflight_requests_total{_labels(name=name, result=result)} {count}")
+        lines += self._render_pools()
+        return "\n".join(lines) + "\n"
+
+    def _render_pools(self) -> list:
+        pools = {}
+        for name, engine in sorted(self.pools.items()):
+            pool = engine.pool
+            if getattr(pool, "metrics", None) is not None:
+                pools[name] = (pool, pool.metrics.snapshot(pool))
+        if not pools:
+            return []
+        lines = []
+        for metric, kind, help, field in POOL_SERIES:
+            lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+            for name, (_, snapshot) in pools.items():
+                lines.append(f"{metric}{_labels(pool=name)} {snapshot[field]}")
+        lines += _render_histogram(
+            "db_pool_wait_seconds", "Время ожидания соединения из пула, включая открытие нового.",
+            {(name,): pool.metrics.wait for name, (pool, _) in pools.items()}, ("pool",),
+        )
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histogram(name: str, help: str, histograms: dict, label_names=("method", "route")) -> list:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        for bound, count in zip(BUCKETS, histogram.cumulative()):
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+metrics = Metrics()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is None or context is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - context._metrics_started
+
+
+def route_label(scope) -> str:
+    """Шаблон пути маршрута; до маршрутизации и для ненайденных путей — UNMATCHED_ROUTE."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Замеряет время каждого запроса, число и время SQL-запросов за запрос
+    и добавляет к ответу заголовок Server-Timing:
+
+        Server-Timing: app;dur=12.4, db;dur=3.1;desc="2 queries"
+
+    `app` — время до начала ответа, `db` — время SQL-запросов к этому моменту.
+    Метрики собираются по шаблону маршрута (`/travel/{id}`), а не по пути.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status = 500
+        self.registry.in_flight += 1
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append("Server-Timing", server_timing(time.perf_counter() - started, stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            self.registry.in_flight -= 1
+            current_request.reset(token)
+            self.registry.record(
+                scope["method"], route_label(scope), status, time.perf_counter() - started, stats
+            )
+
+
+def server_timing(seconds: float, stats: RequestStats) -> str:
+    return (
+        f"app;dur={seconds * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    )
@@ -0,0 +1,110 @@
+"""
+Схема OpenAPI, сохраненная на диск между запусками.
+
+Построение схемы обходит все маршруты и модели и занимает заметную часть старта,
+хотя схема меняется только вместе с кодом. Поэтому она хранится в JSON-файле
+с отпечатком релиза: хешем исходников приложения и версий FastAPI и pydantic.
+Отпечаток не совпал — схема строится заново и файл перезаписывается.
+
+Собрать файл заранее (например, при сборке образа), из каталога app:
+
+    python -m utils.openapi_cache
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import fastapi
+import pydantic
+from fastapi.openapi.utils import get_openapi
+
+logger = logging.getLogger("myapi.openapi")
+
+OPENAPI_CACHE_ENV = "MYAPI_OPENAPI_CACHE"
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Каталоги, которые не влияют на схему API.
+IGNORED_DIRS = {"tests", "benchmarks", "migrations", "jobs", "__pycache__"}
+
+
+def cache_path() -> str:
+    return os.environ.get(OPENAPI_CACHE_ENV) or os.path.join(tempfile.gettempdir(), "myapi-openapi.json")
+
+
+def release_fingerprint(root: str = APP_DIR) -> str:
+    digest = hashlib.sha256(f"fastapi={fastapi.__version__};pydantic={pydantic.VERSION}".encode())
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name not in IGNORED_DIRS and not name.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+    return digest.hexdigest()
+
+
+def build_schema(app) -> dict:
+    """То же, что FastAPI.openapi(), но без сохранения в app.openapi_schema."""
+    return get_openapi(
+        title=app.title, version=app.version, openapi_version=app.openapi_version,
+        summary=app.summary, description=app.description, terms_of_service=app.terms_of_service,
+        contact=app.contact, license_info=app.license_info, routes=app.routes,
+        webhooks=app.webhooks.routes, tags=app.openapi_tags, servers=app.servers,
+        separate_input_output_schemas=app.separate_input_output_schemas,
+    )
+
+
+def load_schema(path: str, fingerprint: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("schema")
+
+
+def store_schema(path: str, fingerprint: str, schema: dict) -> None:
+    # Запись через временный файл: воркеры, стартующие одновременно, не прочитают файл наполовину.
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump({"fingerprint": fingerprint, "schema": schema}, file)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except OSError as error:
+        logger.warning("cannot write OpenAPI cache %s: %r", path, error)
+
+
+def load_or_build(app, path: Optional[str] = None) -> dict:
+    path = path or cache_path()
+    fingerprint = release_fingerprint()
+    schema = load_schema(path, fingerprint)
+    if schema is None:
+        schema = build_schema(app)
+        store_schema(path, fingerprint, schema)
+    return schema
+
+
+def install_openapi_cache(app, path: Optional[str] = None) -> None:
+    """Заменяет app.openapi: схема берется из файла, а строится только при смене релиза."""
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            app.openapi_schema = load_or_build(app, path)
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+if __name__ == "__main__":
+    from main import app
+
+    app.openapi()
+    print(cache_path())
@@ -0,0 +1,84 @@
+import base64
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or not values:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class PageParams:
+    """
+    Параметры keyset-пагинации: `limit` и непрозрачный курсор `after`,
+    полученный из `next_cursor` предыдущей страницы.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=500, description="Количество записей на странице."),
+        after: Optional[str] = Query(None, description="Курсор из `next_cursor` предыдущей страницы."),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+def keyset_query(query: Any, keys: list, params: PageParams, descending: bool = False, order_by: Optional[list] = None):
+    """
+    Добавляет к запросу keyset-условие, сортировку и LIMIT n+1:
+    `WHERE key > :after ORDER BY key LIMIT n + 1`. Стоимость запроса
+    не зависит от глубины страницы, в отличие от OFFSET.
+
+    `keys` - список пар (колонка, функция разбора значения из курсора);
+    последняя колонка должна быть уникальной, обычно это id. `order_by` позволяет
+    подменить выражения сортировки (те же колонки, но, например, с подсказкой планировщику).
+    """
+    columns = [column for column, _ in keys]
+    if params.after is not None:
+        values = decode_cursor(params.after)
+        if len(values) != len(keys):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        try:
+            values = [parse(value) for (_, parse), value in zip(keys, values)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        left, right = (columns[0], values[0]) if len(keys) == 1 else (tuple_(*columns), tuple_(*values))
+        query = query.where(left < right if descending else left > right)
+    order = [column.desc() if descending else column.asc() for column in order_by or columns]
+    return query.order_by(*order).limit(params.limit + 1)
+
+
+async def keyset_page(
+    db: AsyncSession, query: Any, keys: list, params: PageParams, descending: bool = False,
+    order_by: Optional[list] = None, scalars: bool = True,
+) -> dict:
+    """
+    Страница объектов. С `scalars=False` возвращает строки результата как есть (для
+    запросов по отдельным колонкам); колонки ключей должны быть выбраны под своими именами.
+    """
+    statement = keyset_query(query, keys, params, descending, order_by)
+    rows = (await db.scalars(statement) if scalars else await db.execute(statement)).all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column, _ in keys])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+async def paginate(db: AsyncSession, query: Any, key: Any, params: PageParams, scalars: bool = True) -> dict:
+    return await keyset_page(db, query, [(key, int)], params, scalars=scalars)
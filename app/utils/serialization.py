@@ -0,0 +1,82 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic_core import to_json
+from sqlalchemy import inspect
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson указан в requirements.txt
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Кодирует в JSON сразу в байты. Без orjson используется кодировщик pydantic-core:
+    он тоже написан на Rust и дает тот же формат дат и чисел, только медленнее.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value)
+
+
+class RawJSONResponse(Response):
+    """Ответ с уже закодированным телом: FastAPI не проверяет и не сериализует его повторно."""
+
+    media_type = "application/json"
+
+
+class RowShape:
+    """
+    Проекция модели ответа на колонки SELECT.
+
+    Скалярные поля модели выбираются колонками `entity` с метками `<префикс><поле>`,
+    вложенные модели описываются своими RowShape. Строка результата собирается
+    в словарь по позициям колонок, без ORM-объектов и без проверки Pydantic:
+    данные пришли из базы и уже соответствуют схеме. Модель ответа остается
+    источником списка полей и документации OpenAPI.
+    """
+
+    def __init__(self, model: Any, entity: Any, nested: Optional[dict] = None, optional: bool = False):
+        self.nested = nested or {}
+        self.optional = optional
+        self.entity = entity
+        self.fields = [name for name in model.model_fields if name not in self.nested]
+        available = set(inspect(entity).mapper.column_attrs.keys())
+        missing = [name for name in self.fields if name not in available]
+        if missing:
+            raise ValueError(f"{model.__name__}: no columns for fields {missing}")
+        self.width = len(self.fields) + sum(shape.width for shape in self.nested.values())
+        self._id = self.fields.index("id") if optional else None
+
+    def columns(self, prefix: str = "") -> list:
+        columns = [getattr(self.entity, name).label(prefix + name) for name in self.fields]
+        for key, shape in self.nested.items():
+            columns += shape.columns(f"{prefix}{key}__")
+        return columns
+
+    def build(self, row: Any, offset: int = 0) -> Optional[dict]:
+        end = offset + len(self.fields)
+        values = row[offset:end]
+        # Связь через LEFT JOIN: если первичного ключа нет, нет и объекта.
+        if self._id is not None and values[self._id] is None:
+            return None
+        item = dict(zip(self.fields, values))
+        for key, shape in self.nested.items():
+            item[key] = shape.build(row, end)
+            end += shape.width
+        return item
+
+
+def page_response(shape: RowShape, page: dict, response: Optional[Response] = None) -> RawJSONResponse:
+    """
+    Кодирует страницу строк (см. keyset_page(..., scalars=False)) в тело ответа Page[...].
+
+    Заголовки, которые зависимости выставили на `response` (например, ETag из conditional),
+    FastAPI не переносит в возвращенный обработчиком Response, поэтому их нужно передать сюда.
+    """
+    body = {"items": [shape.build(row) for row in page["items"]], "next_cursor": page["next_cursor"]}
+    raw = RawJSONResponse(dumps(body))
+    if response is not None:
+        raw.headers.update(response.headers)
+    return raw
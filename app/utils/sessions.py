@@ -0,0 +1,179 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import UserSession
+from utils.settings import SessionSettings, load_session_settings
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+class SessionBackend:
+    """
+    Хранилище сессий пользователей. Методы получают сессию БД текущего запроса;
+    реализации, которым база не нужна, ее не используют.
+    """
+
+    async def create(self, db: AsyncSession, user_id: int) -> str:
+        raise NotImplementedError
+
+    async def resolve(self, db: AsyncSession, token: str) -> Optional[int]:
+        """Возвращает ID пользователя или None, если сессии нет или она истекла."""
+        raise NotImplementedError
+
+    async def revoke(self, db: AsyncSession, token: str) -> bool:
+        """Завершает сессию; возвращает False, если такой действующей сессии нет."""
+        raise NotImplementedError
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    Сессии в памяти процесса с временем жизни и пределом размера. Все записи живут
+    одинаковый TTL, поэтому порядок вставки совпадает с порядком истечения и
+    просроченные записи снимаются с начала словаря за амортизированное O(1).
+    Подходит только для одного процесса.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _purge(self) -> None:
+        now = self.clock()
+        while self._sessions:
+            token, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now and len(self._sessions) < self.maxsize:
+                break
+            del self._sessions[token]
+
+    async def create(self, db, user_id):
+        self._purge()
+        token = new_token()
+        self._sessions[token] = (self.clock() + self.ttl, user_id)
+        return token
+
+    async def resolve(self, db, token):
+        entry = self._sessions.get(token)
+        if entry is None or entry[0] <= self.clock():
+            return None
+        return entry[1]
+
+    async def revoke(self, db, token):
+        entry = self._sessions.pop(token, None)
+        return entry is not None and entry[0] > self.clock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class DatabaseSessionBackend(SessionBackend):
+    """
+    Сессии в таблице user_sessions: общие для всех воркеров и переживают перезапуск.
+    Просроченные строки удаляются по индексу expires_at при каждом PURGE_EVERY-м входе.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._created = 0
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        return datetime.datetime.utcnow()
+
+    async def create(self, db, user_id):
+        token = new_token()
+        now = self._now()
+        db.add(UserSession(token=token, user_id=user_id, expires_at=now + datetime.timedelta(seconds=self.ttl)))
+        self._created += 1
+        if self._created % self.PURGE_EVERY == 0:
+            await db.execute(delete(UserSession).where(UserSession.expires_at <= now))
+        await db.commit()
+        return token
+
+    async def resolve(self, db, token):
+        return await db.scalar(
+            select(UserSession.user_id).where(UserSession.token == token, UserSession.expires_at > self._now())
+        )
+
+    async def revoke(self, db, token):
+        result = await db.execute(
+            delete(UserSession).where(UserSession.token == token, UserSession.expires_at > self._now())
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+
+class SignedTokenBackend(SessionBackend):
+    """
+    Без хранилища: токен содержит ID пользователя и срок действия и подписан HMAC-SHA256,
+    поэтому проверка не делает ни одного запроса. Отозвать такой токен до истечения
+    нельзя: выход из аккаунта только проверяет его, клиент должен его забыть.
+    """
+
+    def __init__(self, secret: str, ttl: float, clock: Callable[[], float] = time.time):
+        if not secret:
+            raise ValueError("Signed session tokens require SESSION_SECRET.")
+        self.key = secret.encode()
+        self.ttl = ttl
+        self.clock = clock
+
+    def _sign(self, payload: bytes) -> str:
+        digest = hmac.new(self.key, payload, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    async def create(self, db, user_id):
+        payload = base64.urlsafe_b64encode(
+            json.dumps({"uid": user_id, "exp": int(self.clock() + self.ttl)}, separators=(",", ":")).encode()
+        ).rstrip(b"=")
+        return f"{payload.decode()}.{self._sign(payload)}"
+
+    async def resolve(self, db, token):
+        # Подпись и payload — base64 без отступов; compare_digest не принимает строки не из ASCII.
+        if not token.isascii():
+            return None
+        payload, _, signature = token.partition(".")
+        if not hmac.compare_digest(self._sign(payload.encode()).encode(), signature.encode()):
+            return None
+        try:
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            return None
+        if claims.get("exp", 0) <= self.clock():
+            return None
+        return claims.get("uid")
+
+    async def revoke(self, db, token):
+        return await self.resolve(db, token) is not None
+
+
+def make_session_backend(settings: SessionSettings) -> SessionBackend:
+    if settings.backend == "memory":
+        return MemorySessionBackend(settings.ttl, settings.memory_maxsize)
+    if settings.backend == "database":
+        return DatabaseSessionBackend(settings.ttl)
+    if settings.backend == "signed":
+        return SignedTokenBackend(settings.secret, settings.ttl)
+    raise ValueError(f"Unknown session backend: {settings.backend!r}")
+
+
+# Хранилище сессий приложения; выбирается переменной SESSION_BACKEND.
+session_backend = make_session_backend(load_session_settings())
+
+
+def get_session_backend() -> SessionBackend:
+    return session_backend
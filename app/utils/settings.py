@@ -0,0 +1,155 @@
+import configparser
+import os
+from dataclasses import dataclass, fields
+from typing import Mapping, Optional
+
+# Путь к необязательному INI-файлу с секцией [database]; переменные окружения важнее файла.
+CONFIG_ENV = "MYAPI_CONFIG"
+
+CONFIG_SECTION = "database"
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """
+    Настройки подключения к базе данных.
+
+    Каждое поле читается из переменной окружения `DB_<ИМЯ>` (например, `DB_POOL_SIZE`),
+    URL — также из `DATABASE_URL`. Параметры пула действуют только для пулов с очередью
+    (файловый SQLite и Postgres); для SQLite pre-ping и recycle не нужны и не включаются.
+
+    Поля `sqlite_*` — PRAGMA, которые выполняются на каждом новом соединении с SQLite.
+    `read_only_engine` включает отдельный движок для GET-запросов.
+    `slow_query_ms` больше нуля включает журнал медленных запросов с порогом в миллисекундах,
+    `slow_query_explain` — сбор плана запроса (database/slowlog.py), `slow_query_analyze` —
+    EXPLAIN ANALYZE вместо EXPLAIN в Postgres: точнее, но выполняет медленный запрос еще раз.
+    `batch_read_size` — сколько ID уходит в один `IN (...)` пакетного чтения (/travels/batch и др.);
+    для сборок SQLite старше 3.32 с лимитом 999 параметров он должен быть меньше лимита.
+    """
+
+    url: str = "sqlite:///./database.db"
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    echo: bool = False
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64 * 1024
+    sqlite_busy_timeout: int = 5000
+    read_only_engine: bool = False
+    slow_query_ms: float = 0.0
+    slow_query_explain: bool = True
+    slow_query_analyze: bool = False
+    batch_read_size: int = 500
+
+
+def _parse(value: str, type_):
+    if type_ is bool:
+        if value.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.strip().lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"Invalid boolean value: {value!r}")
+    return type_(value)
+
+
+def _load_settings(cls, section: str, prefix: str, environ: Mapping[str, str], aliases: Mapping[str, str] = {}):
+    """
+    Собирает dataclass настроек: значения из секции INI-файла (MYAPI_CONFIG),
+    поверх них — переменные окружения `<prefix><ИМЯ>` и дополнительные имена из `aliases`.
+    """
+    values = {}
+    config_path = environ.get(CONFIG_ENV)
+    if config_path:
+        parser = configparser.ConfigParser()
+        if not parser.read(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        if parser.has_section(section):
+            values.update(parser[section])
+    for field in fields(cls):
+        name = f"{prefix}{field.name.upper()}"
+        if name in environ:
+            values[field.name] = environ[name]
+    for variable, field_name in aliases.items():
+        if variable in environ:
+            values[field_name] = environ[variable]
+
+    types = {field.name: type(field.default) for field in fields(cls)}
+    unknown = set(values) - set(types)
+    if unknown:
+        raise ValueError(f"Unknown {section} settings: {', '.join(sorted(unknown))}")
+    return cls(**{name: _parse(str(value), types[name]) for name, value in values.items()})
+
+
+def load_database_settings(environ: Optional[Mapping[str, str]] = None) -> DatabaseSettings:
+    environ = os.environ if environ is None else environ
+    return _load_settings(DatabaseSettings, CONFIG_SECTION, "DB_", environ, {"DATABASE_URL": "url"})
+
+
+@dataclass(frozen=True)
+class SessionSettings:
+    """
+    Настройки сессий пользователей, переменные окружения `SESSION_<ИМЯ>`, секция [sessions].
+
+    - **backend**: `memory` (в процессе), `database` (таблица user_sessions) или `signed` (подписанный токен);
+      при запуске через gunicorn с несколькими воркерами по умолчанию `database`, а `memory` запрещен;
+    - **ttl**: время жизни сессии в секундах;
+    - **secret**: ключ подписи, обязателен для `signed`;
+    - **memory_maxsize**: предел числа сессий в памяти процесса.
+    """
+
+    backend: str = "memory"
+    ttl: int = 24 * 60 * 60
+    secret: str = ""
+    memory_maxsize: int = 100_000
+
+
+def load_session_settings(environ: Optional[Mapping[str, str]] = None) -> SessionSettings:
+    environ = os.environ if environ is None else environ
+    return _load_settings(SessionSettings, "sessions", "SESSION_", environ)
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """
+    Настройки запуска через gunicorn (gunicorn.conf.py), переменные окружения `SERVER_<ИМЯ>`, секция [server].
+
+    - **bind**: адрес и порт;
+    - **workers**: число процессов; 0 — по числу доступных процессу ядер;
+    - **timeout**: сколько секунд воркер может не отвечать мастеру, прежде чем его перезапустят;
+    - **graceful_timeout**: сколько секунд воркер дорабатывает начатые запросы после SIGTERM;
+    - **keepalive**: сколько секунд держать keep-alive соединение без запросов;
+    - **warmup**: прогрев воркера перед приемом запросов (utils/warmup.py).
+    """
+
+    bind: str = "0.0.0.0:8000"
+    workers: int = 0
+    timeout: int = 60
+    graceful_timeout: int = 30
+    keepalive: int = 5
+    warmup: bool = True
+
+
+def load_server_settings(environ: Optional[Mapping[str, str]] = None) -> ServerSettings:
+    environ = os.environ if environ is None else environ
+    return _load_settings(ServerSettings, "server", "SERVER_", environ)
+
+
+@dataclass(frozen=True)
+class DebugSettings:
+    """
+    Доступ к отладочным маршрутам /debug/*, переменные окружения `DEBUG_<ИМЯ>`, секция [debug].
+
+    - **token**: значение заголовка `X-Debug-Token`, без которого маршруты отвечают 403;
+      пустой токен отключает маршруты (404). /metrics от токена не зависит.
+    """
+
+    token: str = ""
+
+
+def load_debug_settings(environ: Optional[Mapping[str, str]] = None) -> DebugSettings:
+    environ = os.environ if environ is None else environ
+    return _load_settings(DebugSettings, "debug", "DEBUG_", environ)
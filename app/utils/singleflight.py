@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException
+
+from utils.metrics import Metrics, metrics
+
+# Сколько секунд помнить 404: повторные запросы несуществующего ID не идут в базу.
+NEGATIVE_TTL = 1.0
+
+# Предел числа запомненных 404; при переполнении сначала удаляются истекшие.
+NEGATIVE_MAXSIZE = 10_000
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных чтений: пока загрузка по ключу выполняется,
+    остальные запросы с тем же ключом ждут ее результат, а не запускают свою.
+
+    Загрузчик выполняется в задаче первого запроса (лидера) и может пользоваться его
+    сессией: лишнее соединение из пула не нужно. Если лидер отменен (клиент отключился),
+    отменяется и загрузка, а ожидавшие запросы повторяют попытку, и один из них
+    становится новым лидером.
+
+    Ответ 404 запоминается на `negative_ttl` секунд. В ключ стоит включать версию данных
+    (например, ETag из conditional): после записи ключ меняется, и ни ожидание, ни
+    запомненный 404 не отдадут устаревший результат.
+
+    Счетчики (`leader`, `coalesced`, `negative_cache`) попадают в /metrics.
+    """
+
+    def __init__(self, name: str, negative_ttl: float = NEGATIVE_TTL, registry: Metrics = metrics):
+        self.name = name
+        self.negative_ttl = negative_ttl
+        self.registry = registry
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._negative: Dict[Hashable, Tuple[float, HTTPException]] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        before_wait: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Результат `loader()` для ключа `key`, общий для одновременных вызовов.
+
+        `before_wait` вызывается перед ожиданием чужой загрузки: например, `db.commit`
+        возвращает соединение запроса в пул, пока он ждет, и всплеск одинаковых запросов
+        не упирается в размер пула.
+        """
+        while True:
+            negative = self._negative.get(key)
+            if negative is not None:
+                if negative[0] > time.monotonic():
+                    self.registry.count_flight(self.name, "negative_cache")
+                    error = negative[1]
+                    raise HTTPException(error.status_code, error.detail, error.headers)
+                del self._negative[key]
+
+            task = self._inflight.get(key)
+            # Завершенная задача (в том числе отмененная до первого шага) уже не загрузка.
+            if task is None or task.done():
+                self.registry.count_flight(self.name, "leader")
+                task = self._inflight[key] = asyncio.ensure_future(self._load(key, loader))
+                task.add_done_callback(functools.partial(self._finish, key))
+                # Без shield: отмена лидера отменяет загрузку, которая может держать его сессию.
+                return await task
+
+            self.registry.count_flight(self.name, "coalesced")
+            if before_wait is not None:
+                await before_wait()
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Отменили загрузку лидера, а не этот запрос: пробуем снова.
+                if task.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await loader()
+        except HTTPException as error:
+            if error.status_code == 404 and self.negative_ttl > 0:
+                self._remember_not_found(key, error)
+            raise
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        # Колбэк, а не finally в _load: задачу могут отменить до ее первого шага,
+        # и тогда код _load не выполняется вовсе.
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Если ожидавших нет, исключение загрузки некому забрать; без этого asyncio пишет предупреждение.
+        if not task.cancelled():
+            task.exception()
+
+    def _remember_not_found(self, key: Hashable, error: HTTPException) -> None:
+        now = time.monotonic()
+        if len(self._negative) >= NEGATIVE_MAXSIZE:
+            self._negative = {k: value for k, value in self._negative.items() if value[0] > now}
+            if len(self._negative) >= NEGATIVE_MAXSIZE:
+                self._negative.pop(next(iter(self._negative)))
+        self._negative[key] = (now + self.negative_ttl, error)
+
+    def clear(self) -> None:
+        self._negative.clear()
+
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from pydantic import BaseModel
+from sqlalchemy.orm import configure_mappers
+
+from database.connect import async_engine, async_read_engine
+from utils.metrics import metrics
+from utils.settings import load_server_settings
+
+logger = logging.getLogger("myapi.warmup")
+
+# Пакеты приложения, в которых объявлены модели pydantic.
+APP_PACKAGES = ("models", "utils", "routes", "services")
+
+# Первые страницы справочников: под этими ключами их кэширует catalog_cache.
+CATALOG_PATHS = ("/cities", "/tour_guides/")
+
+
+def app_models(base=BaseModel):
+    for model in base.__subclasses__():
+        if model.__module__.split(".", 1)[0] in APP_PACKAGES:
+            yield model
+        yield from app_models(model)
+
+
+def configure_models() -> None:
+    """
+    Однократная настройка моделей до первого запроса: мапперы SQLAlchemy (иначе их
+    настраивает первый запрос к базе) и модели pydantic с отложенными ссылками на типы.
+    Повторный вызов ничего не делает.
+    """
+    configure_mappers()
+    for model in app_models():
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
+
+
+def default_engines() -> tuple:
+    return tuple(engine for engine in (async_engine, async_read_engine) if engine is not None)
+
+
+async def open_connections(engine) -> int:
+    """Открывает соединения до размера пула одновременно и возвращает их в пул."""
+    count = getattr(engine.pool, "size", lambda: 1)()
+
+    async def touch():
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+
+    await asyncio.gather(*(touch() for _ in range(count)))
+    return count
+
+
+async def prime_catalog(app) -> dict:
+    """Запрашивает первые страницы справочников через само приложение, чтобы они легли в кэш."""
+    # httpx нужен только здесь, а его импорт (с httpcore) стоит около четверти секунды старта.
+    from httpx import ASGITransport, AsyncClient
+
+    statuses = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://warmup") as client:
+        for path in CATALOG_PATHS:
+            statuses[path] = (await client.get(path)).status_code
+    return statuses
+
+
+async def build_openapi(app) -> dict:
+    """Схема строится при первом обращении и дальше берется из app.openapi_schema."""
+    return app.openapi()
+
+
+async def warmup(app, engines=None) -> dict:
+    """
+    Прогрев воркера до приема запросов: соединения в пулах движков, кэш справочников
+    и схема OpenAPI. Возвращает время каждого шага в миллисекундах.
+
+    Ошибки прогрева (например, база еще не доступна) пишутся в лог и не мешают старту:
+    первые запросы тогда просто выполнят эту работу сами.
+    """
+    engines = default_engines() if engines is None else engines
+    timings = {}
+    started = step = time.perf_counter()
+    for name, run in (
+        ("connections", lambda: asyncio.gather(*(open_connections(engine) for engine in engines))),
+        ("catalog", lambda: prime_catalog(app)),
+        ("openapi", lambda: build_openapi(app)),
+    ):
+        try:
+            result = await run()
+        except Exception as error:
+            logger.warning("warmup step %s failed: %r", name, error)
+        else:
+            if name == "catalog" and any(status >= 500 for status in result.values()):
+                logger.warning("warmup step catalog returned errors: %s", result)
+        now = time.perf_counter()
+        timings[f"{name}_ms"] = round((now - step) * 1000, 1)
+        step = now
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    # Запросы прогрева не должны попадать в метрики трафика.
+    metrics.reset()
+    logger.info("warmup finished: %s", timings)
+    return timings
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Жизненный цикл приложения: настройка моделей и прогрев до приема запросов
+    (прогрев отключается SERVER_WARMUP=0), закрытие соединений пулов при остановке.
+    """
+    configure_models()
+    app.state.warmup = await warmup(app) if load_server_settings().warmup else None
+    yield
+    for engine in default_engines():
+        await engine.dispose()